@@ -0,0 +1,444 @@
+"""
+Vector Index - Exact and approximate nearest-neighbour search over embeddings.
+
+All backends take unit-normalized float32 queries and score by inner product
+(cosine) against the embedding store matrix:
+
+- exact: full matrix-vector product (default for small corpora)
+- ivf:   inverted file in NumPy; spherical k-means partitions the rows and a
+         query only scores the rows of its nprobe closest partitions
+- faiss: HNSW graph from the optional faiss package
+
+Approximate indexes are persisted next to the embedding matrix, keyed by the
+matrix's content hash, and carry a recall@k / latency report measured
+against exact search when they are built. The report queries are held-out
+rows: a second index of the same kind is built without them, so no query
+is (nearly) a copy of an indexed vector.
+
+search() accepts an optional boolean row mask (metadata filters); only
+rows inside the mask are scored.
+"""
+
+import json
+import logging
+import math
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.data_knowledge_layer.keyword_index import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+# Optional faiss backend
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+ANN_BACKENDS = ("auto", "exact", "ivf", "faiss")
+
+# "auto" switches from exact search to IVF at this corpus size
+AUTO_ANN_MIN_DOCUMENTS = 20000
+
+# Rows scored per block when the matrix is float16 (upcast to float32 per block)
+SCORE_BLOCK_ROWS = 16384
+
+# IVF training
+IVF_TRAIN_POINTS_PER_LIST = 64
+IVF_TRAIN_ITERATIONS = 10
+DEFAULT_NPROBE = 16
+
+# HNSW (faiss)
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+
+# Filtered searches score the candidates exactly when there are at most this many
+FILTER_EXACT_MAX_ROWS = 50000
+
+# Held-out rows used as queries for the recall report at build time
+REPORT_QUERIES = 64
+REPORT_TOP_K = 10
+
+
+def score_rows(matrix: np.ndarray, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """Inner products of query with matrix rows (all rows, or the given row ids)"""
+    if rows is not None:
+        return np.asarray(matrix[rows], dtype=np.float32) @ query
+    if matrix.dtype == np.float32:
+        return matrix @ query
+
+    # float16 has no BLAS path: upcast one block at a time
+    scores = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], SCORE_BLOCK_ROWS):
+        block = matrix[start:start + SCORE_BLOCK_ROWS]
+        scores[start:start + SCORE_BLOCK_ROWS] = block.astype(np.float32) @ query
+    return scores
+
+
+def search_rows(matrix: np.ndarray, query: np.ndarray, top_k: int, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact top_k restricted to the given (ascending) row ids"""
+    if rows.size == 0:
+        return rows.astype(np.int64), np.empty(0, dtype=np.float32)
+    scores = score_rows(matrix, query, rows)
+    best = top_k_indices(scores, top_k)
+    return rows[best], scores[best]
+
+
+class ExactIndex:
+    """Brute-force cosine search"""
+
+    kind = "exact"
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+        self.report: Dict = {}
+
+    def search(self, query: np.ndarray, top_k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(row ids, scores) of the top_k rows (inside mask, if given), best first"""
+        if mask is not None:
+            return search_rows(self.matrix, query, top_k, np.flatnonzero(mask))
+        scores = score_rows(self.matrix, query)
+        best = top_k_indices(scores, top_k)
+        return best, scores[best]
+
+
+class IVFIndex:
+    """
+    Inverted-file index: rows grouped by nearest centroid.
+
+    Row ids of list c are order[offsets[c]:offsets[c + 1]].
+    """
+
+    kind = "ivf"
+
+    def __init__(self, matrix: np.ndarray, centroids: np.ndarray, order: np.ndarray,
+                 offsets: np.ndarray, nprobe: int = DEFAULT_NPROBE):
+        self.matrix = matrix
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        self.nprobe = nprobe
+        self.report: Dict = {}
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, nlist: Optional[int] = None, seed: int = 0) -> "IVFIndex":
+        """Train spherical k-means on a sample of the rows and assign every row"""
+        n = matrix.shape[0]
+        nlist = nlist or max(1, min(int(4 * math.sqrt(n)), n // 8 or 1))
+        rng = np.random.default_rng(seed)
+
+        sample_size = min(n, nlist * IVF_TRAIN_POINTS_PER_LIST)
+        sample = np.asarray(matrix[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(IVF_TRAIN_ITERATIONS):
+            assign = _nearest_centroid(sample, centroids)
+            counts = np.bincount(assign, minlength=nlist)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(sample[np.argsort(assign, kind='stable')], starts[filled])
+            # Empty lists are re-seeded from random sample rows
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.where(norms > 0, norms, 1.0)
+
+        assign = _nearest_centroid(matrix, centroids)
+        order = np.argsort(assign, kind='stable').astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+        return cls(matrix, centroids.astype(np.float32), order, offsets,
+                   nprobe=int(os.getenv("ANN_NPROBE", DEFAULT_NPROBE)))
+
+    def search(self, query: np.ndarray, top_k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(row ids, scores) of the best rows in the nprobe closest lists"""
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            # Few candidates: scoring them all is exact and cheaper than probing
+            if candidates.size <= FILTER_EXACT_MAX_ROWS:
+                return search_rows(self.matrix, query, top_k, candidates)
+
+        probe = top_k_indices(self.centroids @ query, self.nprobe)
+        rows = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+        if mask is not None:
+            rows = rows[mask[rows]]
+            if rows.size < top_k:
+                return search_rows(self.matrix, query, top_k, candidates)
+        # Ascending row ids read the (memory-mapped) matrix front to back
+        rows.sort()
+        return search_rows(self.matrix, query, top_k, rows)
+
+    def save(self, path: Path):
+        with open(path, 'wb') as f:
+            np.savez(f, centroids=self.centroids, order=self.order, offsets=self.offsets,
+                     report=np.array(json.dumps(self.report)))
+
+    @classmethod
+    def load(cls, path: Path, matrix: np.ndarray) -> "IVFIndex":
+        with np.load(path) as data:
+            index = cls(matrix, data["centroids"], data["order"], data["offsets"],
+                        nprobe=int(os.getenv("ANN_NPROBE", DEFAULT_NPROBE)))
+            index.report = json.loads(str(data["report"]))
+        return index
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The index structure as flat arrays (see from_arrays and kb_snapshot)"""
+        return {"centroids": self.centroids, "order": self.order, "offsets": self.offsets}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], matrix: np.ndarray) -> "IVFIndex":
+        """Index restored from to_arrays() output (arrays may be memory-mapped)"""
+        return cls(matrix, arrays["centroids"], arrays["order"], arrays["offsets"],
+                   nprobe=int(os.getenv("ANN_NPROBE", DEFAULT_NPROBE)))
+
+
+class FaissHNSWIndex:
+    """HNSW graph from faiss (inner product on normalized vectors)"""
+
+    kind = "faiss"
+
+    def __init__(self, index, matrix: np.ndarray):
+        self.index = index
+        self.index.hnsw.efSearch = int(os.getenv("ANN_EF_SEARCH", HNSW_EF_SEARCH))
+        self.matrix = matrix
+        self.report: Dict = {}
+
+    @classmethod
+    def build(cls, matrix: np.ndarray) -> "FaissHNSWIndex":
+        index = faiss.IndexHNSWFlat(matrix.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        for start in range(0, matrix.shape[0], SCORE_BLOCK_ROWS):
+            index.add(np.ascontiguousarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32))
+        return cls(index, matrix)
+
+    def search(self, query: np.ndarray, top_k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            if candidates.size <= FILTER_EXACT_MAX_ROWS:
+                return search_rows(self.matrix, query, top_k, candidates)
+            # Over-fetch in proportion to the filter's selectivity, then filter
+            fetch = min(self.index.ntotal, top_k * 2 * math.ceil(mask.size / candidates.size))
+        else:
+            fetch = top_k
+
+        scores, rows = self.index.search(query.reshape(1, -1).astype(np.float32), fetch)
+        found = rows[0] >= 0
+        if mask is not None:
+            found &= mask[np.maximum(rows[0], 0)]
+        rows, scores = rows[0][found].astype(np.int64)[:top_k], scores[0][found][:top_k]
+        if mask is not None and rows.size < top_k:
+            return search_rows(self.matrix, query, top_k, candidates)
+        return rows, scores
+
+    def save(self, path: Path):
+        faiss.write_index(self.index, str(path))
+        path.with_name(path.name + ".json").write_text(json.dumps(self.report))
+
+    @classmethod
+    def load(cls, path: Path, matrix: np.ndarray) -> "FaissHNSWIndex":
+        index = cls(faiss.read_index(str(path)), matrix)
+        report_path = path.with_name(path.name + ".json")
+        if report_path.exists():
+            index.report = json.loads(report_path.read_text())
+        return index
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The serialized graph as a uint8 array (see from_arrays and kb_snapshot)"""
+        return {"index": faiss.serialize_index(self.index)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], matrix: np.ndarray) -> "FaissHNSWIndex":
+        return cls(faiss.deserialize_index(np.array(arrays["index"])), matrix)
+
+
+class AppendedRowsIndex:
+    """
+    An index plus rows appended to the matrix after it was built.
+
+    The base index covers the first rows; newer rows are scored exactly and
+    merged in, until the index is rebuilt over the whole matrix.
+    """
+
+    def __init__(self, base, matrix: np.ndarray):
+        self.base = base
+        self.matrix = matrix
+        self.n_base = base.matrix.shape[0]
+
+    @property
+    def kind(self) -> str:
+        return self.base.kind
+
+    @property
+    def report(self) -> Dict:
+        return self.base.report
+
+    @property
+    def n_appended(self) -> int:
+        return self.matrix.shape[0] - self.n_base
+
+    def search(self, query: np.ndarray, top_k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        tail = np.arange(self.n_base, self.matrix.shape[0])
+        if mask is None:
+            rows, scores = self.base.search(query, top_k)
+        elif mask[:self.n_base].any():
+            rows, scores = self.base.search(query, top_k, mask[:self.n_base])
+        else:
+            rows, scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if mask is not None:
+            tail = tail[mask[self.n_base:]]
+        tail_rows, tail_scores = search_rows(self.matrix, query, top_k, tail)
+
+        rows = np.concatenate([rows, tail_rows])
+        scores = np.concatenate([scores, tail_scores])
+        best = top_k_indices(scores, top_k)
+        return rows[best], scores[best]
+
+
+def extend_index(index, matrix: np.ndarray):
+    """index over a matrix that grew by appending rows (no rebuild)"""
+    if isinstance(index, ExactIndex):
+        return ExactIndex(matrix)
+    if isinstance(index, AppendedRowsIndex):
+        return AppendedRowsIndex(index.base, matrix)
+    return AppendedRowsIndex(index, matrix)
+
+
+ANN_CLASSES = {"ivf": IVFIndex, "faiss": FaissHNSWIndex}
+ANN_SUFFIXES = {"ivf": "npz", "faiss": "faiss"}
+
+
+def _nearest_centroid(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Closest centroid (by inner product) of every row, in blocks"""
+    assign = np.empty(matrix.shape[0], dtype=np.int64)
+    for start in range(0, matrix.shape[0], SCORE_BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+        assign[start:start + SCORE_BLOCK_ROWS] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+def evaluate_index(index, exact: ExactIndex, queries: np.ndarray, top_k: int = REPORT_TOP_K) -> Dict:
+    """
+    recall@k and per-query latency of index against exact search.
+
+    Args:
+        index: Index under test
+        exact: Exact index over the same matrix
+        queries: Unit-normalized query vectors (n_queries, dim)
+        top_k: k for recall@k
+
+    Returns:
+        Dict with recall_at_k and latency statistics in milliseconds
+    """
+    recalls, ann_ms, exact_ms = [], [], []
+    for query in np.asarray(queries, dtype=np.float32):
+        start = time.perf_counter()
+        truth, _ = exact.search(query, top_k)
+        exact_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        found, _ = index.search(query, top_k)
+        ann_ms.append((time.perf_counter() - start) * 1000)
+
+        recalls.append(len(set(truth.tolist()) & set(found.tolist())) / max(len(truth), 1))
+
+    return {
+        "backend": index.kind,
+        "k": top_k,
+        "queries": len(recalls),
+        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else None,
+        "ann_ms_mean": round(float(np.mean(ann_ms)), 3) if ann_ms else None,
+        "ann_ms_p95": round(float(np.percentile(ann_ms, 95)), 3) if ann_ms else None,
+        "exact_ms_mean": round(float(np.mean(exact_ms)), 3) if exact_ms else None,
+        "exact_ms_p95": round(float(np.percentile(exact_ms, 95)), 3) if exact_ms else None,
+    }
+
+
+def held_out_split(matrix: np.ndarray, n_queries: int = REPORT_QUERIES, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split rows into an index part and held-out query rows (at most a tenth of the matrix).
+
+    Returns:
+        (remaining rows, held-out rows as float32 queries)
+    """
+    n = matrix.shape[0]
+    rng = np.random.default_rng(seed)
+    held_out = np.zeros(n, dtype=bool)
+    held_out[rng.choice(n, max(1, min(n_queries, n // 10)), replace=False)] = True
+    return np.asarray(matrix[~held_out]), np.asarray(matrix[held_out], dtype=np.float32)
+
+
+def evaluate_held_out(kind: str, matrix: np.ndarray, top_k: int = REPORT_TOP_K) -> Dict:
+    """
+    recall@k and latency of a `kind` index on queries it has not seen.
+
+    A second index is built over the matrix minus the held-out rows, and
+    those rows are the queries (ground truth: exact search over the same rows).
+    """
+    rest, queries = held_out_split(matrix)
+    report = evaluate_index(ANN_CLASSES[kind].build(rest), ExactIndex(rest), queries, top_k)
+    return {**report, "query_source": "held-out rows"}
+
+
+def resolve_backend(n_documents: int, backend: Optional[str] = None) -> str:
+    """Concrete backend for a corpus size (ANN_BACKEND, default auto)"""
+    backend = backend or os.getenv("ANN_BACKEND", "auto")
+    if backend not in ANN_BACKENDS:
+        raise ValueError(f"Unknown ANN backend '{backend}' (expected one of {', '.join(ANN_BACKENDS)})")
+    if backend == "auto":
+        return "ivf" if n_documents >= int(os.getenv("ANN_MIN_DOCUMENTS", AUTO_ANN_MIN_DOCUMENTS)) else "exact"
+    if backend == "faiss" and not FAISS_AVAILABLE:
+        logger.warning("⚠️ faiss not installed - using the NumPy IVF index")
+        return "ivf"
+    return backend
+
+
+def load_or_build_index(matrix: np.ndarray, store=None, backend: Optional[str] = None):
+    """
+    Vector index over matrix, reusing a persisted one when the matrix is unchanged.
+
+    Args:
+        matrix: Unit-normalized embedding matrix
+        store: EmbeddingStore the matrix came from (where indexes are persisted)
+        backend: One of ANN_BACKENDS (default: ANN_BACKEND env, then auto)
+
+    Returns:
+        ExactIndex, IVFIndex or FaissHNSWIndex
+    """
+    kind = resolve_backend(matrix.shape[0], backend)
+    if kind == "exact":
+        return ExactIndex(matrix)
+
+    cls = ANN_CLASSES[kind]
+    path = store.index_path(kind, ANN_SUFFIXES[kind]) if store is not None else None
+    if path is not None and path.exists():
+        try:
+            index = cls.load(path, matrix)
+            logger.info(f"✅ Loaded {kind} index ({path.name})")
+            return index
+        except Exception as e:
+            logger.warning(f"⚠️ Rebuilding unreadable {kind} index: {e}")
+
+    start = time.perf_counter()
+    index = cls.build(matrix)
+    build_seconds = time.perf_counter() - start
+    index.report = {**evaluate_held_out(kind, matrix), "build_seconds": round(build_seconds, 2)}
+    logger.info(
+        f"🧭 Built {kind} index over {matrix.shape[0]:,} vectors in {build_seconds:.1f}s "
+        f"(held-out recall@{index.report['k']} {index.report['recall_at_k']:.3f}, "
+        f"{index.report['ann_ms_mean']:.2f} ms vs {index.report['exact_ms_mean']:.2f} ms exact)"
+    )
+
+    if path is not None:
+        try:
+            store.save_index(index, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist {kind} index: {e}")
+    return index
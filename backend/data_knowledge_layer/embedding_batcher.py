@@ -0,0 +1,252 @@
+"""
+Embedding Batcher - Concurrent, rate-limited calls to a remote embedding API.
+
+Texts are split into batches of EMBEDDING_BATCH_SIZE and sent by up to
+EMBEDDING_CONCURRENCY worker threads. A shared token bucket keeps the request
+rate under EMBEDDING_REQUESTS_PER_SECOND, and transient failures (429, 5xx,
+timeouts, dropped connections) are retried with exponential backoff and full
+jitter, honouring Retry-After when the server sends one. Progress is recorded
+in an EmbeddingProgress object that the API can report while an index builds.
+
+VertexRESTEmbeddingClient speaks the Vertex AI predict protocol over plain
+HTTP, so the same code path can run against a local fake server
+(backend/scripts/fake_embedding_server.py) without network access.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# google.api_core exception names for the same conditions (SDK client)
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+    "DeadlineExceeded", "InternalServerError", "BadGateway", "GatewayTimeout"
+}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed embedding request is worth retrying"""
+    if isinstance(error, (ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and status in RETRYABLE_STATUS:
+        return True
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `capacity` banked.
+
+    A rate of 0 or less disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available; returns the seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+@dataclass
+class EmbeddingProgress:
+    """Live counters of an embedding run (shared across worker threads)"""
+    state: str = "idle"
+    model: Optional[str] = None
+    total_texts: int = 0
+    embedded_texts: int = 0
+    total_batches: int = 0
+    completed_batches: int = 0
+    retries: int = 0
+    throttled_seconds: float = 0.0
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def start(self, model: str, total_texts: int, total_batches: int):
+        with self._lock:
+            self.state = "running"
+            self.model = model
+            self.total_texts = total_texts
+            self.embedded_texts = 0
+            self.total_batches = total_batches
+            self.completed_batches = 0
+            self.retries = 0
+            self.throttled_seconds = 0.0
+            self.error = None
+            self.started_at = time.time()
+            self.finished_at = None
+
+    def update(self, texts: int = 0, batches: int = 0, retries: int = 0, throttled_seconds: float = 0.0):
+        with self._lock:
+            self.embedded_texts += texts
+            self.completed_batches += batches
+            self.retries += retries
+            self.throttled_seconds += throttled_seconds
+
+    def finish(self, error: Optional[BaseException] = None):
+        with self._lock:
+            self.state = "failed" if error else "done"
+            self.error = str(error) if error else None
+            self.finished_at = time.time()
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            data = {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        data["elapsed_seconds"] = round(elapsed, 2)
+        data["texts_per_second"] = round(self.embedded_texts / elapsed, 1) if elapsed > 0 else 0.0
+        data["percent"] = round(100 * self.embedded_texts / self.total_texts, 1) if self.total_texts else 0.0
+        data["throttled_seconds"] = round(self.throttled_seconds, 2)
+        return data
+
+
+class BatchEmbedder:
+    """
+    Embeds texts through any client with get_embeddings(texts) -> [obj.values].
+
+    Batches are sent concurrently by a bounded thread pool; results keep the
+    input order. A batch that still fails after max_retries aborts the run.
+    """
+
+    def __init__(
+        self,
+        client,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        progress: Optional[EmbeddingProgress] = None,
+        model_name: str = "remote",
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.client = client
+        self.batch_size = batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", "16"))
+        self.concurrency = concurrency or int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+        rate = requests_per_second if requests_per_second is not None else float(os.getenv("EMBEDDING_REQUESTS_PER_SECOND", "10"))
+        self.bucket = TokenBucket(rate, capacity=self.concurrency)
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.progress = progress or EmbeddingProgress()
+        self.model_name = model_name
+        self._sleep = sleep
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = getattr(error, "retry_after", None)
+        return max(delay, retry_after) if retry_after else delay
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            throttled = self.bucket.acquire()
+            try:
+                embeddings = self.client.get_embeddings(batch)
+                if len(embeddings) != len(batch):
+                    raise ValueError(f"Embedding API returned {len(embeddings)} vectors for {len(batch)} texts")
+                self.progress.update(texts=len(batch), batches=1, throttled_seconds=throttled)
+                return [emb.values for emb in embeddings]
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                self.progress.update(retries=1, throttled_seconds=throttled)
+                logger.warning(f"⚠️ Embedding batch failed ({e}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                self._sleep(delay)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts in order; raises the last error if a batch cannot be embedded"""
+        batches = [list(texts[i:i + self.batch_size]) for i in range(0, len(texts), self.batch_size)]
+        self.progress.start(self.model_name, len(texts), len(batches))
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="embedding-batch")
+        try:
+            results = list(pool.map(self._embed_batch, batches))
+        except BaseException as e:
+            self.progress.finish(e)
+            raise
+        finally:
+            # On failure, drop batches that have not started yet
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.progress.finish()
+        return np.array([vector for batch in results for vector in batch], dtype=np.float32)
+
+
+class TextEmbedding(NamedTuple):
+    values: List[float]
+
+
+class EmbeddingRequestError(Exception):
+    """Non-2xx response from the embedding endpoint"""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class VertexRESTEmbeddingClient:
+    """
+    Minimal Vertex AI text-embedding client over the REST predict API.
+
+    POST {endpoint}/{model}:predict with {"instances": [{"content": text}]},
+    read predictions[i].embeddings.values. Set EMBEDDING_ENDPOINT to use it,
+    e.g. http://127.0.0.1:8085/v1/projects/p/locations/l/publishers/google/models
+    for the fake server; EMBEDDING_ENDPOINT_TOKEN adds a bearer token.
+    """
+
+    def __init__(self, endpoint: str, model: str, token: Optional[str] = None, timeout: float = 60.0):
+        self.url = f"{endpoint.rstrip('/')}/{model}:predict"
+        self.timeout = timeout
+        self.session = requests.Session()
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def get_embeddings(self, texts: List[str]) -> List[TextEmbedding]:
+        response = self.session.post(
+            self.url,
+            json={"instances": [{"content": text} for text in texts]},
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            retry_after = response.headers.get("Retry-After")
+            raise EmbeddingRequestError(
+                response.status_code,
+                response.text[:200],
+                float(retry_after) if retry_after and retry_after.replace(".", "", 1).isdigit() else None
+            )
+        predictions = response.json()["predictions"]
+        return [TextEmbedding(p["embeddings"]["values"]) for p in predictions]
@@ -0,0 +1,284 @@
+"""
+Embedding Store - Persistent document embeddings with incremental updates.
+
+Embeddings are written once as a .npy matrix (one row per document) plus a
+JSON manifest holding the embedding model name and the content hash of every
+row. On startup the matrix is memory-mapped and only documents whose content
+hash is not in the manifest are sent to the embedding backend, so a warm
+start costs a manifest read and an mmap instead of a full re-embedding.
+
+Rows are stored unit-normalized (float32, or float16 with
+EMBEDDING_DTYPE=float16), so cosine similarity is a single dot product.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path(__file__).parent.parent / "data" / "cache" / "embeddings"
+
+STORE_FORMAT = "embedding-store-v2"
+
+# v1 stores hold raw (unnormalized) float32 rows; they are reused and rewritten
+READABLE_FORMATS = ("embedding-store-v1", STORE_FORMAT)
+
+STORE_DTYPES = {"float32": np.float32, "float16": np.float16}
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a document's text (the only input to its embedding)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Unit-normalize each row in float32 (all-zero rows stay zero)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+@dataclass
+class SyncStats:
+    """What EmbeddingStore.sync had to do"""
+    documents: int
+    reused: int
+    embedded: int
+    removed: int
+    written: bool
+    seconds: float
+    # Stored rows kept for documents not passed in (see sync(keep_extra=True))
+    retained: int = 0
+
+
+class EmbeddingStore:
+    """
+    On-disk embedding matrix for one embedding model.
+
+    Files (per model, in store_dir):
+        <model>.manifest.json      model, dim, dtype and per-row content hashes
+        <model>.<sha12>.npy        the unit-normalized matrix, content-addressed
+        <model>.<kind>.<sha12>.*   ANN indexes built over that matrix
+    """
+
+    def __init__(self, model_name: str, store_dir: Optional[Path] = None, dtype: Optional[str] = None):
+        dtype = dtype or os.getenv("EMBEDDING_DTYPE", "float32")
+        if dtype not in STORE_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype '{dtype}' (expected one of {', '.join(STORE_DTYPES)})")
+        self.dtype = np.dtype(STORE_DTYPES[dtype])
+        self.model_name = model_name
+        self.store_dir = Path(store_dir or os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_STORE_DIR))
+        self.stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.manifest_path = self.store_dir / f"{self.stem}.manifest.json"
+        self.manifest: Optional[Dict] = None
+        self._row_lookup = (None, {})
+        # (manifest mtime_ns, size) -> (matrix, manifest) of the last load()
+        self._loaded = (None, None)
+        self.logger = logger
+
+    def load(self):
+        """
+        Memory-map the stored matrix.
+
+        The mapping and parsed manifest are reused until the manifest file
+        changes (size or mtime), so repeated calls do not re-parse it.
+
+        Returns:
+            (matrix, manifest), or None if nothing usable is stored
+        """
+        try:
+            stat = self.manifest_path.stat()
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        if self._loaded[0] == key:
+            return self._loaded[1]
+
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get("format") not in READABLE_FORMATS or manifest.get("model") != self.model_name:
+                return None
+            matrix = np.load(self.store_dir / manifest["matrix"], mmap_mode='r')
+        except (OSError, ValueError, KeyError) as e:
+            if self.manifest_path.exists():
+                self.logger.warning(f"⚠️ Ignoring unreadable embedding store {self.manifest_path.name}: {e}")
+            return None
+
+        if matrix.ndim != 2 or matrix.shape[0] != len(manifest["hashes"]):
+            self.logger.warning(f"⚠️ Embedding store {self.manifest_path.name} does not match its manifest")
+            return None
+        self.manifest = manifest
+        self._loaded = (key, (matrix, manifest))
+        return matrix, manifest
+
+    def save(self, matrix: np.ndarray, hashes: Sequence[str]) -> Dict:
+        """
+        Write matrix and manifest; the manifest is swapped in last.
+
+        Returns:
+            The manifest
+        """
+        matrix = np.ascontiguousarray(normalize_rows(matrix), dtype=self.dtype)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        # Per-process temp names: several workers may start at the same time
+        tmp_matrix = self.store_dir / f"{self.stem}.{os.getpid()}.npy.tmp"
+        with open(tmp_matrix, 'wb') as f:
+            np.save(f, matrix)
+        digest = hashlib.sha256()
+        with open(tmp_matrix, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        matrix_path = self.store_dir / f"{self.stem}.{digest.hexdigest()[:12]}.npy"
+        os.replace(tmp_matrix, matrix_path)
+
+        manifest = {
+            "format": STORE_FORMAT,
+            "model": self.model_name,
+            "matrix": matrix_path.name,
+            "count": int(matrix.shape[0]),
+            "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+            "dtype": matrix.dtype.str,
+            "created_at": datetime.now().isoformat(),
+            "hashes": list(hashes)
+        }
+        tmp_manifest = self.store_dir / f"{self.manifest_path.name}.{os.getpid()}.tmp"
+        with open(tmp_manifest, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest, self.manifest_path)
+        self._loaded = (None, None)
+
+        # Drop superseded matrices (open mappings stay valid until unmapped)
+        for old in self.store_dir.glob(f"{self.stem}.*.npy"):
+            if old != matrix_path:
+                old.unlink(missing_ok=True)
+        self.manifest = manifest
+        return manifest
+
+    @property
+    def matrix_id(self) -> Optional[str]:
+        """Content hash (12 hex chars) of the current matrix file"""
+        if self.manifest is None:
+            return None
+        return self.manifest["matrix"][len(self.stem) + 1:-len(".npy")]
+
+    def index_path(self, kind: str, suffix: str) -> Optional[Path]:
+        """Where an index (or other derived artifact) of this kind over the current matrix lives"""
+        if self.manifest is None:
+            return None
+        return self.store_dir / f"{self.stem}.{kind}.{self.matrix_id}.{suffix}"
+
+    def save_index(self, index, path: Path):
+        """Persist an ANN index atomically and drop indexes of older matrices"""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        index.save(tmp_path)
+        os.replace(tmp_path, path)
+        # Side files (e.g. a faiss report) follow the same naming
+        for side in self.store_dir.glob(f"{tmp_path.name}.*"):
+            os.replace(side, path.with_name(path.name + side.name[len(tmp_path.name):]))
+
+        for old in self.store_dir.glob(f"{self.stem}.{index.kind}.*"):
+            if not old.name.startswith(path.name):
+                old.unlink(missing_ok=True)
+
+    def lookup(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Stored (normalized) rows for whichever of the content hashes are in the store"""
+        stored = self.load()
+        if stored is None:
+            return {}
+        matrix, manifest = stored
+        if self._row_lookup[0] != manifest["matrix"]:
+            self._row_lookup = (manifest["matrix"], {h: row for row, h in enumerate(manifest["hashes"])})
+        rows = self._row_lookup[1]
+        return {h: np.asarray(matrix[rows[h]], dtype=np.float32) for h in hashes if h in rows}
+
+    def sync(
+        self,
+        texts: Sequence[str],
+        embed: Callable[[List[str]], np.ndarray],
+        keep_extra: bool = False
+    ):
+        """
+        Embeddings for texts, embedding only those not already stored.
+
+        Args:
+            texts: Document texts, in retriever order
+            embed: Embeds a list of texts, returns (len(texts), dim)
+            keep_extra: Keep stored rows of documents not in texts (e.g. PDFs
+                that are still being ingested) instead of dropping them
+
+        Returns:
+            (unit-normalized matrix aligned with texts, memory-mapped when
+            possible; SyncStats)
+        """
+        start = time.perf_counter()
+        hashes = [content_hash(text) for text in texts]
+
+        stored = self.load()
+        stored_rows: Dict[str, int] = {}
+        matrix = None
+        if stored is not None:
+            matrix, manifest = stored
+            for row, h in enumerate(manifest["hashes"]):
+                stored_rows.setdefault(h, row)
+
+            # Nothing changed: serve the mapping as is
+            current = manifest["format"] == STORE_FORMAT and matrix.dtype == self.dtype
+            if current and manifest["hashes"] == hashes:
+                stats = SyncStats(len(texts), len(texts), 0, 0, False, time.perf_counter() - start)
+                return matrix, stats
+            # texts are the first rows of the store: serve that prefix as is
+            if keep_extra and current and manifest["hashes"][:len(hashes)] == hashes:
+                stats = SyncStats(len(texts), len(texts), 0, 0, False, time.perf_counter() - start,
+                                  retained=len(manifest["hashes"]) - len(hashes))
+                return matrix[:len(texts)], stats
+
+        # Embed each new text once, even if it appears several times
+        missing: Dict[str, int] = {}
+        for i, h in enumerate(hashes):
+            if h not in stored_rows and h not in missing:
+                missing[h] = i
+        new_rows: Dict[str, np.ndarray] = {}
+        if missing:
+            vectors = np.asarray(embed([texts[i] for i in missing.values()]), dtype=np.float32)
+            new_rows = dict(zip(missing.keys(), vectors))
+
+        if matrix is not None and stored_rows:
+            dim = matrix.shape[1]
+        elif new_rows:
+            dim = len(next(iter(new_rows.values())))
+        else:
+            dim = 0
+        # Rows of other documents go after the requested ones
+        wanted = set(hashes)
+        extra = [h for h in stored_rows if h not in wanted] if keep_extra else []
+        result = np.empty((len(texts) + len(extra), dim), dtype=np.float32)
+        reused = 0
+        for i, h in enumerate(hashes):
+            if h in new_rows:
+                result[i] = new_rows[h]
+            else:
+                result[i] = matrix[stored_rows[h]]
+                reused += 1
+        for i, h in enumerate(extra, len(texts)):
+            result[i] = matrix[stored_rows[h]]
+
+        removed = 0 if keep_extra else len(set(stored_rows) - wanted)
+        self.save(result, list(hashes) + extra)
+
+        stats = SyncStats(len(texts), reused, len(missing), removed, True, time.perf_counter() - start,
+                          retained=len(extra))
+        # Serve from the page cache like a warm start would
+        reloaded = self.load()
+        return (reloaded[0] if reloaded is not None else result)[:len(texts)], stats
@@ -0,0 +1,312 @@
+"""
+KB Snapshot - The whole knowledge base in one versioned file.
+
+A cold instance would otherwise rebuild DataLoader.documents from the CSV,
+JSON, markdown and PDF sources, re-tokenize them for the keyword index and
+sync the embeddings. A snapshot holds all of that, ready to use:
+
+    magic (8 bytes) | header length (uint64, little endian) | JSON header | sections
+
+The header carries the format, the embedding model, the hash of every
+source file the loader reads, and the offset, dtype and shape of each
+section. Sections are 64-byte aligned raw arrays, so the embedding matrix
+and the keyword posting lists are memory-mapped rather than read.
+
+Sections:
+    documents        JSON list of document dicts (source, content, metadata, ...)
+    datasets         JSON {name: DataFrame in pandas "split" orientation, with dtypes}
+    embeddings       unit-normalized matrix aligned with documents (optional)
+    bm25_*           keyword index posting lists (see BM25Index.to_arrays)
+    ann_*            ANN index over the embeddings, e.g. IVF centroids and lists
+                     (optional; see IVFIndex.to_arrays). Its kind and build
+                     report are in the header, so loading it neither retrains
+                     nor re-evaluates it.
+
+Build one with `python -m backend.scripts.build_kb_snapshot`. A snapshot is
+fresh while every source file has the recorded size and mtime, or else the
+recorded SHA-256; anything else means a full rebuild.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.data_knowledge_layer.ann_index import ANN_CLASSES, FAISS_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "kb-snapshot-v1"
+MAGIC = b"TCOKBSNP"
+ALIGNMENT = 64
+
+DEFAULT_SNAPSHOT_PATH = Path(__file__).parent.parent / "data" / "cache" / "kb_snapshot.bin"
+
+
+def snapshot_path(path: Optional[Path] = None) -> Path:
+    """Snapshot location: explicit path, then KB_SNAPSHOT_PATH, then data/cache/kb_snapshot.bin"""
+    return Path(path or os.getenv("KB_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH))
+
+
+def _sha256(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_manifest(paths: Sequence[Path], previous: Optional[Dict] = None) -> Dict[str, Optional[Dict]]:
+    """
+    {file name: {size, mtime_ns, sha256}} for the source files (None if missing).
+
+    Hashes from `previous` are reused for files whose size and mtime are unchanged.
+    """
+    previous = previous or {}
+    manifest = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            manifest[path.name] = None
+            continue
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        known = previous.get(path.name)
+        if known and known["size"] == entry["size"] and known["mtime_ns"] == entry["mtime_ns"]:
+            entry["sha256"] = known["sha256"]
+        else:
+            entry["sha256"] = _sha256(path)
+        manifest[path.name] = entry
+    return manifest
+
+
+def diff_sources(recorded: Dict[str, Optional[Dict]], paths: Sequence[Path]) -> Tuple[Dict[str, List[str]], Dict]:
+    """
+    Compare the source files with a recorded manifest.
+
+    Returns:
+        ({"added": [...], "modified": [...], "removed": [...]}, current manifest)
+    """
+    current = source_manifest(paths, recorded)
+    names = sorted(current.keys() | recorded.keys())
+    was = {name for name in names if recorded.get(name) is not None}
+    now = {name for name in names if current.get(name) is not None}
+    changes = {
+        "added": [name for name in names if name in now and name not in was],
+        "modified": [
+            name for name in names
+            if name in now and name in was and current[name]["sha256"] != recorded[name]["sha256"]
+        ],
+        "removed": [name for name in names if name in was and name not in now]
+    }
+    return changes, current
+
+
+def stale_sources(recorded: Dict[str, Optional[Dict]], paths: Sequence[Path]) -> List[str]:
+    """Names of source files that were added, removed or modified since the snapshot"""
+    changes, _ = diff_sources(recorded, paths)
+    return sorted(name for names in changes.values() for name in names)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _json_default(value):
+    # numpy scalars (e.g. metadata taken from DataFrame rows) keep their Python type
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def _blob(data) -> np.ndarray:
+    return np.frombuffer(json.dumps(data, ensure_ascii=False, default=_json_default).encode('utf-8'), dtype=np.uint8)
+
+
+def write_snapshot(
+    path: Path,
+    documents: Sequence[Dict],
+    datasets: Dict[str, pd.DataFrame],
+    keyword_arrays: Dict[str, np.ndarray],
+    sources: Dict[str, Optional[Dict]],
+    embeddings: Optional[np.ndarray] = None,
+    embedding_model: Optional[str] = None,
+    vector_index=None
+) -> Dict:
+    """
+    Write a snapshot atomically (temp file, then rename).
+
+    vector_index is stored when it is an approximate index over exactly the
+    embeddings (exact search needs nothing beyond the matrix).
+
+    Returns:
+        The header
+    """
+    if embeddings is not None and embeddings.shape[0] != len(documents):
+        raise ValueError(f"Embeddings have {embeddings.shape[0]} rows for {len(documents)} documents")
+
+    sections = {
+        "documents": _blob(list(documents)),
+        "datasets": _blob({
+            name: {"frame": df.to_json(orient="split", date_format="iso"), "dtypes": df.dtypes.astype(str).to_dict()}
+            for name, df in datasets.items()
+        }),
+        **{f"bm25_{name}": array for name, array in keyword_arrays.items()}
+    }
+    index_info = None
+    if embeddings is not None:
+        sections["embeddings"] = np.ascontiguousarray(embeddings)
+        if (
+            vector_index is not None and vector_index.kind in ANN_CLASSES
+            and hasattr(vector_index, "to_arrays") and vector_index.matrix.shape[0] == embeddings.shape[0]
+        ):
+            index_info = {"kind": vector_index.kind, "report": vector_index.report}
+            sections.update({f"ann_{name}": np.asarray(array) for name, array in vector_index.to_arrays().items()})
+
+    layout = {}
+    offset = 0
+    for name, array in sections.items():
+        offset = _align(offset)
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset += array.nbytes
+
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "created_at": datetime.now().isoformat(),
+        "documents": len(documents),
+        "embedding_model": embedding_model if embeddings is not None else None,
+        "vector_index": index_info,
+        "sources": sources,
+        "sections": layout
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes)
+        for name, array in sections.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return header
+
+
+class KBSnapshot:
+    """
+    An opened snapshot. Arrays are memory-mapped; documents and datasets are
+    decoded on first access.
+    """
+
+    def __init__(self, path: Path, header: Dict, data_start: int):
+        self.path = path
+        self.header = header
+        self.data_start = data_start
+        self._documents = None
+
+    @classmethod
+    def open(cls, path: Path) -> "KBSnapshot":
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("not a knowledge-base snapshot")
+            (header_length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_length))
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"unsupported snapshot format {header.get('format')}")
+        return cls(path, header, _align(len(MAGIC) + 8 + header_length))
+
+    def section(self, name: str) -> Optional[np.ndarray]:
+        """Read-only memory map of a section (None if absent)"""
+        layout = self.header["sections"].get(name)
+        if layout is None:
+            return None
+        shape = tuple(layout["shape"])
+        if 0 in shape:
+            return np.empty(shape, dtype=layout["dtype"])
+        return np.memmap(self.path, dtype=layout["dtype"], mode='r', offset=self.data_start + layout["offset"], shape=shape)
+
+    @property
+    def sources(self) -> Dict[str, Optional[Dict]]:
+        return self.header["sources"]
+
+    @property
+    def documents(self):
+        if self._documents is None:
+            self._documents = json.loads(self.section("documents").tobytes())
+        return self._documents
+
+    @property
+    def datasets(self) -> Dict[str, pd.DataFrame]:
+        frames = json.loads(self.section("datasets").tobytes())
+        return {
+            name: pd.read_json(io.StringIO(data["frame"]), orient="split", dtype=False).astype(data["dtypes"])
+            for name, data in frames.items()
+        }
+
+    @property
+    def keyword_arrays(self) -> Dict[str, np.ndarray]:
+        return {name[len("bm25_"):]: self.section(name) for name in self.header["sections"] if name.startswith("bm25_")}
+
+    def embeddings_for(self, model_name: str) -> Optional[np.ndarray]:
+        """The embedding matrix if it was computed with model_name"""
+        if self.header.get("embedding_model") != model_name:
+            return None
+        return self.section("embeddings")
+
+    def vector_index_for(self, model_name: str, matrix: np.ndarray):
+        """
+        The ANN index stored over matrix (the snapshot embeddings of model_name).
+
+        Returns:
+            IVFIndex or FaissHNSWIndex with its build report, or None (not
+            stored, other model, faiss missing or unreadable)
+        """
+        info = self.header.get("vector_index")
+        if info is None or self.header.get("embedding_model") != model_name:
+            return None
+        if info["kind"] == "faiss" and not FAISS_AVAILABLE:
+            return None
+        try:
+            arrays = {name[len("ann_"):]: self.section(name) for name in self.header["sections"] if name.startswith("ann_")}
+            index = ANN_CLASSES[info["kind"]].from_arrays(arrays, matrix)
+        except (KeyError, ValueError, RuntimeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable {info['kind']} index in the knowledge-base snapshot: {e}")
+            return None
+        index.report = info.get("report") or {}
+        return index
+
+
+def load_fresh_snapshot(path: Path, source_paths: Sequence[Path]) -> Optional[KBSnapshot]:
+    """
+    Open the snapshot at path if it is current for the given source files.
+
+    Returns:
+        KBSnapshot with documents decoded, or None (missing, unreadable or stale)
+    """
+    if not path.exists():
+        return None
+    start = time.perf_counter()
+    try:
+        snapshot = KBSnapshot.open(path)
+        changed = stale_sources(snapshot.sources, source_paths)
+        if changed:
+            shown = ", ".join(changed[:5]) + (" ..." if len(changed) > 5 else "")
+            logger.info(f"📦 Knowledge-base snapshot is stale ({len(changed)} sources changed: {shown})")
+            return None
+        snapshot.documents
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"⚠️ Ignoring unreadable knowledge-base snapshot {path.name}: {e}")
+        return None
+    logger.info(
+        f"📦 Opened knowledge-base snapshot {path.name} ({len(snapshot.documents)} documents) "
+        f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+    return snapshot
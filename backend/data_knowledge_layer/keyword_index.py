@@ -0,0 +1,211 @@
+"""
+Keyword Index - BM25 over an inverted index of the knowledge base.
+
+Documents are tokenized once when they are added; each term keeps a posting
+list of (document position, term frequency). A query only reads the posting
+lists of its own terms, so keyword retrieval cost follows how common the
+query terms are rather than the size of the corpus.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.data_knowledge_layer.metadata_index import fit_mask
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens (letters, digits, underscore)"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k highest scores, best first (argpartition + sort of k)"""
+    top_k = min(top_k, scores.shape[0])
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if top_k < scores.shape[0]:
+        candidates = np.argpartition(scores, -top_k)[-top_k:]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+class BM25Index:
+    """
+    Append-only inverted index with BM25 scoring.
+
+    Document ids are positions in the indexed document list. sync() indexes
+    documents appended since the last call and rebuilds if the list was
+    replaced or shrank. Safe to query from several threads.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._doc_lengths: List[int] = []
+        self._doc_lengths_array = np.empty(0, dtype=np.float64)
+        self._total_length = 0
+        self._source_id = None
+
+    @property
+    def n_docs(self) -> int:
+        return len(self._doc_lengths)
+
+    @property
+    def n_terms(self) -> int:
+        return len(self._postings)
+
+    def add(self, text: str) -> int:
+        """Index one document; returns its id"""
+        with self._lock:
+            return self._add(text)
+
+    def _add(self, text: str) -> int:
+        doc_id = len(self._doc_lengths)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            ids, tfs = self._postings.setdefault(term, ([], []))
+            if not isinstance(ids, list):
+                # Restored from arrays (see from_arrays): make it appendable
+                ids, tfs = self._postings[term] = (ids.tolist(), tfs.tolist())
+            ids.append(doc_id)
+            tfs.append(tf)
+            self._arrays.pop(term, None)
+
+        length = sum(counts.values())
+        self._doc_lengths.append(length)
+        self._total_length += length
+        return doc_id
+
+    def sync(self, documents: Sequence[Dict]):
+        """Bring the index up to date with a document list (dicts with 'content')"""
+        if self._source_id == id(documents) and len(documents) == self.n_docs:
+            return
+        with self._lock:
+            if self._source_id != id(documents) or len(documents) < self.n_docs:
+                self.clear()
+                self._source_id = id(documents)
+            for doc in documents[self.n_docs:]:
+                self._add(doc.get("content", ""))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        The index as flat arrays: newline-joined terms (uint8), per-term
+        offsets into the concatenated posting ids and term frequencies, and
+        document lengths. See from_arrays.
+        """
+        with self._lock:
+            terms = list(self._postings)
+            counts = np.fromiter((len(self._postings[term][0]) for term in terms), dtype=np.int64, count=len(terms))
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            ids = np.empty(offsets[-1], dtype=np.int32)
+            tfs = np.empty(offsets[-1], dtype=np.int32)
+            for term, start, end in zip(terms, offsets[:-1], offsets[1:]):
+                ids[start:end], tfs[start:end] = self._postings[term]
+            return {
+                "terms": np.frombuffer("\n".join(terms).encode('utf-8'), dtype=np.uint8),
+                "offsets": offsets,
+                "ids": ids,
+                "tfs": tfs,
+                "doc_lengths": np.asarray(self._doc_lengths, dtype=np.int64)
+            }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], documents: Optional[Sequence[Dict]] = None) -> "BM25Index":
+        """
+        Index restored from to_arrays() output (arrays may be memory-mapped).
+
+        Args:
+            documents: The document list the arrays were built from; sync()
+                then treats the index as up to date for it
+        """
+        index = cls()
+        raw_terms = bytes(arrays["terms"]).decode('utf-8')
+        terms = raw_terms.split("\n") if raw_terms else []
+        offsets, ids, tfs = arrays["offsets"], arrays["ids"], arrays["tfs"]
+        index._postings = {
+            term: (ids[start:end], tfs[start:end])
+            for term, start, end in zip(terms, offsets[:-1].tolist(), offsets[1:].tolist())
+        }
+        index._doc_lengths = arrays["doc_lengths"].tolist()
+        index._total_length = sum(index._doc_lengths)
+        if documents is not None:
+            if len(documents) != index.n_docs:
+                raise ValueError(f"Keyword index has {index.n_docs} documents, list has {len(documents)}")
+            index._source_id = id(documents)
+        return index
+
+    def _posting_arrays(self, term: str):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            ids, tfs = self._postings[term]
+            arrays = (np.asarray(ids, dtype=np.int64), np.asarray(tfs, dtype=np.float64))
+            self._arrays[term] = arrays
+        return arrays
+
+    def search(self, query: str, top_k: int = 5, mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        BM25 ranking of the documents containing at least one query term.
+
+        Args:
+            query: Query text
+            top_k: Number of results
+            mask: Optional boolean row mask; other documents are never scored
+
+        Returns:
+            (document id, score) pairs, best first
+        """
+        with self._lock:
+            terms = [term for term in dict.fromkeys(tokenize(query)) if term in self._postings]
+            if not terms or top_k <= 0:
+                return []
+
+            if self._doc_lengths_array.shape[0] != self.n_docs:
+                self._doc_lengths_array = np.array(self._doc_lengths, dtype=np.float64)
+            doc_lengths = self._doc_lengths_array
+            n_docs = self.n_docs
+            avg_length = self._total_length / n_docs if self._total_length else 1.0
+            postings = [self._posting_arrays(term) for term in terms]
+
+        if mask is not None:
+            # The mask may predate documents added since; size it to the postings read above
+            mask = fit_mask(mask, n_docs)
+
+        ids_parts, score_parts = [], []
+        for ids, tfs in postings:
+            # IDF from the whole corpus; the mask only removes candidates
+            idf = math.log(1 + (n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            if mask is not None:
+                keep = mask[ids]
+                ids, tfs = ids[keep], tfs[keep]
+            norm = self.k1 * (1 - self.b + self.b * doc_lengths[ids] / avg_length)
+            ids_parts.append(ids)
+            score_parts.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+
+        if not any(len(ids) for ids in ids_parts):
+            return []
+
+        # Sum contributions per candidate document
+        candidates, inverse = np.unique(np.concatenate(ids_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+
+        order = top_k_indices(scores, top_k)
+        return [(int(candidates[i]), float(scores[i])) for i in order]
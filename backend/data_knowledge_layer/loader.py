@@ -9,22 +9,47 @@ Datasets:
 """
 
 import os
+import time
+import functools
+import itertools
 import logging
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.data_knowledge_layer.kb_snapshot import (
+    KBSnapshot, diff_sources, load_fresh_snapshot, snapshot_path, source_manifest
+)
+from backend.data_knowledge_layer.keyword_index import BM25Index
+from backend.data_knowledge_layer.pdf_ingest import (
+    DEFAULT_CHUNK_CHARS, DEFAULT_CHUNK_OVERLAP, PDF_SUPPORT, chunk_text, iter_pdf_results
+)
+from backend.services.concurrency import run_blocking
 
 logger = logging.getLogger(__name__)
 
-# PDF processing - optional dependency
-try:
-    import PyPDF2
-    PDF_SUPPORT = True
-except ImportError:
-    PDF_SUPPORT = False
+if not PDF_SUPPORT:
     logger.warning("⚠️ PyPDF2 not installed - PDF support disabled. Install with: pip install pypdf2")
 
 
+# Markdown documentation of the real data sources (see _load_real_data_sources)
+REAL_DATA_SOURCE_FILES = [
+    ("SUBSIDY_SOURCES.md", "Government Subsidy Programs - Real Data"),
+    ("CARBON_TAX_SOURCES.md", "Carbon Tax Rates - Real Data"),
+    ("CHIP_COST_SOURCES.md", "Chip Manufacturing Costs - Real Data"),
+    ("MAINTENANCE_SOURCES.md", "Equipment Maintenance Costs - Real Data"),
+    ("CARBON_FOOTPRINT_SOURCES.md", "Carbon Footprint LCA - Real Data"),
+]
+
+# Other files load_all_datasets reads (PDFs are globbed)
+DATASET_FILES = ["jrc_semiconductor_data.csv", "material_properties.csv", "global_electricity_data_2025.json"]
+
+
+def _take(iterator: Iterator, n: int) -> List:
+    """Up to n next items of iterator"""
+    return list(itertools.islice(iterator, n))
+
+
 class DataLoader:
     """
     Loads and manages knowledge base datasets.
@@ -42,28 +67,47 @@ class DataLoader:
         
         self.datasets: Dict[str, pd.DataFrame] = {}
         self.documents: List[Dict] = []
+        self.keyword_index = BM25Index()
+        # PDFs left for stream_pdf_documents() by load_all_datasets(include_pdfs=False)
+        self.pdfs_pending = False
+        # Set when the knowledge base came from a snapshot (see load_from_snapshot)
+        self.snapshot: Optional[KBSnapshot] = None
+        # Size/mtime/hash of the source files the documents were loaded from (see changed_sources)
+        self.source_manifest: Dict[str, Optional[Dict]] = {}
         
         self.logger = logger
     
-    async def load_all_datasets(self):
-        """Load all available datasets"""
+    async def load_all_datasets(self, include_pdfs: bool = True):
+        """
+        Load all available datasets.
+        
+        Args:
+            include_pdfs: Also load PDF documents now. With False, PDFs are left
+                for stream_pdf_documents() so startup does not wait for them.
+        """
         self.logger.info("📚 Loading knowledge base datasets...")
         
+        # Recorded before reading, so edits made while loading show up as changes
+        self.source_manifest = await run_blocking("ingestion", source_manifest, self.source_files())
+        
         try:
             # Load static datasets
-            await self._load_semiconductor_data()
+            await self._load_source("jrc_semiconductor_data.csv")
             # await self._load_energy_prices()  # DEPRECATED: Using eu_energy_prices_2025.json instead (moved to deprecated/)
-            await self._load_material_properties()
+            await self._load_source("material_properties.csv")
             await self._load_chips_act_docs()
             
             # Load REAL data source documentation (NEW - Oct 2025)
             await self._load_real_data_sources()
             
             # Load updated energy prices 2024-2025 (NEW - Oct 2025)
-            await self._load_energy_prices_2025()
+            await self._load_source("global_electricity_data_2025.json")
             
             # Load PDF documents (EU Chips Act, policy docs)
-            await self._load_pdf_documents()
+            if include_pdfs:
+                await self._load_pdf_documents()
+            else:
+                self.pdfs_pending = PDF_SUPPORT and any(self.data_path.glob("*.pdf"))
             
             self.logger.info(f"✅ Loaded {len(self.datasets)} datasets, {len(self.documents)} documents")
         
@@ -71,6 +115,98 @@ class DataLoader:
             self.logger.error(f"❌ Dataset loading failed: {e}")
             # Create mock datasets for fallback
             self._create_mock_datasets()
+        
+        # Build the keyword index once; later appends are indexed incrementally
+        self.keyword_index.sync(self.documents)
+        self.logger.info(f"🔤 Keyword index: {self.keyword_index.n_docs} documents, {self.keyword_index.n_terms:,} terms")
+    
+    def _source_loaders(self) -> Dict:
+        """Loader coroutine function of each (non-PDF) source file"""
+        loaders = {
+            "jrc_semiconductor_data.csv": self._load_semiconductor_data,
+            "material_properties.csv": self._load_material_properties,
+            "global_electricity_data_2025.json": self._load_energy_prices_2025,
+        }
+        for filename, title in REAL_DATA_SOURCE_FILES:
+            loaders[filename] = functools.partial(self._load_real_data_source, filename, title)
+        return loaders
+    
+    async def _load_source(self, name: str):
+        """Load one source file, tagging its documents with source_file (used by hot reload)"""
+        start = len(self.documents)
+        result = await self._source_loaders()[name]()
+        for doc in self.documents[start:]:
+            doc["source_file"] = name
+        return result
+    
+    async def changed_sources(self) -> Tuple[Dict[str, List[str]], Dict[str, Optional[Dict]]]:
+        """
+        Source files added, modified or removed since the documents were loaded.
+        
+        Returns:
+            ({"added": [...], "modified": [...], "removed": [...]}, current source manifest)
+        """
+        return await run_blocking("ingestion", diff_sources, self.source_manifest, self.source_files())
+    
+    async def load_source_documents(self, names: Sequence[str]) -> List[Dict]:
+        """
+        Documents of the given source files, loaded afresh.
+        
+        The documents are returned, not added to self.documents; datasets the
+        files define are replaced in self.datasets.
+        """
+        scratch = DataLoader(self.data_path)
+        pdf_files = []
+        for name in names:
+            if name.endswith(".pdf"):
+                pdf_files.append(self.data_path / name)
+            elif name in scratch._source_loaders():
+                await scratch._load_source(name)
+        
+        if pdf_files and PDF_SUPPORT:
+            stats = {"loaded": 0, "parsed": 0, "chunks": 0}
+            scratch.documents.extend(await run_blocking("ingestion", list, scratch._iter_pdf_documents(pdf_files, stats)))
+        
+        self.datasets.update(scratch.datasets)
+        return scratch.documents
+    
+    def source_files(self) -> List[Path]:
+        """Files the knowledge base is built from (whether or not they exist)"""
+        names = DATASET_FILES + [filename for filename, _ in REAL_DATA_SOURCE_FILES]
+        return [self.data_path / name for name in names] + sorted(self.data_path.glob("*.pdf"))
+    
+    async def load_from_snapshot(self, path: Optional[Path] = None) -> bool:
+        """
+        Load documents, datasets and the keyword index from a knowledge-base
+        snapshot (see kb_snapshot), if one exists and its sources are unchanged.
+        
+        Returns:
+            True if the snapshot was used; False means load_all_datasets() is needed
+        """
+        path = snapshot_path(path)
+        snapshot = await run_blocking("ingestion", load_fresh_snapshot, path, self.source_files())
+        if snapshot is None:
+            return False
+        
+        try:
+            documents = snapshot.documents
+            keyword_index = BM25Index.from_arrays(snapshot.keyword_arrays, documents)
+            datasets = snapshot.datasets
+        except (KeyError, ValueError) as e:
+            self.logger.warning(f"⚠️ Ignoring inconsistent knowledge-base snapshot: {e}")
+            return False
+        
+        self.documents = documents
+        self.datasets = datasets
+        self.keyword_index = keyword_index
+        self.snapshot = snapshot
+        self.source_manifest = snapshot.sources
+        self.logger.info(
+            f"✅ Loaded {len(self.datasets)} datasets, {len(self.documents)} documents from snapshot "
+            f"({self.keyword_index.n_terms:,} terms"
+            f"{', embeddings: ' + snapshot.header['embedding_model'] if snapshot.header['embedding_model'] else ''})"
+        )
+        return True
     
     async def _load_semiconductor_data(self):
         """Load EU JRC semiconductor capacity and energy data"""
@@ -247,69 +383,66 @@ class DataLoader:
         - MAINTENANCE_SOURCES.md: Industry benchmarks from TSMC, Intel, SEMI E10
         - CARBON_FOOTPRINT_SOURCES.md: LCA studies from IEEE, company reports
         """
-        source_files = [
-            ("SUBSIDY_SOURCES.md", "Government Subsidy Programs - Real Data"),
-            ("CARBON_TAX_SOURCES.md", "Carbon Tax Rates - Real Data"),
-            ("CHIP_COST_SOURCES.md", "Chip Manufacturing Costs - Real Data"),
-            ("MAINTENANCE_SOURCES.md", "Equipment Maintenance Costs - Real Data"),
-            ("CARBON_FOOTPRINT_SOURCES.md", "Carbon Footprint LCA - Real Data"),
-        ]
-        
         loaded_count = 0
-        for filename, title in source_files:
-            file_path = self.data_path / filename
-            
-            if file_path.exists():
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Split into sections (by ## headers)
-                    sections = content.split('\n## ')
-                    
-                    # First section is title, add as overview
-                    if sections:
+        for filename, _ in REAL_DATA_SOURCE_FILES:
+            loaded_count += await self._load_source(filename)
+        
+        self.logger.info(f"📄 Loaded {loaded_count}/5 real data source files")
+    
+    async def _load_real_data_source(self, filename: str, title: str) -> bool:
+        """Load one real data source markdown file as overview + section documents"""
+        file_path = self.data_path / filename
+        
+        if file_path.exists():
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                
+                # Split into sections (by ## headers)
+                sections = content.split('\n## ')
+                
+                # First section is title, add as overview
+                if sections:
+                    self.documents.append({
+                        "source": f"{title} (Complete Document)",
+                        "content": sections[0][:2000],  # First 2000 chars as overview
+                        "metadata": {
+                            "type": "real_data_source",
+                            "file": filename,
+                            "section": "overview",
+                            "year": 2025
+                        },
+                        "url": f"file://{file_path}",
+                        "confidence": 1.0  # Real data = highest confidence
+                    })
+                
+                # Add each section as separate document for better retrieval
+                for i, section in enumerate(sections[1:], 1):
+                    if len(section) > 100:  # Skip very small sections
+                        section_title = section.split('\n')[0].strip()
+                        section_content = '\n'.join(section.split('\n')[1:])
+                        
                         self.documents.append({
-                            "source": f"{title} (Complete Document)",
-                            "content": sections[0][:2000],  # First 2000 chars as overview
+                            "source": f"{title} - {section_title}",
+                            "content": section_content[:3000],  # Max 3000 chars per section
                             "metadata": {
                                 "type": "real_data_source",
                                 "file": filename,
-                                "section": "overview",
+                                "section": section_title,
                                 "year": 2025
                             },
-                            "url": f"file://{file_path}",
-                            "confidence": 1.0  # Real data = highest confidence
+                            "url": f"file://{file_path}#{section_title}",
+                            "confidence": 1.0
                         })
-                    
-                    # Add each section as separate document for better retrieval
-                    for i, section in enumerate(sections[1:], 1):
-                        if len(section) > 100:  # Skip very small sections
-                            section_title = section.split('\n')[0].strip()
-                            section_content = '\n'.join(section.split('\n')[1:])
-                            
-                            self.documents.append({
-                                "source": f"{title} - {section_title}",
-                                "content": section_content[:3000],  # Max 3000 chars per section
-                                "metadata": {
-                                    "type": "real_data_source",
-                                    "file": filename,
-                                    "section": section_title,
-                                    "year": 2025
-                                },
-                                "url": f"file://{file_path}#{section_title}",
-                                "confidence": 1.0
-                            })
-                    
-                    loaded_count += 1
-                    self.logger.info(f"  ✅ Loaded {filename} ({len(sections)} sections)")
                 
-                except Exception as e:
-                    self.logger.warning(f"  ⚠️ Failed to load {filename}: {e}")
-            else:
-                self.logger.warning(f"  ⚠️ {filename} not found (skipping)")
-        
-        self.logger.info(f"📄 Loaded {loaded_count}/5 real data source files")
+                self.logger.info(f"  ✅ Loaded {filename} ({len(sections)} sections)")
+                return True
+            
+            except Exception as e:
+                self.logger.warning(f"  ⚠️ Failed to load {filename}: {e}")
+        else:
+            self.logger.warning(f"  ⚠️ {filename} not found (skipping)")
+        return False
     
     async def _load_energy_prices_2025(self):
         """Load Global Day-Ahead Electricity Price Dataset with Carbon Intensity (Mendeley 2025)"""
@@ -375,123 +508,94 @@ class DataLoader:
         Load PDF documents from data directory.
         
         Supports EU Chips Act PDFs, policy documents, research papers.
-        PDFs are automatically extracted to text and chunked for RAG.
+        All chunks of every PDF are loaded (see stream_pdf_documents).
+        """
+        async for batch in self.stream_pdf_documents():
+            self.documents.extend(batch)
+    
+    async def stream_pdf_documents(self, batch_size: int = 64) -> AsyncIterator[List[Dict]]:
+        """
+        Yield PDF chunk documents in batches, as they are extracted.
         
-        OPTIMIZED: Only loads first 10 chunks per PDF for faster startup.
+        PDFs are extracted to text and chunked for RAG in a process pool;
+        text and chunks are cached by file hash (see pdf_ingest), so only
+        new or modified PDFs are parsed. Chunks are streamed from the cache
+        files, so no document is held in memory as a whole. Batches are not
+        added to self.documents; the caller decides where they go.
         """
         if not PDF_SUPPORT:
             self.logger.warning("⚠️ PDF support not available - skipping PDF loading")
             return
         
         # Look for PDFs in data directory
-        pdf_files = list(self.data_path.glob("*.pdf"))
+        pdf_files = sorted(self.data_path.glob("*.pdf"))
         
         if not pdf_files:
             self.logger.info("📄 No PDF files found in data directory")
             return
         
-        MAX_CHUNKS_PER_PDF = 10  # Limit chunks for performance
-        loaded_count = 0
-        for pdf_path in pdf_files:
-            try:
-                # Extract text from PDF
-                text = self._extract_pdf_text(pdf_path)
-                
-                if not text or len(text.strip()) < 100:
-                    self.logger.warning(f"  ⚠️ {pdf_path.name}: No text extracted (might be scanned/image PDF)")
-                    continue
-                
-                # Chunk text into documents (max 2000 chars per chunk for faster processing)
-                chunks = self._chunk_text(text, max_chars=2000, overlap=150)
-                
-                # OPTIMIZATION: Only keep first MAX_CHUNKS_PER_PDF chunks
-                chunks = chunks[:MAX_CHUNKS_PER_PDF]
-                
-                for i, chunk in enumerate(chunks, 1):
-                    self.documents.append({
-                        "source": f"{pdf_path.stem} (Part {i}/{len(chunks)})",
-                        "content": chunk,
-                        "metadata": {
-                            "type": "pdf_document",
-                            "file": pdf_path.name,
-                            "chunk": i,
-                            "total_chunks": len(chunks),
-                            "year": 2025
-                        },
-                        "url": f"file://{pdf_path}",
-                        "confidence": 0.95  # PDF documents = high confidence
-                    })
-                
-                loaded_count += 1
-                self.logger.info(f"  ✅ Loaded {pdf_path.name} ({len(chunks)} chunks, {len(text):,} chars)")
-            
-            except Exception as e:
-                self.logger.error(f"  ❌ Failed to load {pdf_path.name}: {e}")
-        
-        self.logger.info(f"📄 Loaded {loaded_count}/{len(pdf_files)} PDF documents (limited to {MAX_CHUNKS_PER_PDF} chunks/PDF for performance)")
-    
-    def _extract_pdf_text(self, pdf_path: Path) -> str:
-        """Extract text from PDF file"""
-        text = ""
-        
+        start = time.perf_counter()
+        stats = {"loaded": 0, "parsed": 0, "chunks": 0}
+        documents = self._iter_pdf_documents(pdf_files, stats)
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                
-                for page_num, page in enumerate(reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n\n"
-                    except Exception as e:
-                        self.logger.warning(f"  ⚠️ Error extracting page {page_num + 1}: {e}")
-        
-        except Exception as e:
-            self.logger.error(f"  ❌ Error reading PDF: {e}")
-        
-        return text.strip()
+            while True:
+                batch = await run_blocking("ingestion", _take, documents, batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            documents.close()
+            self.pdfs_pending = False
+        
+        self.logger.info(
+            f"📄 Loaded {stats['loaded']}/{len(pdf_files)} PDF documents ({stats['chunks']:,} chunks) "
+            f"in {time.perf_counter() - start:.2f}s ({stats['parsed']} parsed, "
+            f"{len(pdf_files) - stats['parsed']} from cache)"
+        )
     
-    def _chunk_text(self, text: str, max_chars: int = 3000, overlap: int = 200) -> List[str]:
-        """
-        Split text into overlapping chunks for better RAG retrieval.
-        
-        Args:
-            text: Text to chunk
-            max_chars: Maximum characters per chunk
-            overlap: Character overlap between chunks
-        
-        Returns:
-            List of text chunks
-        """
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            # Get chunk
-            end = start + max_chars
-            chunk = text[start:end]
+    def _iter_pdf_documents(self, pdf_files: List[Path], stats: Dict[str, int]) -> Iterator[Dict]:
+        """Chunk documents of every PDF (blocking; see stream_pdf_documents)"""
+        for result in iter_pdf_results(pdf_files, max_chars=DEFAULT_CHUNK_CHARS, overlap=DEFAULT_CHUNK_OVERLAP):
+            pdf_path = result.path
+            stats["parsed"] += not result.cached
+            for warning in result.warnings:
+                self.logger.warning(f"  ⚠️ {pdf_path.name}: {warning}")
             
-            # Try to break at sentence boundary
-            if end < len(text):
-                # Find last sentence end in chunk
-                last_period = chunk.rfind('. ')
-                last_newline = chunk.rfind('\n\n')
-                break_point = max(last_period, last_newline)
-                
-                if break_point > max_chars * 0.5:  # Only break if > 50% through chunk
-                    chunk = chunk[:break_point + 1]
-                    end = start + break_point + 1
+            if result.error:
+                self.logger.error(f"  ❌ Failed to load {pdf_path.name}: {result.error}")
+                continue
             
-            chunks.append(chunk.strip())
+            if result.chars < 100:
+                self.logger.warning(f"  ⚠️ {pdf_path.name}: No text extracted (might be scanned/image PDF)")
+                continue
             
-            # Move start with overlap
-            start = end - overlap
+            for i, chunk in enumerate(result.chunks, 1):
+                yield {
+                    "source": f"{pdf_path.stem} (Part {i}/{result.n_chunks})",
+                    "content": chunk,
+                    "metadata": {
+                        "type": "pdf_document",
+                        "file": pdf_path.name,
+                        "chunk": i,
+                        "total_chunks": result.n_chunks,
+                        "year": 2025
+                    },
+                    "url": f"file://{pdf_path}",
+                    "confidence": 0.95,  # PDF documents = high confidence
+                    "source_file": pdf_path.name
+                }
             
-            # Prevent infinite loop
-            if start >= len(text):
-                break
-        
-        return chunks
+            stats["loaded"] += 1
+            stats["chunks"] += result.n_chunks
+            origin = "cached" if result.cached else f"parsed {result.pages} pages"
+            self.logger.info(
+                f"  ✅ Loaded {pdf_path.name} ({result.n_chunks} chunks, {result.chars:,} chars; "
+                f"{origin} in {result.seconds * 1000:.0f} ms)"
+            )
+    
+    def _chunk_text(self, text: str, max_chars: int = 3000, overlap: int = 200) -> List[str]:
+        """Split text into overlapping chunks (see pdf_ingest.chunk_text)"""
+        return chunk_text(text, max_chars, overlap)
     
     def _create_mock_datasets(self):
         """Create minimal mock datasets for fallback"""
@@ -522,18 +626,8 @@ class DataLoader:
     
     def search_documents(self, query: str, top_k: int = 5) -> List[Dict]:
         """
-        Simple keyword search in documents.
+        BM25 keyword search in documents.
         This is a fallback when embeddings are not available.
         """
-        query_lower = query.lower()
-        
-        # Score documents by keyword matches
-        scored_docs = []
-        for doc in self.documents:
-            content_lower = doc["content"].lower()
-            score = sum(1 for word in query_lower.split() if word in content_lower)
-            scored_docs.append((score, doc))
-        
-        # Sort by score and return top_k
-        scored_docs.sort(reverse=True, key=lambda x: x[0])
-        return [doc for score, doc in scored_docs[:top_k] if score > 0]
+        self.keyword_index.sync(self.documents)
+        return [self.documents[doc_id] for doc_id, score in self.keyword_index.search(query, top_k)]
@@ -0,0 +1,167 @@
+"""
+Metadata Index - Precomputed filters over document metadata.
+
+Every document carries metadata such as type, country, material, year and
+file. Categorical fields keep a posting list of document positions per
+value; numeric fields keep one value per document. A filter turns into a
+boolean row mask with array operations only, so retrieval can restrict
+scoring to the candidate rows instead of over-retrieving and discarding.
+
+Filter syntax (all conditions must hold):
+    {"type": "policy"}                      equality (case-insensitive)
+    {"country": ["Germany", "France"]}      any of
+    {"year": {">=": 2024}}                  comparison (numeric fields)
+    {"year": {">=": 2023, "<": 2025}}       range
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+CATEGORICAL_FIELDS = ("type", "country", "material", "file")
+NUMERIC_FIELDS = ("year",)
+FILTER_FIELDS = CATEGORICAL_FIELDS + NUMERIC_FIELDS
+
+COMPARISONS = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+
+def _key(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+def fit_mask(mask: np.ndarray, n_rows: int) -> np.ndarray:
+    """
+    A row mask for exactly n_rows rows.
+
+    Documents appended after the mask was built are outside the filter
+    (padded with False); rows beyond n_rows are dropped.
+    """
+    if mask.shape[0] >= n_rows:
+        return mask[:n_rows]
+    return np.concatenate([mask, np.zeros(n_rows - mask.shape[0], dtype=bool)])
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class MetadataIndex:
+    """
+    Append-only per-field indexes over document metadata.
+
+    Like BM25Index, sync() indexes documents appended since the last call
+    and rebuilds if the list was replaced or shrank.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        self._postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in CATEGORICAL_FIELDS}
+        self._arrays: Dict[tuple, np.ndarray] = {}
+        self._numeric: Dict[str, List[float]] = {field: [] for field in NUMERIC_FIELDS}
+        self._numeric_arrays: Dict[str, np.ndarray] = {}
+        self._n_docs = 0
+        self._source_id = None
+
+    @property
+    def n_docs(self) -> int:
+        return self._n_docs
+
+    def _add(self, metadata: Dict):
+        doc_id = self._n_docs
+        for field in CATEGORICAL_FIELDS:
+            value = metadata.get(field)
+            if value is not None:
+                key = _key(value)
+                self._postings[field].setdefault(key, []).append(doc_id)
+                self._arrays.pop((field, key), None)
+        for field in NUMERIC_FIELDS:
+            self._numeric[field].append(_number(metadata.get(field)))
+        self._n_docs += 1
+
+    def sync(self, documents: Sequence[Dict]):
+        """Bring the index up to date with a document list (dicts with 'metadata')"""
+        if self._source_id == id(documents) and len(documents) == self._n_docs:
+            return
+        with self._lock:
+            if self._source_id != id(documents) or len(documents) < self._n_docs:
+                self.clear()
+                self._source_id = id(documents)
+            for doc in documents[self._n_docs:]:
+                self._add(doc.get("metadata") or {})
+
+    def values(self, field: str) -> List[str]:
+        """Distinct (lowercased) values of a categorical field"""
+        return sorted(self._postings.get(field, {}))
+
+    def _posting_array(self, field: str, key: str) -> np.ndarray:
+        array = self._arrays.get((field, key))
+        if array is None:
+            array = np.array(self._postings[field].get(key, []), dtype=np.int64)
+            self._arrays[(field, key)] = array
+        return array
+
+    def _numeric_array(self, field: str) -> np.ndarray:
+        array = self._numeric_arrays.get(field)
+        if array is None or array.shape[0] != self._n_docs:
+            array = np.array(self._numeric[field], dtype=np.float64)
+            self._numeric_arrays[field] = array
+        return array
+
+    def mask(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Boolean row mask of the documents matching every condition.
+
+        Returns:
+            (n_docs,) bool array, or None when filters is empty
+
+        Raises:
+            ValueError: Unknown field, operator or malformed condition
+        """
+        if not filters:
+            return None
+
+        with self._lock:
+            mask = np.ones(self._n_docs, dtype=bool)
+            for field, condition in filters.items():
+                if field not in FILTER_FIELDS:
+                    raise ValueError(f"Cannot filter on '{field}' (expected one of {', '.join(FILTER_FIELDS)})")
+
+                if isinstance(condition, dict):
+                    if field not in NUMERIC_FIELDS:
+                        raise ValueError(f"'{field}' only supports equality filters")
+                    values = self._numeric_array(field)
+                    for op, operand in condition.items():
+                        if op not in COMPARISONS:
+                            raise ValueError(f"Unknown operator '{op}' (expected one of {', '.join(COMPARISONS)})")
+                        target = _number(operand)
+                        if np.isnan(target):
+                            raise ValueError(f"'{field}' {op} requires a number, got {operand!r}")
+                        # Documents without a value never match (NaN compares False)
+                        with np.errstate(invalid='ignore'):
+                            mask &= COMPARISONS[op](values, target) & ~np.isnan(values)
+                    continue
+
+                wanted = condition if isinstance(condition, (list, tuple, set)) else [condition]
+                if field in NUMERIC_FIELDS:
+                    values = self._numeric_array(field)
+                    mask &= np.isin(values, [_number(v) for v in wanted])
+                else:
+                    field_mask = np.zeros(self._n_docs, dtype=bool)
+                    for value in wanted:
+                        field_mask[self._posting_array(field, _key(value))] = True
+                    mask &= field_mask
+            return mask
@@ -0,0 +1,359 @@
+"""
+PDF Ingest - Streaming PDF extraction and chunking with an on-disk cache.
+
+Every PDF is identified by the SHA-256 of its bytes. Two cache files hang off
+that hash:
+
+    <hash>.pages.txt                 extracted page texts, separated by form feeds
+    <hash>.<chunker key>.jsonl       header line (counts, timings), then one chunk per line
+
+The pipeline is built from generators (pages -> chunks -> cache file -> chunk
+iterator), so no stage holds a whole document as one string. An unchanged
+PDF costs a hash and a sequential read of its chunk file; a new chunker
+configuration re-chunks the cached pages without re-parsing; only new or
+modified PDFs are parsed, in a process pool (PyPDF2 is pure Python and holds
+the GIL). Results are yielded as soon as each file is ready, so callers can
+index documents while other files are still being parsed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# PDF processing - optional dependency
+try:
+    import PyPDF2
+    PDF_SUPPORT = True
+except ImportError:
+    PDF_SUPPORT = False
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "pdf_text"
+
+# Bump when chunking changes behaviour, so cached chunk files are recomputed
+CHUNKER_VERSION = 1
+DEFAULT_CHUNK_CHARS = 2000
+DEFAULT_CHUNK_OVERLAP = 150
+
+PAGE_SEPARATOR = "\f"
+PAGE_JOINER = "\n\n"
+
+
+def file_hash(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunker_key(max_chars: int, overlap: int) -> str:
+    return f"chunks-v{CHUNKER_VERSION}-{max_chars}-{overlap}"
+
+
+def iter_pdf_pages(pdf_path: Path, warnings: List[str]) -> Iterator[str]:
+    """Text of each page that has any; extraction errors are appended to warnings"""
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page_num, page in enumerate(reader.pages):
+            try:
+                page_text = page.extract_text()
+            except Exception as e:
+                warnings.append(f"Error extracting page {page_num + 1}: {e}")
+                continue
+            if page_text:
+                yield page_text
+
+
+def _cut(buffer: str, max_chars: int) -> int:
+    """Length of the next chunk when more text follows it (sentence/paragraph break past 50%)"""
+    chunk = buffer[:max_chars]
+    break_point = max(chunk.rfind('. '), chunk.rfind('\n\n'))
+    if break_point > max_chars * 0.5:  # Only break if > 50% through chunk
+        return break_point + 1
+    return max_chars
+
+
+def iter_chunks(pages: Iterable[str], max_chars: int = 3000, overlap: int = 200) -> Iterator[str]:
+    """
+    Overlapping chunks of the pages joined by blank lines, produced as pages arrive.
+
+    Identical to chunk_text(PAGE_JOINER.join(pages).strip(), ...), but only
+    buffers about one chunk plus one page of text.
+    """
+    buffer = ""
+    started = False
+    for page in pages:
+        if not page:
+            continue
+        if started:
+            buffer += PAGE_JOINER + page
+        else:
+            # Everything before the first non-blank page is stripped, joiners included
+            buffer = page.lstrip()
+            started = bool(buffer)
+
+        # More text follows the chunk: break at a sentence boundary if possible
+        while len(buffer.rstrip()) > max_chars:
+            end = _cut(buffer, max_chars)
+            yield buffer[:end].strip()
+            buffer = buffer[end - overlap:]
+
+    # Tail: the remaining text fits in one chunk (plus possible overlap chunks)
+    buffer = buffer.rstrip()
+    while buffer:
+        yield buffer[:max_chars].strip()
+        step = max_chars - overlap
+        if step >= len(buffer):
+            break
+        buffer = buffer[step:]
+
+
+def chunk_text(text: str, max_chars: int = 3000, overlap: int = 200) -> List[str]:
+    """
+    Split text into overlapping chunks for better RAG retrieval.
+
+    Chunks end at the last sentence or paragraph break past half of
+    max_chars when there is one; consecutive chunks share `overlap` chars.
+    """
+    return list(iter_chunks([text], max_chars, overlap))
+
+
+@dataclass
+class PDFResult:
+    """One PDF's chunks (read lazily from the cache) plus where they came from and what they cost"""
+    path: Path
+    chunks: Iterator[str] = field(default_factory=lambda: iter(()))
+    n_chunks: int = 0
+    chars: int = 0
+    pages: int = 0
+    cached: bool = False
+    seconds: float = 0.0
+    warnings: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class PDFTextCache:
+    """Page-text and chunk files per PDF content hash (see module docstring)"""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir or os.getenv("PDF_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+    def pages_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest[:32]}.pages.txt"
+
+    def chunks_path(self, digest: str, key: str) -> Path:
+        return self.cache_dir / f"{digest[:32]}.{key}.jsonl"
+
+    def iter_pages(self, digest: str, block_size: int = 1 << 20) -> Iterator[str]:
+        """Stream cached page texts"""
+        with open(self.pages_path(digest), encoding='utf-8') as f:
+            pending = ""
+            for block in iter(lambda: f.read(block_size), ""):
+                *pages, pending = (pending + block).split(PAGE_SEPARATOR)
+                yield from pages
+            if pending:
+                yield pending
+
+    def write_pages(self, digest: str, pages: Iterable[str]) -> Iterator[str]:
+        """Pass pages through while caching them; the file appears once all pages were read"""
+        path = self.pages_path(digest)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for i, page in enumerate(pages):
+                page = page.replace(PAGE_SEPARATOR, " ")
+                f.write((PAGE_SEPARATOR if i else "") + page)
+                yield page
+        os.replace(tmp_path, path)
+
+    def write_chunks(self, digest: str, key: str, chunks: Iterable[str], header: Callable[[], Dict]) -> Dict:
+        """
+        Stream chunks to the chunk file, then prepend a header with the counts.
+
+        Args:
+            header: Called once the chunks are exhausted, for fields such as page counts
+
+        Returns:
+            The header
+        """
+        path = self.chunks_path(digest, key)
+        body_path = path.with_name(f"{path.name}.{os.getpid()}.body")
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        count = 0
+        with open(body_path, 'w', encoding='utf-8') as body:
+            for chunk in chunks:
+                body.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+                count += 1
+
+        header = {**header(), "sha256": digest, "chunker": key, "chunks": count}
+        with open(tmp_path, 'w', encoding='utf-8') as out, open(body_path, encoding='utf-8') as body:
+            out.write(json.dumps(header) + "\n")
+            shutil.copyfileobj(body, out)
+        os.replace(tmp_path, path)
+        body_path.unlink(missing_ok=True)
+        return header
+
+    def read_header(self, digest: str, key: str) -> Optional[Dict]:
+        try:
+            with open(self.chunks_path(digest, key), encoding='utf-8') as f:
+                header = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        return header if header.get("sha256") == digest else None
+
+    def iter_chunks(self, digest: str, key: str) -> Iterator[str]:
+        """Stream cached chunks (header skipped)"""
+        with open(self.chunks_path(digest, key), encoding='utf-8') as f:
+            f.readline()
+            for line in f:
+                yield json.loads(line)
+
+
+class _Counter:
+    """Counts pages and characters flowing through a generator"""
+
+    def __init__(self):
+        self.pages = 0
+        self.chars = 0
+
+    def count(self, pages: Iterable[str]) -> Iterator[str]:
+        for page in pages:
+            self.pages += 1
+            self.chars += len(page)
+            yield page
+
+
+def build_chunk_file(pdf_path: str, digest: str, max_chars: int, overlap: int, cache_dir: str) -> Dict:
+    """
+    Write the chunk file of one PDF, parsing it only if its pages are not cached.
+
+    Runs in a worker process; returns the chunk file header plus warnings.
+    """
+    start = time.perf_counter()
+    cache = PDFTextCache(Path(cache_dir))
+    cache.cache_dir.mkdir(parents=True, exist_ok=True)
+    warnings: List[str] = []
+    counter = _Counter()
+
+    from_pages_cache = cache.pages_path(digest).exists()
+    if from_pages_cache:
+        pages = cache.iter_pages(digest)
+    else:
+        pages = cache.write_pages(digest, iter_pdf_pages(Path(pdf_path), warnings))
+
+    header = cache.write_chunks(
+        digest,
+        chunker_key(max_chars, overlap),
+        iter_chunks(counter.count(pages), max_chars, overlap),
+        lambda: {"pages": counter.pages, "chars": counter.chars, "seconds": round(time.perf_counter() - start, 3)}
+    )
+    return {"header": header, "warnings": warnings, "from_pages_cache": from_pages_cache}
+
+
+def _pdf_workers(pending: int) -> int:
+    return max(1, min(pending, int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))))
+
+
+def _build_all(jobs: List[Tuple[int, str, str]], max_chars: int, overlap: int, cache_dir: str) -> Iterator[Tuple[int, object]]:
+    """
+    Start build_chunk_file for each (position, path, digest) and return an
+    iterator of (position, result or exception) as files finish. Uses a
+    process pool when more than one file is pending, in-process parsing where
+    no pool can be created (in-process files are parsed as they are consumed).
+    """
+    workers = _pdf_workers(len(jobs))
+    if workers > 1:
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        except (OSError, NotImplementedError) as e:
+            # e.g. no /dev/shm for multiprocessing primitives
+            logger.warning(f"⚠️ PDF process pool unavailable ({e}), parsing in-process")
+        else:
+            futures = {
+                pool.submit(build_chunk_file, path, digest, max_chars, overlap, cache_dir): i
+                for i, path, digest in jobs
+            }
+            return _drain_pool(pool, futures)
+    return _build_in_process(jobs, max_chars, overlap, cache_dir)
+
+
+def _drain_pool(pool: ProcessPoolExecutor, futures: Dict) -> Iterator[Tuple[int, object]]:
+    try:
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+    finally:
+        # Consumer stopped early: drop files that have not started
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _build_in_process(jobs: List[Tuple[int, str, str]], max_chars: int, overlap: int, cache_dir: str) -> Iterator[Tuple[int, object]]:
+    for i, path, digest in jobs:
+        try:
+            yield i, build_chunk_file(path, digest, max_chars, overlap, cache_dir)
+        except Exception as e:
+            yield i, e
+
+
+def iter_pdf_results(
+    pdf_paths: Sequence[Path],
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap: int = DEFAULT_CHUNK_OVERLAP,
+    cache: Optional[PDFTextCache] = None
+) -> Iterator[PDFResult]:
+    """
+    Chunks of every PDF, as each file becomes ready.
+
+    Cached files are yielded first while new or modified ones are parsed in
+    the background; each PDFResult streams its chunks from the cache file.
+    Blocking; iterate it off the event loop.
+    """
+    cache = cache or PDFTextCache()
+    cache.cache_dir.mkdir(parents=True, exist_ok=True)
+    key = chunker_key(max_chars, overlap)
+
+    ready: List[Tuple[Path, str, Dict, float]] = []
+    jobs: List[Tuple[int, str, str]] = []
+    digests: Dict[int, str] = {}
+    failed: List[PDFResult] = []
+    for i, path in enumerate(pdf_paths):
+        start = time.perf_counter()
+        try:
+            digest = file_hash(path)
+        except OSError as e:
+            failed.append(PDFResult(path, error=str(e)))
+            continue
+        header = cache.read_header(digest, key)
+        if header is not None:
+            ready.append((path, digest, header, time.perf_counter() - start))
+        else:
+            digests[i] = digest
+            jobs.append((i, str(path), digest))
+
+    # Start parsing before serving cached files, so both overlap
+    built = _build_all(jobs, max_chars, overlap, str(cache.cache_dir)) if jobs else iter(())
+    yield from failed
+    for path, digest, header, seconds in ready:
+        yield PDFResult(path, cache.iter_chunks(digest, key), header["chunks"], header["chars"], header["pages"],
+                        cached=True, seconds=seconds)
+
+    for i, outcome in built:
+        path = pdf_paths[i]
+        if isinstance(outcome, Exception):
+            yield PDFResult(path, error=str(outcome))
+            continue
+        header = outcome["header"]
+        yield PDFResult(path, cache.iter_chunks(digests[i], key), header["chunks"], header["chars"], header["pages"],
+                        cached=False, seconds=header["seconds"], warnings=outcome["warnings"])
@@ -0,0 +1,154 @@
+"""
+Projection - Precomputed 2-D layout of the embedding matrix.
+
+The RAG explorer plots every document in a 2-D semantic map. The layout is
+computed once per embedding matrix, in the background after an index build,
+and persisted next to the matrix in the EmbeddingStore, so page views only
+serialize cached coordinates.
+
+Methods:
+    tsne    sklearn t-SNE; best clusters, O(n log n) with a large constant
+    pca     top-2 principal components from a blockwise covariance, O(n d^2)
+    random  Gaussian random projection, O(n d)
+    auto    t-SNE up to PROJECTION_TSNE_MAX_ROWS rows, PCA above
+"""
+
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from backend.data_knowledge_layer.ann_index import SCORE_BLOCK_ROWS
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_METHODS = ("auto", "tsne", "pca", "random")
+DEFAULT_TSNE_MAX_ROWS = 3000
+RANDOM_STATE = 42
+
+
+def resolve_method(n_rows: int, method: Optional[str] = None) -> str:
+    """Concrete projection method for a corpus of n_rows"""
+    method = (method or os.getenv("EMBEDDING_PROJECTION", "auto")).lower()
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Unknown projection '{method}' (expected one of {', '.join(PROJECTION_METHODS)})")
+    if method == "auto":
+        max_rows = int(os.getenv("PROJECTION_TSNE_MAX_ROWS", DEFAULT_TSNE_MAX_ROWS))
+        return "tsne" if n_rows <= max_rows else "pca"
+    return method
+
+
+def _blocks(matrix: np.ndarray):
+    for start in range(0, matrix.shape[0], SCORE_BLOCK_ROWS):
+        yield np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float64)
+
+
+def pca_2d(matrix: np.ndarray) -> np.ndarray:
+    """First two principal components, without materializing a float64 copy of the matrix"""
+    n = matrix.shape[0]
+    mean = sum(block.sum(axis=0) for block in _blocks(matrix)) / n
+    scatter = sum(block.T @ block for block in _blocks(matrix)) - n * np.outer(mean, mean)
+    _, vectors = np.linalg.eigh(scatter)
+    components = vectors[:, ::-1][:, :2]
+    return np.vstack([(block - mean) @ components for block in _blocks(matrix)]).astype(np.float32)
+
+
+def random_projection_2d(matrix: np.ndarray, seed: int = RANDOM_STATE) -> np.ndarray:
+    """Gaussian random projection to two dimensions"""
+    basis = np.random.default_rng(seed).normal(size=(matrix.shape[1], 2)) / np.sqrt(2)
+    return np.vstack([block @ basis for block in _blocks(matrix)]).astype(np.float32)
+
+
+def tsne_2d(matrix: np.ndarray) -> np.ndarray:
+    """t-SNE layout (PCA-initialized, fixed seed so layouts are reproducible)"""
+    from sklearn.manifold import TSNE
+
+    perplexity = min(30, matrix.shape[0] - 1)
+    tsne = TSNE(n_components=2, perplexity=perplexity, init="pca", random_state=RANDOM_STATE)
+    return tsne.fit_transform(np.asarray(matrix, dtype=np.float32)).astype(np.float32)
+
+
+PROJECTORS = {"tsne": tsne_2d, "pca": pca_2d, "random": random_projection_2d}
+
+
+class Projection:
+    """2-D coordinates for the first len(coords) documents, tagged with a version"""
+
+    kind = "projection"
+
+    def __init__(self, coords: np.ndarray, method: str, version: str, seconds: float = 0.0):
+        self.coords = coords
+        self.method = method
+        self.version = version
+        self.seconds = seconds
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def save(self, path: Path):
+        with open(path, 'wb') as f:
+            np.savez(f, coords=self.coords, method=np.array(self.method), seconds=np.array(self.seconds))
+
+    @classmethod
+    def load(cls, path: Path, version: str) -> "Projection":
+        with np.load(path) as data:
+            return cls(data["coords"], str(data["method"]), version, float(data["seconds"]))
+
+
+def _matrix_id(matrix: np.ndarray) -> str:
+    """Content hash for matrices that do not come from an EmbeddingStore"""
+    digest = hashlib.sha256(str(matrix.shape).encode())
+    for block in _blocks(matrix):
+        digest.update(block.astype(np.float32).tobytes())
+    return digest.hexdigest()[:12]
+
+
+def load_or_build_projection(matrix: np.ndarray, store=None, method: Optional[str] = None) -> Projection:
+    """
+    2-D projection of matrix, reusing the persisted one when the matrix is unchanged.
+
+    Args:
+        matrix: Embedding matrix (rows aligned with the retriever documents)
+        store: EmbeddingStore the matrix came from (where projections are persisted)
+        method: One of PROJECTION_METHODS (default: EMBEDDING_PROJECTION env, then auto)
+
+    Returns:
+        Projection whose version changes with the matrix content, row count and method
+    """
+    if matrix.shape[0] < 2:
+        raise ValueError("Not enough documents for a projection (need at least 2)")
+
+    rows = matrix.shape[0]
+    method = resolve_method(rows, method)
+    # Only a matrix holding exactly the stored rows is identified by (and persisted
+    # with) the store; a prefix (PDFs pending) or a grown matrix is hashed instead
+    stored = store is not None and store.manifest is not None and len(store.manifest["hashes"]) == rows
+    matrix_id = store.matrix_id if stored else _matrix_id(matrix)
+    version = f"{matrix_id}-{rows}-{method}"
+
+    path = store.index_path("projection", f"{rows}.{method}.npz") if stored else None
+    if path is not None and path.exists():
+        try:
+            projection = Projection.load(path, version)
+            if projection.coords.shape[0] == rows:
+                logger.info(f"✅ Loaded {method} projection ({path.name})")
+                return projection
+        except Exception as e:
+            logger.warning(f"⚠️ Recomputing unreadable projection: {e}")
+
+    start = time.perf_counter()
+    projection = Projection(PROJECTORS[method](matrix), method, version)
+    projection.seconds = round(time.perf_counter() - start, 2)
+    logger.info(f"🗺️ Computed {method} projection of {rows:,} embeddings in {projection.seconds:.1f}s")
+
+    if path is not None:
+        try:
+            store.save_index(projection, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist projection: {e}")
+    return projection
@@ -2,9 +2,11 @@
 RAG Engine - Combines retrieval and generation for grounded explanations.
 """
 
+import asyncio
 import logging
-from typing import Optional
+from typing import Dict, Optional
 import os
+import time
 
 from backend.models.schemas import TcoPredictRequest, TcoPredictResponse, ExplainResponse, Citation, CostBreakdown
 from backend.models.entities import RAGContext, KnowledgeDocument
@@ -22,6 +24,41 @@ except Exception:
 logger = logging.getLogger(__name__)
 
 
+class KnowledgeBaseReadiness:
+    """
+    Readiness of the knowledge-base tiers, in loading order:
+    
+        documents       JSON/CSV/markdown sources (or a whole snapshot)
+        keyword_index   BM25 retrieval; the engine serves queries from here on
+        embeddings      dense and hybrid retrieval
+        pdfs            all PDF chunks indexed
+    
+    Each tier is pending, loading, ready, unavailable (skipped, e.g. no
+    embedding backend) or failed.
+    """
+    
+    TIERS = ("documents", "keyword_index", "embeddings", "pdfs")
+    
+    def __init__(self):
+        self.tiers: Dict[str, Dict] = {tier: {"state": "pending"} for tier in self.TIERS}
+        self._started: Dict[str, float] = {}
+    
+    def start(self, tier: str):
+        self._started[tier] = time.perf_counter()
+        self.tiers[tier] = {"state": "loading"}
+    
+    def finish(self, tier: str, state: str = "ready", **details):
+        started = self._started.get(tier)
+        seconds = round(time.perf_counter() - started, 3) if started is not None else None
+        self.tiers[tier] = {"state": state, "seconds": seconds, **details}
+    
+    def is_ready(self, tier: str) -> bool:
+        return self.tiers[tier]["state"] == "ready"
+    
+    def as_dict(self) -> Dict[str, Dict]:
+        return {tier: dict(status) for tier, status in self.tiers.items()}
+
+
 class RAGEngine:
     """
     Retrieval-Augmented Generation engine.
@@ -37,31 +74,170 @@ class RAGEngine:
         self.retriever = Retriever(self.data_loader)
         self.logger = logger
         self.is_initialized = False
+        # Background PDF ingestion (see ingest_pdf_documents), reported by /health/ready
+        self.pdf_ingestion: Dict = {"state": "idle", "chunks_indexed": 0, "seconds": 0.0, "error": None}
+        # Knowledge-base hot reload (see reload_knowledge_base)
+        self._reload_lock = asyncio.Lock()
+        self.last_reload: Optional[Dict] = None
+        # Per-tier loading state, reported by /health/ready
+        self.readiness = KnowledgeBaseReadiness()
+    
+    async def load_documents(self, include_pdfs: bool = False):
+        """
+        Documents tier: a fresh knowledge-base snapshot if there is one,
+        otherwise the JSON/CSV/markdown sources (plus PDFs with include_pdfs).
+        """
+        self.readiness.start("documents")
+        from_snapshot = await self.data_loader.load_from_snapshot()
+        if not from_snapshot:
+            await self.data_loader.load_all_datasets(include_pdfs=include_pdfs)
+        self.readiness.finish("documents", documents=len(self.data_loader.documents), snapshot=from_snapshot)
     
-    async def initialize(self):
-        """Initialize RAG engine"""
+    async def initialize(self, load_embeddings: bool = True):
+        """
+        Initialize RAG engine.
+        
+        Args:
+            load_embeddings: Also load the embeddings and PDF tiers before
+                returning. With False the engine is initialized (keyword
+                retrieval) as soon as the keyword index is built, and
+                load_remaining_tiers() adds embeddings and PDFs while it serves.
+        """
         self.logger.info("🧠 Initializing RAG engine...")
         
         try:
             # Ensure data is loaded
             if not self.data_loader.documents:
-                await self.data_loader.load_all_datasets()
+                await self.load_documents(include_pdfs=load_embeddings)
+            elif not self.readiness.is_ready("documents"):
+                self.readiness.finish("documents", documents=len(self.data_loader.documents), snapshot=False)
             
-            # Initialize retriever
-            await self.retriever.initialize()
+            # Initialize retriever (keyword index first)
+            self.readiness.start("keyword_index")
+            await self.retriever.initialize(load_embeddings=False)
+            self.readiness.finish("keyword_index", terms=self.retriever.keyword_index.n_terms)
             
             self.is_initialized = True
-            self.logger.info(f"✅ RAG engine ready ({len(self.data_loader.documents)} documents)")
+            self.logger.info(f"✅ RAG engine ready ({len(self.data_loader.documents)} documents, keyword retrieval)")
+            
+            if load_embeddings:
+                await self.load_remaining_tiers()
         
         except Exception as e:
             self.logger.error(f"❌ RAG initialization failed: {e}")
+            self.readiness.finish("keyword_index", state="failed", error=str(e))
             self.is_initialized = False
     
+    async def load_embeddings(self):
+        """Embeddings tier: dense and hybrid retrieval (keyword retrieval keeps serving meanwhile)"""
+        self.readiness.start("embeddings")
+        await self.retriever.load_embeddings()
+        embeddings = self.retriever.embeddings
+        if embeddings is not None:
+            self.readiness.finish("embeddings", rows=int(embeddings.shape[0]), index=self.retriever.vector_index.kind)
+            self.logger.info(f"✅ Dense retrieval ready ({embeddings.shape[0]} embeddings)")
+        else:
+            self.readiness.finish("embeddings", state="unavailable", detail="keyword retrieval only")
+    
+    async def load_remaining_tiers(self):
+        """Embeddings, then PDFs not loaded with the documents tier (run after initialize(load_embeddings=False))"""
+        await self.load_embeddings()
+        if self.data_loader.pdfs_pending:
+            await self.ingest_pdf_documents()
+        else:
+            self.readiness.finish("pdfs", detail="loaded with documents")
+    
+    async def ingest_pdf_documents(self, batch_size: Optional[int] = None):
+        """
+        Stream PDF chunks into the live retriever.
+        
+        Each batch is searchable as soon as it is indexed; once all PDFs are
+        in, the embeddings are persisted and the vector index rebuilt. Runs
+        as the pdfs tier of load_remaining_tiers().
+        """
+        batch_size = batch_size or int(os.getenv("PDF_INGEST_BATCH", "64"))
+        self.pdf_ingestion.update(state="running", chunks_indexed=0, error=None)
+        self.readiness.start("pdfs")
+        start = time.perf_counter()
+        try:
+            async for batch in self.data_loader.stream_pdf_documents(batch_size):
+                await self.retriever.add_documents(batch)
+                self.pdf_ingestion["chunks_indexed"] += len(batch)
+                self.pdf_ingestion["seconds"] = round(time.perf_counter() - start, 2)
+            await self.retriever.persist_embeddings()
+            self.pdf_ingestion["state"] = "done"
+            self.readiness.finish("pdfs", chunks=self.pdf_ingestion["chunks_indexed"])
+            self.logger.info(
+                f"✅ Indexed {self.pdf_ingestion['chunks_indexed']:,} PDF chunks in "
+                f"{time.perf_counter() - start:.1f}s ({len(self.retriever.documents)} documents)"
+            )
+        except Exception as e:
+            self.logger.error(f"❌ PDF ingestion failed: {e}")
+            self.pdf_ingestion.update(state="failed", error=str(e))
+            self.readiness.finish("pdfs", state="failed", error=str(e))
+        finally:
+            self.pdf_ingestion["seconds"] = round(time.perf_counter() - start, 2)
+    
+    async def reload_knowledge_base(self) -> Dict:
+        """
+        Re-load the source files that changed since they were loaded.
+        
+        Documents of added or modified files are loaded afresh, those of
+        modified or removed files dropped, and the result swapped into the
+        live retriever; only documents with new text are embedded.
+        
+        Returns:
+            Report with the changed files, document counts and timing
+        """
+        # Until the PDFs are streamed in, a reload would load them too and
+        # ingestion would then add their chunks a second time
+        if self.pdf_ingestion["state"] == "running" or self.data_loader.pdfs_pending:
+            raise RuntimeError("PDF ingestion has not finished yet, retry once it is done")
+        
+        async with self._reload_lock:
+            start = time.perf_counter()
+            changes, manifest = await self.data_loader.changed_sources()
+            report = {"changes": changes, "removed": 0, "added": 0, "embedded": 0}
+            
+            if any(changes.values()):
+                self.logger.info(
+                    f"🔄 Reloading knowledge base: {len(changes['added'])} added, "
+                    f"{len(changes['modified'])} modified, {len(changes['removed'])} removed source files"
+                )
+                documents = await self.data_loader.load_source_documents(changes["added"] + changes["modified"])
+                changed_files = {name for names in changes.values() for name in names}
+                report.update(await self.retriever.replace_documents(changed_files, documents))
+                self.data_loader.source_manifest = manifest
+                self.logger.info(
+                    f"✅ Knowledge base reloaded: -{report['removed']} +{report['added']} documents "
+                    f"({report['embedded']} embedded) in {time.perf_counter() - start:.2f}s"
+                )
+            
+            report["documents"] = len(self.retriever.documents)
+            report["seconds"] = round(time.perf_counter() - start, 3)
+            self.last_reload = report
+            return report
+    
+    async def watch_sources(self, interval: float):
+        """Poll the data directory every `interval` seconds and hot-reload changed sources"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload_knowledge_base()
+            except RuntimeError as e:
+                self.logger.info(f"⏳ Knowledge-base reload postponed: {e}")
+            except Exception as e:
+                self.logger.error(f"❌ Knowledge-base reload failed: {e}")
+    
     async def retrieve_context(
         self,
         input_params: TcoPredictRequest,
         result: TcoPredictResponse,
-        top_k: int = 5
+        top_k: int = 5,
+        mode: Optional[str] = None,
+        dense_weight: Optional[float] = None,
+        keyword_weight: Optional[float] = None,
+        filters: Optional[Dict] = None
     ) -> RAGContext:
         """
         Retrieve relevant context for TCO explanation.
@@ -70,6 +246,11 @@ class RAGEngine:
             input_params: Original input parameters
             result: TCO calculation result
             top_k: Number of documents to retrieve
+            mode: Retrieval mode ("dense", "keyword" or "hybrid"; default from the retriever)
+            dense_weight: Hybrid fusion weight of the vector ranking
+            keyword_weight: Hybrid fusion weight of the BM25 ranking
+            filters: Metadata conditions applied before scoring,
+                e.g. {"type": "policy", "country": "Germany", "year": {">=": 2024}}
         
         Returns:
             RAG context with documents and scores
@@ -80,13 +261,21 @@ class RAGEngine:
         self.logger.info(f"🔎 Retrieving context: {query[:100]}...")
         
         # Retrieve documents
-        retrieved_docs = await self.retriever.retrieve(query, top_k=top_k)
+        hits = await self.retriever.search(
+            query,
+            top_k=top_k,
+            mode=mode,
+            dense_weight=dense_weight,
+            keyword_weight=keyword_weight,
+            filters=filters
+        )
         
         # Convert to KnowledgeDocument objects
         documents = []
         relevance_scores = []
         
-        for doc_data in retrieved_docs:
+        for hit in hits:
+            doc_data = self.retriever.documents[hit.index]
             doc = KnowledgeDocument(
                 id=f"{doc_data['source']}_{hash(doc_data['content'])}",
                 source=doc_data["source"],
@@ -96,7 +285,7 @@ class RAGEngine:
                 confidence=doc_data.get("confidence", 0.8)
             )
             documents.append(doc)
-            relevance_scores.append(doc_data.get("relevance_score", 0.5))
+            relevance_scores.append(hit.score)
         
         context = RAGContext(
             query=query,
@@ -111,7 +300,11 @@ class RAGEngine:
     async def retrieve_context_from_query(
         self,
         query: str,
-        top_k: int = 5
+        top_k: int = 5,
+        mode: Optional[str] = None,
+        dense_weight: Optional[float] = None,
+        keyword_weight: Optional[float] = None,
+        filters: Optional[Dict] = None
     ) -> RAGContext:
         """
         Retrieve relevant context from a direct query string.
@@ -120,6 +313,11 @@ class RAGEngine:
         Args:
             query: Search query string
             top_k: Number of documents to retrieve
+            mode: Retrieval mode ("dense", "keyword" or "hybrid"; default from the retriever)
+            dense_weight: Hybrid fusion weight of the vector ranking
+            keyword_weight: Hybrid fusion weight of the BM25 ranking
+            filters: Metadata conditions applied before scoring,
+                e.g. {"type": "policy", "country": "Germany", "year": {">=": 2024}}
         
         Returns:
             RAG context with documents and scores
@@ -130,13 +328,21 @@ class RAGEngine:
         self.logger.info(f"🔎 Chat query: {query[:100]}...")
         
         # Retrieve documents
-        retrieved_docs = await self.retriever.retrieve(query, top_k=top_k)
+        hits = await self.retriever.search(
+            query,
+            top_k=top_k,
+            mode=mode,
+            dense_weight=dense_weight,
+            keyword_weight=keyword_weight,
+            filters=filters
+        )
         
         # Convert to KnowledgeDocument objects
         documents = []
         relevance_scores = []
         
-        for doc_data in retrieved_docs:
+        for hit in hits:
+            doc_data = self.retriever.documents[hit.index]
             doc = KnowledgeDocument(
                 id=doc_data.get("id", ""),
                 source=doc_data.get("source", "Unknown"),
@@ -144,7 +350,7 @@ class RAGEngine:
                 metadata=doc_data.get("metadata", {})
             )
             documents.append(doc)
-            relevance_scores.append(doc_data.get("relevance_score", 0.0))
+            relevance_scores.append(hit.score)
         
         context = RAGContext(
             query=query,
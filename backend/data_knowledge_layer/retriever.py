@@ -1,15 +1,73 @@
 """
 Retriever - Generates embeddings and performs semantic search.
-Uses Vertex AI Embeddings API or falls back to simple keyword search.
+Uses Vertex AI Embeddings API or falls back to BM25 keyword search.
+Hybrid mode runs both and fuses the rankings with reciprocal rank fusion.
 """
 
 import os
+import json
+import asyncio
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional, Sequence, Set, Tuple
 import numpy as np
 
+from backend.data_knowledge_layer.ann_index import ExactIndex, extend_index, load_or_build_index, resolve_backend
+from backend.data_knowledge_layer.embedding_batcher import BatchEmbedder, EmbeddingProgress, VertexRESTEmbeddingClient
+from backend.data_knowledge_layer.embedding_store import EmbeddingStore, content_hash, normalize_rows
+from backend.data_knowledge_layer.keyword_index import BM25Index
+from backend.data_knowledge_layer.metadata_index import MetadataIndex, fit_mask
+from backend.data_knowledge_layer.projection import Projection, load_or_build_projection
+from backend.services.concurrency import run_blocking
+from backend.utils.cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
+LOCAL_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+RETRIEVAL_MODES = ("dense", "keyword", "hybrid")
+
+# Reciprocal rank fusion: score = sum(weight / (RRF_K + rank))
+RRF_K = 60
+# Hits taken from each ranking before fusion
+HYBRID_CANDIDATES = 50
+# Re-runs of a query that overlapped a knowledge-base reload (see Retriever.replace_documents)
+SWAP_RETRIES = 3
+
+
+class ScoredDocument(NamedTuple):
+    """A retrieval hit: position in Retriever.documents and its score"""
+    index: int
+    score: float
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Tuple[List[ScoredDocument], float]],
+    top_k: int,
+    k: int = RRF_K
+) -> List[ScoredDocument]:
+    """
+    Fuse several rankings with weighted reciprocal rank fusion.
+    
+    Scores are divided by the best achievable score (rank 1 in every
+    ranking), so a document ranked first everywhere scores 1.0.
+    
+    Args:
+        rankings: (hits best first, weight) per ranking
+        top_k: Number of fused hits to return
+        k: RRF rank offset
+    
+    Returns:
+        Fused hits, best first
+    """
+    fused: Dict[int, float] = {}
+    for hits, weight in rankings:
+        for rank, hit in enumerate(hits, 1):
+            fused[hit.index] = fused.get(hit.index, 0.0) + weight / (k + rank)
+    
+    best = sum(weight for _, weight in rankings) / (k + 1)
+    ranked = sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+    return [ScoredDocument(index, score / best) for index, score in ranked]
+
 
 class Retriever:
     """
@@ -17,7 +75,7 @@ class Retriever:
     
     Supports:
     - Vertex AI Text Embeddings API
-    - Local FAISS index for fast similarity search
+    - Exact or approximate (IVF / faiss HNSW) vector search, see ann_index
     - Fallback to keyword search when embeddings unavailable
     """
     
@@ -28,15 +86,49 @@ class Retriever:
         # Embedding configuration
         self.use_embeddings = os.getenv("USE_EMBEDDINGS", "true").lower() == "true"
         self.embedding_model = os.getenv("EMBEDDING_MODEL", "textembedding-gecko@003")
+        self.embedding_endpoint = os.getenv("EMBEDDING_ENDPOINT")
+        
+        # Retrieval configuration (overridable per call)
+        self.retrieval_mode = os.getenv("RETRIEVAL_MODE", "hybrid")
+        self.dense_weight = float(os.getenv("HYBRID_DENSE_WEIGHT", "1.0"))
+        self.keyword_weight = float(os.getenv("HYBRID_KEYWORD_WEIGHT", "1.0"))
         
         # Storage
         self.embeddings: Optional[np.ndarray] = None
         self.documents: List[Dict] = []
+        self.embedding_client = None
+        self.embedding_store: Optional[EmbeddingStore] = None
+        self.vector_index = None
+        self.embedding_progress = EmbeddingProgress()
+        self.projection: Optional[Projection] = None
+        self._projection_task: Optional[asyncio.Task] = None
+        self._own_keyword_index = BM25Index()
+        self.metadata_index = MetadataIndex()
+        
+        # Incremental indexing (add_documents): embedding function of the active
+        # backend, spare-capacity row buffer behind self.embeddings, and a lock
+        # keeping document positions and embedding rows aligned
+        self._embed_texts = None
+        self._embedding_buffer: Optional[np.ndarray] = None
+        self._append_lock = asyncio.Lock()
+        
+        # Query caches, dropped whenever the document set or index generation changes
+        self.index_generation = 0
+        self.query_embedding_cache = LRUCache(int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024")), "query_embeddings")
+        self.result_cache = LRUCache(int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024")), "retrieval_results")
+        self._fallbacks = 0
         
         self.initialized = False
     
-    async def initialize(self):
-        """Initialize retriever with documents and embeddings"""
+    async def initialize(self, load_embeddings: bool = True):
+        """
+        Initialize retriever with documents and embeddings.
+        
+        Args:
+            load_embeddings: Also load the embeddings before returning. With
+                False, keyword retrieval is available on return and dense or
+                hybrid retrieval once load_embeddings() has run.
+        """
         if self.initialized:
             return
         
@@ -47,19 +139,51 @@ class Retriever:
         if not self.documents:
             raise ValueError("No documents to index")
         
+        # Keyword and metadata indexes first: they serve queries while embeddings load
+        await run_blocking("retrieval", self._sync_document_indexes)
+        
         self.initialized = True
         
-        # Try to initialize embeddings
-        try:
-            await self._initialize_embeddings()
-        except Exception as e:
-            # Continue without embeddings - will use keyword search
-            self.logger.warning(f"⚠️ Continuing without embeddings: {e}")
+        if load_embeddings:
+            await self.load_embeddings()
+    
+    async def load_embeddings(self):
+        """
+        Load or compute the document embeddings.
+        
+        Queries keep being served (keyword only) meanwhile; the switch to
+        dense and hybrid retrieval happens in one step once the vector index
+        is built.
+        """
+        async with self._append_lock:
+            try:
+                await self._initialize_embeddings()
+            except Exception as e:
+                # Continue without embeddings - will use keyword search
+                self.logger.warning(f"⚠️ Continuing without embeddings: {e}")
+        
+        self.schedule_projection()
     
     async def _initialize_embeddings(self):
         """Initialize embedding model and generate embeddings"""
         
-        # Try Vertex AI first
+        # Explicit Vertex-compatible REST endpoint (e.g. a proxy or the local fake server)
+        if self.embedding_endpoint:
+            try:
+                self.embedding_client = VertexRESTEmbeddingClient(
+                    self.embedding_endpoint,
+                    self.embedding_model,
+                    token=os.getenv("EMBEDDING_ENDPOINT_TOKEN")
+                )
+                await self._generate_all_embeddings()
+                
+                self.logger.info(f"✅ Using REST embeddings ({self.embedding_model} at {self.embedding_endpoint})")
+                return
+            
+            except Exception as e:
+                self.logger.warning(f"⚠️ REST embeddings failed: {e}")
+        
+        # Then the Vertex AI SDK
         try:
             from google.cloud import aiplatform
             from vertexai.language_models import TextEmbeddingModel
@@ -83,9 +207,10 @@ class Retriever:
         
         # Try sentence-transformers as fallback
         try:
-            from sentence_transformers import SentenceTransformer
+            # Only check availability: the model itself is loaded on demand
+            import sentence_transformers  # noqa: F401
             
-            self.embedding_client = SentenceTransformer('all-MiniLM-L6-v2')
+            self.embedding_client = None
             await self._generate_all_embeddings_local()
             
             self.logger.info("✅ Using local sentence-transformers embeddings")
@@ -98,99 +223,519 @@ class Retriever:
         raise RuntimeError("No embedding backend available")
     
     async def _generate_all_embeddings(self):
-        """Generate embeddings using Vertex AI"""
-        texts = [doc["content"] for doc in self.documents]
+        """Generate embeddings using Vertex AI (only for documents not in the store)"""
         
-        # Batch generate embeddings
-        batch_size = 5
-        all_embeddings = []
+        # Concurrent, rate-limited batches with retry (EMBEDDING_BATCH_SIZE, EMBEDDING_CONCURRENCY, ...)
+        embedder = BatchEmbedder(
+            self.embedding_client,
+            progress=self.embedding_progress,
+            model_name=self.embedding_model
+        )
+        # Documents added later get their own progress counters
+        self._embed_texts = BatchEmbedder(self.embedding_client, model_name=self.embedding_model).embed
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i+batch_size]
-            embeddings = self.embedding_client.get_embeddings(batch)
-            all_embeddings.extend([emb.values for emb in embeddings])
-        
-        self.embeddings = np.array(all_embeddings)
-        self.logger.info(f"📊 Generated {len(all_embeddings)} embeddings")
+        await run_blocking("embedding", self._sync_embeddings, self.embedding_model, embedder.embed)
     
     async def _generate_all_embeddings_local(self):
-        """Generate embeddings using local model"""
+        """Generate embeddings using local model (only for documents not in the store)"""
+        
+        def embed(texts: List[str]) -> np.ndarray:
+            progress = self.embedding_progress
+            progress.start(LOCAL_EMBEDDING_MODEL, len(texts), 1)
+            try:
+                vectors = self._get_local_model().encode(texts)
+            except Exception as e:
+                progress.finish(e)
+                raise
+            progress.update(texts=len(texts), batches=1)
+            progress.finish()
+            return vectors
+        
+        self._embed_texts = lambda texts: self._get_local_model().encode(texts)
+        await run_blocking("embedding", self._sync_embeddings, LOCAL_EMBEDDING_MODEL, embed)
+    
+    def _sync_embeddings(self, model_name: str, embed):
+        """Load stored embeddings for model_name and embed new or changed documents"""
+        snapshot = getattr(self.data_loader, 'snapshot', None)
+        matrix = snapshot.embeddings_for(model_name) if snapshot is not None else None
+        if matrix is not None and self.documents is snapshot.documents and matrix.shape[0] == len(self.documents):
+            # Knowledge-base snapshot: the matrix is memory-mapped from the snapshot file
+            self.embedding_store = None
+            self._embedding_buffer = None
+            self.logger.info(f"📊 Using {matrix.shape[0]} snapshot embeddings ({model_name})")
+            # Index before matrix: queries switch to dense retrieval once self.embeddings is set.
+            # The snapshot's ANN index is used as is (no k-means training, no recall evaluation)
+            kind = resolve_backend(matrix.shape[0])
+            index = snapshot.vector_index_for(model_name, matrix) if kind != "exact" else None
+            if index is not None and index.kind == kind:
+                self.logger.info(f"🧭 Using the snapshot {kind} index")
+                self.vector_index = index
+            else:
+                self.vector_index = load_or_build_index(matrix, backend=kind)
+            self.embeddings = matrix
+            self.invalidate_caches()
+            return
+        
+        self.embedding_store = EmbeddingStore(model_name)
         texts = [doc["content"] for doc in self.documents]
-        self.embeddings = self.embedding_client.encode(texts)
-        self.logger.info(f"📊 Generated {len(self.embeddings)} local embeddings")
+        # Documents still to be ingested keep their stored rows for add_documents to reuse
+        pending = getattr(self.data_loader, 'pdfs_pending', False)
+        embeddings, stats = self.embedding_store.sync(texts, embed, keep_extra=pending)
+        self._embedding_buffer = None
+        
+        if stats.embedded:
+            self.logger.info(
+                f"📊 Generated {stats.embedded} embeddings, reused {stats.reused} "
+                f"({stats.removed} stale dropped) in {stats.seconds:.2f}s"
+            )
+        else:
+            self.logger.info(f"📊 Loaded {stats.documents} stored embeddings in {stats.seconds * 1000:.1f} ms")
+        
+        if stats.retained:
+            # Persisted indexes cover the full stored matrix; search the prefix exactly
+            # until persist_embeddings() rebuilds over everything
+            self.logger.info(f"📊 {stats.retained} stored embeddings kept for documents still being ingested")
+            self.vector_index = ExactIndex(embeddings)
+        else:
+            self.vector_index = load_or_build_index(embeddings, self.embedding_store)
+        self.embeddings = embeddings
+        self.invalidate_caches()
+    
+    async def add_documents(self, docs: List[Dict]):
+        """
+        Append documents and make them searchable right away.
+        
+        Keyword and metadata indexes are extended in place. With embeddings,
+        the new documents are embedded (reusing stored rows by content hash)
+        and appended to the matrix; the vector index scores appended rows
+        exactly until persist_embeddings() rebuilds it.
+        """
+        if not docs:
+            return
+        
+        async with self._append_lock:
+            rows = None
+            if self.embeddings is not None and self._embed_texts is not None:
+                try:
+                    rows = await run_blocking("embedding", self._grow_embeddings, [doc["content"] for doc in docs])
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Embedding {len(docs)} new documents failed, keyword search only: {e}")
+            
+            # Only append rows when they line up with the document positions
+            aligned = rows is not None and self.embeddings.shape[0] == len(self.documents)
+            self.documents.extend(docs)
+            if aligned:
+                self.embeddings = rows
+                self.vector_index = extend_index(self.vector_index, rows)
+            
+            await run_blocking("retrieval", self._sync_document_indexes)
+    
+    def _sync_document_indexes(self):
+        self.keyword_index.sync(self.documents)
+        self.metadata_index.sync(self.documents)
+    
+    def _grow_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        The embedding matrix with rows for texts appended.
+        
+        Rows are written into spare capacity of a buffer that doubles when
+        full, so readers of the current matrix (a view of the first rows)
+        are unaffected.
+        """
+        hashes = [content_hash(text) for text in texts]
+        stored = self.embedding_store.lookup(hashes) if self.embedding_store is not None else {}
+        missing = [i for i, h in enumerate(hashes) if h not in stored]
+        embedded = {}
+        if missing:
+            vectors = normalize_rows(np.asarray(self._embed_texts([texts[i] for i in missing]), dtype=np.float32))
+            embedded = dict(zip(missing, vectors))
+        
+        n = self.embeddings.shape[0]
+        buffer = self._embedding_buffer
+        if buffer is None or buffer.shape[0] < n + len(texts):
+            capacity = max(2 * n, n + len(texts), 1024)
+            grown = np.empty((capacity, self.embeddings.shape[1]), dtype=self.embeddings.dtype)
+            grown[:n] = self.embeddings
+            buffer = self._embedding_buffer = grown
+        for offset, h in enumerate(hashes):
+            buffer[n + offset] = stored[h] if h in stored else embedded[offset]
+        return buffer[:n + len(texts)]
+    
+    async def persist_embeddings(self):
+        """Write the grown embedding matrix to the store and rebuild the vector index over it"""
+        async with self._append_lock:
+            if self.embeddings is None or self.embedding_store is None:
+                return
+            matrix = self.embeddings
+            if matrix.shape[0] != len(self.documents):
+                self.logger.warning("⚠️ Not persisting embeddings: rows do not match the documents")
+                return
+            
+            hashes = [content_hash(doc["content"]) for doc in self.documents]
+            self.embeddings, self.vector_index = await run_blocking("embedding", self._persist_matrix, matrix, hashes)
+            self._embedding_buffer = None
+            self.invalidate_caches()
+        self.schedule_projection()
     
-    async def retrieve(self, query: str, top_k: int = 5) -> List[Dict]:
+    def _persist_matrix(self, matrix: np.ndarray, hashes: List[str]):
+        """
+        Save matrix to the embedding store unless it is already stored.
+        
+        Returns:
+            (the stored, memory-mapped matrix, vector index over it); without a
+            store (snapshot embeddings) the matrix itself and an unpersisted index
+        """
+        if self.embedding_store is None:
+            return matrix, load_or_build_index(matrix)
+        manifest = self.embedding_store.manifest
+        if manifest is None or manifest["hashes"] != hashes:
+            self.embedding_store.save(matrix, hashes)
+        stored = self.embedding_store.load()
+        stored_matrix = stored[0] if stored is not None else matrix
+        return stored_matrix, load_or_build_index(stored_matrix, self.embedding_store)
+    
+    async def replace_documents(self, source_files: Set[str], documents: List[Dict]) -> Dict[str, int]:
+        """
+        Swap the documents of source_files for `documents` (hot reload).
+        
+        The new document list, embedding matrix and indexes are built off the
+        event loop, reusing the rows of unchanged documents and stored rows
+        (by content hash) so only new texts are embedded. They are then
+        swapped in together: queries never wait for a reload, and one that
+        straddles the swap is re-run against the new state (see search).
+        
+        Returns:
+            Numbers of documents removed, added and embedded
+        """
+        async with self._append_lock:
+            old_documents = self.documents
+            kept = [doc for doc in old_documents if doc.get("source_file") not in source_files]
+            new_documents = kept + list(documents)
+            state = await run_blocking("embedding", self._build_live_state, old_documents, new_documents)
+            
+            # Swap everything in one step (no awaits)
+            self.documents = new_documents
+            self.embeddings = state["embeddings"]
+            self.vector_index = state["vector_index"]
+            self._embedding_buffer = None
+            # Old coordinates do not match the new list; the viz endpoint answers 503 until the rebuild lands
+            self.projection = None
+            self._own_keyword_index = state["keyword_index"]
+            self.metadata_index = state["metadata_index"]
+            if self.data_loader is not None:
+                self.data_loader.documents = new_documents
+                self.data_loader.keyword_index = state["keyword_index"]
+            self.invalidate_caches()
+        self.schedule_projection()
+        return {"removed": len(old_documents) - len(kept), "added": len(documents), "embedded": state["embedded"]}
+    
+    def _build_live_state(self, old_documents: List[Dict], new_documents: List[Dict]) -> Dict:
+        """Indexes and embedding matrix for new_documents (blocking; see replace_documents)"""
+        keyword_index = BM25Index()
+        keyword_index.sync(new_documents)
+        metadata_index = MetadataIndex()
+        metadata_index.sync(new_documents)
+        state = {
+            "keyword_index": keyword_index, "metadata_index": metadata_index,
+            "embeddings": None, "vector_index": None, "embedded": 0
+        }
+        if self.embeddings is None or self._embed_texts is None:
+            return state
+        
+        current = self.embeddings
+        held = {content_hash(doc["content"]): row for row, doc in enumerate(old_documents[:current.shape[0]])}
+        hashes = [content_hash(doc["content"]) for doc in new_documents]
+        missing = [h for h in dict.fromkeys(hashes) if h not in held]
+        stored = self.embedding_store.lookup(missing) if self.embedding_store is not None and missing else {}
+        to_embed = [h for h in missing if h not in stored]
+        if to_embed:
+            texts = {h: doc["content"] for h, doc in zip(hashes, new_documents)}
+            vectors = normalize_rows(np.asarray(self._embed_texts([texts[h] for h in to_embed]), dtype=np.float32))
+            stored.update(zip(to_embed, vectors))
+        
+        matrix = np.empty((len(new_documents), current.shape[1]), dtype=np.float32)
+        reused = [i for i, h in enumerate(hashes) if h in held]
+        matrix[reused] = current[[held[hashes[i]] for i in reused]]
+        for i, h in enumerate(hashes):
+            if h not in held:
+                matrix[i] = stored[h]
+        
+        state["embeddings"], state["vector_index"] = self._persist_matrix(matrix, hashes)
+        state["embedded"] = len(to_embed)
+        return state
+    
+    def schedule_projection(self):
+        """Compute the 2-D projection of the current embeddings in the background"""
+        if self.embeddings is None:
+            return
+        self._projection_task = asyncio.get_running_loop().create_task(
+            self._build_projection(self.embeddings, self.embedding_store)
+        )
+    
+    async def _build_projection(self, matrix: np.ndarray, store: Optional[EmbeddingStore]):
+        try:
+            projection = await run_blocking("embedding", load_or_build_projection, matrix, store)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Embedding projection failed: {e}")
+            return
+        # Discard if the embeddings were rebuilt meanwhile (a newer task is on its way)
+        if self.embeddings is matrix:
+            self.projection = projection
+    
+    @property
+    def cache_generation(self) -> Tuple[int, int, int]:
+        """Changes whenever cached results may be stale (document list replaced or grown, index rebuilt)"""
+        return (id(self.documents), len(self.documents), self.index_generation)
+    
+    def invalidate_caches(self):
+        """Start a new index generation (call after changing documents or embeddings in place)"""
+        self.index_generation += 1
+    
+    def cache_stats(self) -> Dict[str, Dict]:
+        return {
+            "index_generation": self.index_generation,
+            "query_embeddings": self.query_embedding_cache.stats(),
+            "results": self.result_cache.stats()
+        }
+    
+    def _get_local_model(self):
+        """sentence-transformers model, loaded on first use"""
+        if self.embedding_client is None:
+            from sentence_transformers import SentenceTransformer
+            self.embedding_client = SentenceTransformer(LOCAL_EMBEDDING_MODEL)
+        return self.embedding_client
+    
+    async def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        mode: Optional[str] = None,
+        dense_weight: Optional[float] = None,
+        keyword_weight: Optional[float] = None,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
         """
         Retrieve most relevant documents for query.
         
         Args:
             query: Search query
             top_k: Number of documents to return
+            mode: "dense", "keyword" or "hybrid" (default: RETRIEVAL_MODE)
+            dense_weight: Hybrid fusion weight of the vector ranking
+            keyword_weight: Hybrid fusion weight of the BM25 ranking
+            filters: Metadata conditions, e.g. {"type": "policy", "year": {">=": 2024}}
+                (see metadata_index)
         
         Returns:
             List of documents with relevance scores
         """
+        return self.materialize(await self.search(query, top_k, mode, dense_weight, keyword_weight, filters))
+    
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        mode: Optional[str] = None,
+        dense_weight: Optional[float] = None,
+        keyword_weight: Optional[float] = None,
+        filters: Optional[Dict] = None
+    ) -> List[ScoredDocument]:
+        """
+        Rank documents for query without copying them.
+        
+        Rankings are cached per (query, top_k, mode, weights, filters) in an
+        LRU cache that is cleared when the document set or index generation
+        changes (see cache_generation).
+        
+        Args:
+            query: Search query
+            top_k: Number of hits to return
+            mode: "dense", "keyword" or "hybrid" (default: RETRIEVAL_MODE)
+            dense_weight: Hybrid fusion weight of the vector ranking
+            keyword_weight: Hybrid fusion weight of the BM25 ranking
+            filters: Metadata conditions; only matching documents are scored
+        
+        Returns:
+            (document index, score) records, best first
+        """
+        mode = mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}' (expected one of {', '.join(RETRIEVAL_MODES)})")
+        
         if not self.initialized:
             await self.initialize()
         
-        # Use embeddings if available
-        if self.embeddings is not None:
-            return await self._retrieve_with_embeddings(query, top_k)
+        dense_weight = self.dense_weight if dense_weight is None else dense_weight
+        keyword_weight = self.keyword_weight if keyword_weight is None else keyword_weight
+        
+        generation = self.cache_generation
+        self.result_cache.check_generation(generation)
+        key = (
+            query, top_k, mode,
+            (dense_weight, keyword_weight) if mode == "hybrid" else None,
+            json.dumps(filters, sort_keys=True, default=str) if filters else None
+        )
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
+        fallbacks = self._fallbacks
+        for attempt in range(SWAP_RETRIES + 1):
+            documents = self.documents
+            try:
+                hits = await self._search(query, top_k, mode, dense_weight, keyword_weight, filters)
+            except Exception:
+                if self.documents is documents or attempt == SWAP_RETRIES:
+                    raise
+                continue
+            # Positions must refer to the current document list: re-run if a reload swapped it meanwhile
+            if self.documents is documents:
+                break
+        
+        # Do not cache degraded (fallback) rankings or results computed across an index change
+        if self._fallbacks == fallbacks and self.cache_generation == generation:
+            self.result_cache.put(key, tuple(hits))
+        return hits
+    
+    async def _search(
+        self,
+        query: str,
+        top_k: int,
+        mode: str,
+        dense_weight: float,
+        keyword_weight: float,
+        filters: Optional[Dict]
+    ) -> List[ScoredDocument]:
+        """Uncached search (see search); index syncs and scoring run off the event loop"""
+        # Keyword search when asked for, or when no embeddings are available
+        if self.embeddings is None or mode == "keyword":
+            return await run_blocking("retrieval", self._filtered_keyword_search, query, top_k, filters)
+        
+        # Candidate rows, resolved before any scoring
+        mask = None
+        if filters:
+            mask = await run_blocking("retrieval", self._filter_mask, filters)
+            if not mask.any():
+                return []
         
-        # Fallback to keyword search
-        return self._retrieve_with_keywords(query, top_k)
+        if mode == "dense":
+            return await self._retrieve_with_embeddings(query, top_k, mask)
+        
+        return await self._retrieve_hybrid(query, top_k, dense_weight, keyword_weight, mask)
+    
+    def _filter_mask(self, filters: Dict) -> np.ndarray:
+        """Row mask of the documents matching filters (blocking: syncs the metadata index)"""
+        self.metadata_index.sync(self.documents)
+        return self.metadata_index.mask(filters)
     
-    async def _retrieve_with_embeddings(self, query: str, top_k: int) -> List[Dict]:
+    def _filtered_keyword_search(self, query: str, top_k: int, filters: Optional[Dict]) -> List[ScoredDocument]:
+        """Metadata filter and BM25 ranking in one blocking call"""
+        mask = self._filter_mask(filters) if filters else None
+        if mask is not None and not mask.any():
+            return []
+        return self._retrieve_with_keywords(query, top_k, mask)
+    
+    def materialize(self, hits: List[ScoredDocument]) -> List[Dict]:
+        """Document dicts with a relevance_score, for API responses"""
+        return [{**self.documents[hit.index], "relevance_score": hit.score} for hit in hits]
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Unit-normalized float32 query embedding (cached per embedding model)"""
+        self.query_embedding_cache.check_generation(self.embedding_store.model_name if self.embedding_store else None)
+        cached = self.query_embedding_cache.get(query)
+        if cached is not None:
+            return cached
+        
+        if hasattr(self.embedding_client, 'get_embeddings'):
+            # Vertex AI
+            query_emb = self.embedding_client.get_embeddings([query])[0].values
+        else:
+            # sentence-transformers
+            query_emb = self._get_local_model().encode([query])[0]
+        
+        query_emb = np.asarray(query_emb, dtype=np.float32)
+        norm = np.linalg.norm(query_emb)
+        if norm > 0:
+            query_emb = query_emb / norm
+        
+        # Shared between callers: make it read-only
+        query_emb.setflags(write=False)
+        self.query_embedding_cache.put(query, query_emb)
+        return query_emb
+    
+    def _dense_search(self, query: str, top_k: int, mask: Optional[np.ndarray] = None) -> List[ScoredDocument]:
+        """Cosine top-k through the vector index (exact or approximate)"""
+        index = self.vector_index
+        if mask is not None:
+            # Documents appended after the last embedding pass have no row yet, and
+            # rows appended after the mask was built are outside the filter
+            mask = fit_mask(mask, index.matrix.shape[0])
+            if not mask.any():
+                return []
+        rows, scores = index.search(self._embed_query(query), top_k, mask)
+        return [ScoredDocument(int(row), float(score)) for row, score in zip(rows, scores)]
+    
+    async def _retrieve_with_embeddings(
+        self,
+        query: str,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[ScoredDocument]:
         """Retrieve using semantic similarity"""
         
-        # Generate query embedding
         try:
-            if hasattr(self.embedding_client, 'get_embeddings'):
-                # Vertex AI
-                query_emb = self.embedding_client.get_embeddings([query])[0].values
-            else:
-                # sentence-transformers
-                query_emb = self.embedding_client.encode([query])[0]
-            
-            # Compute cosine similarity
-            similarities = np.dot(self.embeddings, query_emb) / (
-                np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_emb)
-            )
-            
-            # Get top-k indices
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
-            
-            # Return documents with scores
-            results = []
-            for idx in top_indices:
-                doc = self.documents[idx].copy()
-                doc["relevance_score"] = float(similarities[idx])
-                results.append(doc)
-            
-            return results
+            return await run_blocking("retrieval", self._dense_search, query, top_k, mask)
         
         except Exception as e:
             self.logger.error(f"❌ Embedding retrieval failed: {e}")
-            return self._retrieve_with_keywords(query, top_k)
+            self._fallbacks += 1
+            return await run_blocking("retrieval", self._retrieve_with_keywords, query, top_k, mask)
     
-    def _retrieve_with_keywords(self, query: str, top_k: int) -> List[Dict]:
-        """Simple keyword-based retrieval"""
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
+    async def _retrieve_hybrid(
+        self,
+        query: str,
+        top_k: int,
+        dense_weight: float,
+        keyword_weight: float,
+        mask: Optional[np.ndarray] = None
+    ) -> List[ScoredDocument]:
+        """Vector and BM25 rankings computed concurrently, fused with RRF"""
+        if dense_weight < 0 or keyword_weight < 0 or dense_weight + keyword_weight <= 0:
+            raise ValueError("Fusion weights must be non-negative and not both zero")
         
-        scored_docs = []
-        for doc in self.documents:
-            content_lower = doc["content"].lower()
-            content_words = set(content_lower.split())
-            
-            # Calculate overlap score
-            overlap = len(query_words.intersection(content_words))
-            
-            if overlap > 0:
-                doc_copy = doc.copy()
-                doc_copy["relevance_score"] = overlap / len(query_words)
-                scored_docs.append(doc_copy)
-        
-        # Sort and return top-k
-        scored_docs.sort(key=lambda x: x["relevance_score"], reverse=True)
-        return scored_docs[:top_k]
+        depth = max(top_k, HYBRID_CANDIDATES)
+        dense, keyword = await asyncio.gather(
+            run_blocking("retrieval", self._dense_search, query, depth, mask),
+            run_blocking("retrieval", self._retrieve_with_keywords, query, depth, mask),
+            return_exceptions=True
+        )
+        
+        if isinstance(keyword, Exception):
+            self.logger.error(f"❌ Keyword retrieval failed: {keyword}")
+            self._fallbacks += 1
+            keyword = []
+        if isinstance(dense, Exception):
+            self.logger.error(f"❌ Embedding retrieval failed: {dense}")
+            self._fallbacks += 1
+            return keyword[:top_k]
+        
+        return reciprocal_rank_fusion([(dense, dense_weight), (keyword, keyword_weight)], top_k)
+    
+    @property
+    def keyword_index(self) -> BM25Index:
+        """BM25 index over self.documents (shared with the DataLoader when they match)"""
+        loader_index = getattr(self.data_loader, 'keyword_index', None)
+        if loader_index is not None and self.documents is self.data_loader.documents:
+            return loader_index
+        return self._own_keyword_index
+    
+    def _retrieve_with_keywords(
+        self,
+        query: str,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[ScoredDocument]:
+        """BM25 keyword retrieval over the inverted index"""
+        index = self.keyword_index
+        index.sync(self.documents)
+        return [ScoredDocument(doc_id, score) for doc_id, score in index.search(query, top_k, mask)]
@@ -22,6 +22,7 @@ from backend.routers import tco, materials, regions, scenarios, admin, ml_visual
 from backend.utils.logger import setup_logger
 from backend.data_knowledge_layer.loader import DataLoader
 from backend.data_knowledge_layer.rag_engine import RAGEngine
+from backend.services.concurrency import loop_lag_monitor
 
 # Setup logging
 logger = setup_logger(__name__)
@@ -48,6 +49,12 @@ async def lifespan(app: FastAPI):
     app.state.rag_engine = None
     app.state.data_loader = None
     app.state.rag_initializing = True
+    app.state.embedding_progress = None
+    app.state.pdf_ingestion = None
+    app.state.kb_readiness = None
+
+    # Probe event-loop responsiveness for the lifetime of the app (see /api/admin/status)
+    loop_lag_monitor.start()
 
     async def _init_rag_background():
         nonlocal app
@@ -56,23 +63,43 @@ async def lifespan(app: FastAPI):
             logger.info("\ud83d\udcda Loading RAG engine (may take 20-30 seconds)...")
 
             data_loader = DataLoader()
-            await data_loader.load_all_datasets()
-            logger.info(f"\u2705 Loaded {len(data_loader.documents)} documents")
-
             rag_engine = RAGEngine(data_loader)
-            await rag_engine.initialize()
-            logger.info("\u2705 RAG engine initialized successfully")
+            # Live progress for /health/ready: tier readiness, embedding throughput, PDF ingestion
+            app.state.kb_readiness = rag_engine.readiness
+            app.state.embedding_progress = rag_engine.retriever.embedding_progress
+            app.state.pdf_ingestion = rag_engine.pdf_ingestion
+
+            # Tier 1: fresh knowledge-base snapshot (see backend/scripts/build_kb_snapshot.py),
+            # otherwise the JSON/CSV/markdown sources; PDFs are streamed in last
+            await rag_engine.load_documents()
+            logger.info(f"\u2705 Loaded {len(data_loader.documents)} documents")
 
-            # Store in app state so routes can access it
+            # Tier 2: keyword index, then serve (keyword retrieval) while the rest loads
+            await rag_engine.initialize(load_embeddings=False)
             app.state.rag_engine = rag_engine
             app.state.data_loader = data_loader
+            app.state.rag_initializing = False
+            logger.info("\u2705 RAG engine serving (keyword retrieval), loading embeddings and PDFs...")
+
+            # Tiers 3-4: embeddings (dense/hybrid retrieval), then PDF chunks
+            await rag_engine.load_remaining_tiers()
+            logger.info("\u2705 RAG engine initialized successfully")
+
+            # Optional data-directory watcher for hot reload (also POST /api/admin/reload-knowledge-base)
+            watch_interval = float(os.getenv("KB_WATCH_INTERVAL", "0"))
+            if watch_interval > 0:
+                app.state.kb_watch_task = asyncio.create_task(rag_engine.watch_sources(watch_interval))
         except Exception as e:
-            logger.error(f"\u26a0\ufe0f RAG initialization failed (continuing with fallback): {e}")
             import traceback
             traceback.print_exc()
-            app.state.rag_engine = None
-            app.state.data_loader = None
-            logger.info("\u2705 Backend ready (RAG disabled, using fallback explanations)")
+            if rag_engine is not None and rag_engine.is_initialized:
+                # A later tier failed; keyword retrieval keeps serving
+                logger.error(f"\u26a0\ufe0f RAG background loading failed (serving the tiers already loaded): {e}")
+            else:
+                logger.error(f"\u26a0\ufe0f RAG initialization failed (continuing with fallback): {e}")
+                app.state.rag_engine = None
+                app.state.data_loader = None
+                logger.info("\u2705 Backend ready (RAG disabled, using fallback explanations)")
         finally:
             app.state.rag_initializing = False
 
@@ -83,6 +110,10 @@ async def lifespan(app: FastAPI):
 
     # Cleanup on shutdown
     logger.info("\ud83d\udc4b Shutting down Smart TCO Calculator Backend...")
+    watch_task = getattr(app.state, "kb_watch_task", None)
+    if watch_task is not None:
+        watch_task.cancel()
+    await loop_lag_monitor.stop()
 
 
 # Create FastAPI app
@@ -141,22 +172,33 @@ async def health_check():
 
 
 @app.get("/health/ready")
-async def readiness_check():
-    """Detailed readiness check"""
+async def readiness_check(request: Request):
+    """
+    Detailed readiness check.
+    Ready (200) once the RAG engine serves keyword retrieval; `tiers` reports
+    the documents, keyword_index, embeddings and pdfs tiers separately.
+    """
     global data_loader, rag_engine
     
     checks = {
         "data_loader": data_loader is not None,
-        "rag_engine": rag_engine is not None,
+        "rag_engine": rag_engine is not None and rag_engine.is_initialized,
     }
     
     all_ready = all(checks.values())
+    progress = getattr(request.app.state, "embedding_progress", None)
+    # Embeddings and PDFs load after readiness and do not affect the status
+    readiness = getattr(request.app.state, "kb_readiness", None)
+    pdf_ingestion = getattr(request.app.state, "pdf_ingestion", None)
     
     return JSONResponse(
         status_code=200 if all_ready else 503,
         content={
             "status": "ready" if all_ready else "not_ready",
             "checks": checks,
+            "tiers": readiness.as_dict() if readiness else None,
+            "embedding_progress": progress.as_dict() if progress else None,
+            "pdf_ingestion": dict(pdf_ingestion) if pdf_ingestion else None,
             "timestamp": "2025-10-09T00:00:00Z"
         }
     )
@@ -190,6 +190,277 @@ class TcoPredictResponse(BaseModel):
         }
 
 
+class TcoBatchRequest(BaseModel):
+    """Request for many TCO predictions evaluated in one vectorized pass"""
+    items: List[TcoPredictRequest] = Field(..., min_length=1, max_length=200000, description="Configurations to price")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"material": "sic", "region": "Germany", "volume": 100000, "years": 5},
+                    {"material": "gan", "region": "Taiwan", "volume": 50000, "years": 3}
+                ]
+            }
+        }
+
+
+class TcoBatchColumns(BaseModel):
+    """Column-oriented batch results (index i = request item i)"""
+    chip_cost: List[float]
+    energy_cost: List[float]
+    carbon_tax: List[float]
+    maintenance: List[float]
+    supply_chain_risk: List[float]
+    total_before_subsidy: List[float]
+    subsidy_amount: List[float]
+    total_after_subsidy: List[float]
+    total_cost: List[float] = Field(..., description="Total TCO after subsidies")
+    cost_per_chip: List[float]
+    annual_cost: List[float]
+
+
+class TcoBatchResponse(BaseModel):
+    """
+    Response for batch TCO prediction.
+    
+    Results are returned as columns in request order; each column holds the
+    value /predict would return for that field (breakdown fields included).
+    """
+    count: int
+    results: TcoBatchColumns
+    currency: str = "EUR"
+    data_availability: Optional[Dict[str, Any]] = Field(None, description="Status of data sources used")
+    warnings: Optional[List[str]] = Field(None, description="Warnings about missing or stale data")
+
+
+class MatrixAxisEntry(BaseModel):
+    """Row/column label of the TCO matrix"""
+    id: str = Field(..., description="Material ID or region code")
+    name: str
+
+
+class RankedEntry(BaseModel):
+    """Ranked TCO entry (rank 1 = cheapest)"""
+    id: str = Field(..., description="Material ID or region code")
+    rank: int
+    total_cost: float
+    cost_per_chip: float
+
+
+class TcoMatrixResponse(BaseModel):
+    """Full materials × regions TCO matrix with server-side rankings"""
+    materials: List[MatrixAxisEntry] = Field(..., description="Matrix rows")
+    regions: List[MatrixAxisEntry] = Field(..., description="Matrix columns")
+    volume: int
+    years: int
+    usage_hours: int
+    total_cost: List[List[float]] = Field(..., description="TCO after subsidies [material][region]")
+    cost_per_chip: List[List[float]] = Field(..., description="Cost per chip [material][region]")
+    breakdown: Optional[Dict[str, List[List[float]]]] = Field(None, description="Cost components [material][region]")
+    region_rankings: Dict[str, List[RankedEntry]] = Field(..., description="Materials ranked per region")
+    material_rankings: Dict[str, List[RankedEntry]] = Field(..., description="Regions ranked per material")
+    best: RankedEntry = Field(..., description="Cheapest material/region pair (id = 'material@region')")
+    currency: str = "EUR"
+
+
+class DistributionKind(str, Enum):
+    """Supported Monte Carlo input distributions"""
+    FIXED = "fixed"
+    UNIFORM = "uniform"
+    TRIANGULAR = "triangular"
+    NORMAL = "normal"
+    LOGNORMAL = "lognormal"
+
+
+class DistributionSpec(BaseModel):
+    """
+    Distribution of one uncertain input.
+    
+    fixed: value; uniform: low, high; triangular: low, mode, high;
+    normal/lognormal: mean, std (of the sampled value itself).
+    Samples are clipped to the parameter's valid range.
+    """
+    kind: DistributionKind
+    value: Optional[float] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+    mode: Optional[float] = None
+    mean: Optional[float] = None
+    std: Optional[float] = Field(None, ge=0)
+
+
+class MonteCarloRequest(BaseModel):
+    """Request for a Monte Carlo TCO uncertainty analysis"""
+    material: str = Field(..., description="Material ID")
+    region: str = Field(..., description="Region code")
+    volume: int = Field(..., gt=0, description="Annual volume of chips (centre of the volume distribution)")
+    years: int = Field(5, ge=1, le=20, description="Analysis period in years")
+    usage_hours: int = Field(43800, gt=0, description="Device usage hours")
+    n_samples: int = Field(100000, ge=1, le=10000000, description="Number of Monte Carlo samples")
+    seed: Optional[int] = Field(None, ge=0, description="Random seed (random if omitted; echoed in the response)")
+    bins: int = Field(50, ge=1, le=1000, description="Histogram bins")
+    chunk_size: int = Field(250000, ge=1000, le=2000000, description="Samples evaluated per vectorized chunk")
+    distributions: Dict[str, DistributionSpec] = Field(
+        default_factory=dict,
+        description="Overrides for energy_cost, carbon_tax, subsidy_rate, chip_cost, volume"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "material": "sic",
+                "region": "Germany",
+                "volume": 100000,
+                "years": 5,
+                "n_samples": 1000000,
+                "seed": 42,
+                "distributions": {
+                    "energy_cost": {"kind": "triangular", "low": 0.12, "mode": 0.18, "high": 0.30}
+                }
+            }
+        }
+
+
+class TcoPercentiles(BaseModel):
+    """TCO percentiles across Monte Carlo samples"""
+    p5: float
+    p50: float
+    p95: float
+
+
+class TcoHistogram(BaseModel):
+    """Histogram of sampled TCO (len(bin_edges) == len(counts) + 1)"""
+    bin_edges: List[float]
+    counts: List[int]
+
+
+class MonteCarloResponse(BaseModel):
+    """Monte Carlo TCO distribution"""
+    material: str
+    region: str
+    volume: int
+    years: int
+    n_samples: int
+    seed: int = Field(..., description="Seed that reproduces this run (with the same chunk_size)")
+    chunk_size: int
+    percentiles: TcoPercentiles
+    mean: float
+    std: float
+    min: float
+    max: float
+    point_estimate: float = Field(..., description="Deterministic TCO with the region's own values")
+    percentile_method: str = Field(..., description="'exact' (single chunk) or 'binned' (streamed, 65536 bins)")
+    histogram: TcoHistogram
+    distributions: Dict[str, DistributionSpec] = Field(..., description="Distributions actually sampled")
+    currency: str = "EUR"
+
+
+class SensitivityRequest(BaseModel):
+    """Request for a sensitivity (tornado) analysis of one or many configurations"""
+    items: List[TcoPredictRequest] = Field(..., min_length=1, max_length=10000, description="Configurations to analyse")
+    swing_pct: float = Field(10.0, gt=0, le=100, description="Relative change applied to each input (±%)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [{"material": "sic", "region": "Germany", "volume": 100000, "years": 5}],
+                "swing_pct": 10
+            }
+        }
+
+
+class SensitivityEntry(BaseModel):
+    """Effect of one input on total_after_subsidy"""
+    parameter: str = Field(..., description="energy_cost, carbon_tax, subsidy, volume, years, usage_hours or chip_cost")
+    value: float = Field(..., description="Base value of the input")
+    derivative: float = Field(..., description="∂TCO/∂input (EUR per unit of input)")
+    elasticity: Optional[float] = Field(None, description="% change in TCO per 1% change in the input")
+    low_value: float
+    high_value: float
+    total_at_low: float
+    total_at_high: float
+    swing: float = Field(..., description="|total_at_high - total_at_low|")
+
+
+class SensitivityResult(BaseModel):
+    """Tornado data for one configuration (entries sorted by swing, largest first)"""
+    material: str
+    region: str
+    total_cost: float
+    entries: List[SensitivityEntry]
+
+
+class SensitivityResponse(BaseModel):
+    """Sensitivity analysis results in request order"""
+    swing_pct: float
+    results: List[SensitivityResult]
+    currency: str = "EUR"
+
+
+class CrossoverParameter(str, Enum):
+    """Inputs the crossover solver can solve for"""
+    VOLUME = "volume"
+    YEARS = "years"
+    ENERGY_COST = "energy_cost"
+    CARBON_TAX = "carbon_tax"
+    USAGE_HOURS = "usage_hours"
+
+
+class CrossoverRequest(BaseModel):
+    """Request for material break-even points in one region"""
+    materials: List[str] = Field(..., min_length=2, max_length=100, description="Material IDs to compare")
+    region: str = Field(..., description="Region code")
+    parameter: CrossoverParameter = Field(..., description="Input to solve for")
+    volume: int = Field(100000, gt=0, description="Annual volume of chips (unless solving for volume)")
+    years: int = Field(5, ge=1, le=20, description="Analysis period in years (unless solving for years)")
+    usage_hours: int = Field(43800, gt=0, description="Device usage hours (unless solving for usage_hours)")
+    energy_cost: Optional[float] = Field(None, description="Override energy cost EUR/kWh")
+    subsidy: Optional[float] = Field(None, ge=0, le=1, description="Override subsidy rate")
+    range_min: Optional[float] = Field(None, ge=0, description="Lower end of the search range")
+    range_max: Optional[float] = Field(None, gt=0, description="Upper end of the search range")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "materials": ["si", "sic", "gan"],
+                "region": "Germany",
+                "parameter": "volume",
+                "years": 5
+            }
+        }
+
+
+class CrossoverPoint(BaseModel):
+    """Parameter value at which two materials cost the same"""
+    material_a: str
+    material_b: str
+    value: float = Field(..., description="Break-even value of the parameter")
+    total_cost: float = Field(..., description="TCO of both materials at the break-even point")
+    method: str = Field(..., description="'closed_form' or 'bisection'")
+    cheaper_below: Optional[str] = Field(None, description="Material that is cheaper below the break-even value")
+    cheaper_above: Optional[str] = Field(None, description="Material that is cheaper above the break-even value")
+
+
+class NoCrossoverPair(BaseModel):
+    """Material pair without a break-even point in the search range"""
+    material_a: str
+    material_b: str
+    reason: str = Field(..., description="'identical', 'parallel' or 'outside_range'")
+    cheaper: Optional[str] = Field(None, description="Material that is cheaper across the range")
+
+
+class CrossoverResponse(BaseModel):
+    """All break-even points between the requested materials"""
+    region: str
+    parameter: CrossoverParameter
+    range_min: float
+    range_max: float
+    crossovers: List[CrossoverPoint]
+    no_crossover: List[NoCrossoverPair]
+    currency: str = "EUR"
+
+
 # ============================================================================
 # AI EXPLANATION MODELS
 # ============================================================================
@@ -14,6 +14,9 @@ from backend.utils.data_audit import DataAudit
 from backend.utils.fetch_energy_prices import update_energy_cache
 from backend.utils.fetch_eia_prices import update_eia_prices_cache
 from backend.train_tco_model import train_model
+from backend.services.data_access import refresh_energy_prices_status
+from backend.routers.tco import tco_engine
+from backend.services.concurrency import concurrency_metrics
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 logger = logging.getLogger(__name__)
@@ -120,6 +123,7 @@ async def update_energy_prices(
         def update_prices():
             try:
                 update_energy_cache(entsoe_api_key)
+                refresh_energy_prices_status()
                 logger.info("✅ Energy prices updated successfully")
             except Exception as e:
                 logger.error(f"❌ Energy price update failed: {e}")
@@ -170,6 +174,7 @@ async def refresh_entsoe_prices(
             try:
                 cache_path = Path(__file__).parent.parent / "data" / "cache" / "energy_prices_live.json"
                 update_energy_cache(entsoe_api_key, cache_path)
+                refresh_energy_prices_status()
                 logger.info("✅ ENTSO-E prices updated successfully")
             except Exception as e:
                 logger.error(f"❌ ENTSO-E price update failed: {e}")
@@ -219,6 +224,7 @@ async def refresh_eia_prices(
         def update_prices():
             try:
                 update_eia_prices_cache(eia_api_key)
+                refresh_energy_prices_status()
                 logger.info("✅ EIA prices updated successfully")
             except Exception as e:
                 logger.error(f"❌ EIA price update failed: {e}")
@@ -275,6 +281,39 @@ async def retrain_ml_model(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/reload-knowledge-base")
+async def reload_knowledge_base(
+    request: Request,
+    x_api_key: Optional[str] = Header(None),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Hot-reload the RAG knowledge base from the data directory.
+    Only source files added, modified or removed since they were loaded are
+    re-read and re-embedded; queries keep being served during the reload.
+    Returns 409 until the PDFs have been ingested after startup.
+    """
+    verify_admin_auth(request, x_api_key, authorization)
+    
+    rag_engine = getattr(request.app.state, "rag_engine", None)
+    if rag_engine is None or not rag_engine.is_initialized:
+        raise HTTPException(status_code=503, detail="RAG engine not ready")
+    
+    try:
+        report = await rag_engine.reload_knowledge_base()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Knowledge-base reload failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "status": "reloaded" if any(report["changes"].values()) else "unchanged",
+        **report,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @router.get("/health-check")
 async def health_check():
     """
@@ -327,5 +366,7 @@ async def get_system_status():
         "energy_prices_available": cache_file.exists(),
         "ml_model_available": model_file.exists(),
         "rag_engine_status": "operational",
+        "ml_batcher": tco_engine.ml_batcher.metrics() if tco_engine.ml_batcher else None,
+        "concurrency": concurrency_metrics(),
         "api_version": "1.0.0"
     }
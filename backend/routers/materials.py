@@ -7,7 +7,7 @@ from typing import List
 import logging
 
 from backend.models.schemas import Material
-from backend.services.data_access import get_materials_catalog
+from backend.services.data_access import get_materials_catalog, get_material_by_id
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -43,10 +43,9 @@ async def get_material(material_id: str):
         Material details
     """
     try:
-        materials = get_materials_catalog()
-        material = next((m for m in materials if m.id == material_id), None)
-        
-        if not material:
+        try:
+            material = get_material_by_id(material_id)
+        except ValueError:
             raise HTTPException(
                 status_code=404,
                 detail=f"Material '{material_id}' not found"
@@ -7,10 +7,11 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
 import numpy as np
 from pydantic import BaseModel
-import joblib
 import json
 import os
 
+from backend.services.model_artifact import get_model_artifact
+
 router = APIRouter(prefix="/api/ml-model", tags=["ML Visualization"])
 
 class FeatureImportance(BaseModel):
@@ -49,18 +50,16 @@ async def get_feature_importance():
     Shows which features have the biggest impact on TCO predictions
     """
     try:
-        # Load the trained Random Forest model
-        model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'tco_random_forest.pkl')
+        # Shared memory-mapped Random Forest (no per-request unpickling)
         metadata_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'tco_random_forest.json')
         
-        if not os.path.exists(model_path):
+        model = get_model_artifact()
+        if model is None:
             raise HTTPException(
                 status_code=404, 
                 detail="Model file not found. Train the model first using train_tco_model.py"
             )
         
-        model = joblib.load(model_path)
-        
         # Load metadata
         metadata = {}
         if os.path.exists(metadata_path):
@@ -100,7 +99,7 @@ async def get_feature_importance():
             
             # Get model metrics from metadata
             n_estimators = metadata.get('n_estimators', model.n_estimators if hasattr(model, 'n_estimators') else 100)
-            max_depth = metadata.get('max_depth', model.max_depth if hasattr(model, 'max_depth') else 20)
+            max_depth = metadata.get('max_depth', model.manifest.get('max_depth_param') or 20)
             r2_test = metadata.get('r2_test', 0.84)
             training_samples = metadata.get('training_samples', 20000)
             
@@ -141,47 +140,28 @@ async def get_tree_structure(tree_index: int):
     Used for visualization purposes
     """
     try:
-        model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'tco_random_forest.pkl')
-        
-        model = joblib.load(model_path)
+        model = get_model_artifact()
+        if model is None:
+            raise FileNotFoundError("tco_random_forest.pkl")
         
-        if tree_index >= len(model.estimators_):
+        if tree_index < 0 or tree_index >= model.n_estimators:
             raise HTTPException(
                 status_code=400,
-                detail=f"Tree index {tree_index} out of range. Model has {len(model.estimators_)} trees."
+                detail=f"Tree index {tree_index} out of range. Model has {model.n_estimators} trees."
             )
         
-        tree = model.estimators_[tree_index].tree_
-        
-        # Extract tree structure
-        def extract_node_info(node_id):
-            if tree.feature[node_id] == -2:  # Leaf node
-                return {
-                    'id': node_id,
-                    'type': 'leaf',
-                    'value': float(tree.value[node_id][0][0]),
-                    'samples': int(tree.n_node_samples[node_id])
-                }
-            else:
-                return {
-                    'id': node_id,
-                    'type': 'decision',
-                    'feature': int(tree.feature[node_id]),
-                    'threshold': float(tree.threshold[node_id]),
-                    'samples': int(tree.n_node_samples[node_id]),
-                    'left_child': extract_node_info(tree.children_left[node_id]),
-                    'right_child': extract_node_info(tree.children_right[node_id])
-                }
-        
-        tree_structure = extract_node_info(0)
+        # Extract tree structure from the flattened node arrays
+        tree = model.tree_structure(tree_index)
         
         return {
             'tree_index': tree_index,
-            'total_nodes': tree.node_count,
-            'max_depth': tree.max_depth,
-            'structure': tree_structure
+            'total_nodes': tree['total_nodes'],
+            'max_depth': tree['max_depth'],
+            'structure': tree['structure']
         }
     
+    except HTTPException:
+        raise
     except FileNotFoundError:
         raise HTTPException(
             status_code=404,
@@ -203,29 +183,29 @@ async def get_model_info():
         model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'tco_random_forest.pkl')
         metadata_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'tco_random_forest.json')
         
-        if not os.path.exists(model_path):
+        model = get_model_artifact()
+        if model is None:
             return {
                 'model_exists': False,
                 'message': 'Model not trained yet. Run train_tco_model.py to train the model.'
             }
         
-        model = joblib.load(model_path)
-        
         # Load metadata
         metadata = {}
         if os.path.exists(metadata_path):
             with open(metadata_path, 'r') as f:
                 metadata = json.load(f)
         
-        model_size_mb = os.path.getsize(model_path) / (1024 * 1024)
+        model_size_mb = os.path.getsize(model_path) / (1024 * 1024) if os.path.exists(model_path) else 0.0
         
         return {
             'model_exists': True,
-            'model_type': type(model).__name__,
-            'n_estimators': model.n_estimators if hasattr(model, 'n_estimators') else None,
-            'max_depth': model.max_depth if hasattr(model, 'max_depth') else None,
-            'n_features': model.n_features_in_ if hasattr(model, 'n_features_in_') else None,
+            'model_type': model.manifest.get('model_type'),
+            'n_estimators': model.n_estimators,
+            'max_depth': model.manifest.get('max_depth_param'),
+            'n_features': model.n_features_in_,
             'model_size_mb': round(model_size_mb, 2),
+            'artifact': model.manifest.get('artifact'),
             'training_date': 'October 2025',
             'data_sources': [
                 'Materials Project API',
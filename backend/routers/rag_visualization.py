@@ -3,14 +3,14 @@ RAG Visualization Router
 Provides endpoints for RAG system introspection and explainability
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Header, Response
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
-import numpy as np
-from sklearn.manifold import TSNE
 import os
 import json
 
+from backend.services.concurrency import run_blocking
+
 router = APIRouter(prefix="/api/rag", tags=["rag-visualization"])
 
 class EmbeddingPoint(BaseModel):
@@ -38,9 +38,12 @@ class RAGStats(BaseModel):
     embedding_dimension: int
     model_name: str
     index_type: str
+    caches: Optional[Dict] = None
 
 class EmbeddingsVizResponse(BaseModel):
     embeddings: List[EmbeddingPoint]
+    method: Optional[str] = None
+    version: Optional[str] = None
 
 # Category mapping for documents
 DOCUMENT_CATEGORIES = {
@@ -68,10 +71,13 @@ def categorize_document(filename: str) -> str:
 
 
 @router.get("/embeddings-viz", response_model=EmbeddingsVizResponse)
-async def get_embeddings_visualization():
+async def get_embeddings_visualization(if_none_match: Optional[str] = Header(None)):
     """
-    Get t-SNE projection of document embeddings for visualization
-    Returns 2D coordinates of documents in semantic space
+    Get the 2-D projection of document embeddings for visualization
+    
+    The projection (t-SNE, or PCA for large corpora) is computed in the
+    background after each index build; this endpoint only serves it.
+    Responses carry the projection version as ETag and honour If-None-Match.
     """
     try:
         # Import RAG engine from main
@@ -83,61 +89,34 @@ async def get_embeddings_visualization():
                 detail="RAG system not initialized. Please wait for initialization."
             )
         
-        # Get all embeddings and documents from retriever
-        embeddings = []
-        documents = []
-        categories = []
-        snippets = []
-        
-        for doc in rag_engine.retriever.documents:
-            # Get document text
-            doc_text = doc.get('content', doc.get('text', ''))[:200]  # First 200 chars
-            
-            # Generate embedding for this text (if needed)
-            if rag_engine.retriever.embeddings is not None and len(embeddings) < len(rag_engine.retriever.documents):
-                # Use pre-computed embedding if available
-                if len(embeddings) < len(rag_engine.retriever.embeddings):
-                    embeddings.append(rag_engine.retriever.embeddings[len(embeddings)])
-            
-            source = doc.get('source', doc.get('metadata', {}).get('source', 'Unknown'))
-            documents.append(source)
-            categories.append(categorize_document(source))
-            snippets.append(doc_text)
-        
-        # If we don't have pre-computed embeddings, generate them on the fly
-        if len(embeddings) == 0:
-            from sentence_transformers import SentenceTransformer
-            model = SentenceTransformer('all-MiniLM-L6-v2')
-            texts = [doc.get('content', doc.get('text', ''))[:500] for doc in rag_engine.retriever.documents]
-            embeddings = model.encode(texts)
-        
-        if len(embeddings) < 2:
+        retriever = rag_engine.retriever
+        projection = retriever.projection
+        if projection is None:
+            if retriever.embeddings is None:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Embeddings not available (keyword-only retrieval)"
+                )
             raise HTTPException(
-                status_code=400,
-                detail="Not enough documents for visualization (need at least 2)"
+                status_code=503,
+                detail="Embedding projection is being computed. Please retry shortly.",
+                headers={"Retry-After": "5"}
             )
         
-        # Convert to numpy array
-        embeddings_array = np.array(embeddings)
+        headers = {"ETag": projection.etag, "Cache-Control": "no-cache"}
+        if if_none_match and projection.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
         
-        # Apply t-SNE for dimensionality reduction to 2D
-        tsne = TSNE(n_components=2, random_state=42, perplexity=min(30, len(embeddings) - 1))
-        embeddings_2d = tsne.fit_transform(embeddings_array)
+        body = _viz_body_cache.get(projection.version)
+        if body is None:
+            body = await run_blocking("retrieval", _render_projection, projection, retriever.documents)
+            _viz_body_cache.clear()
+            _viz_body_cache[projection.version] = body
         
-        # Create visualization points
-        viz_points = []
-        for i in range(len(embeddings_2d)):
-            viz_points.append(EmbeddingPoint(
-                x=float(embeddings_2d[i, 0]),
-                y=float(embeddings_2d[i, 1]),
-                z=float(len(snippets[i])),  # Use snippet length for bubble size
-                document=documents[i],
-                category=categories[i],
-                snippet=snippets[i][:100]  # Limit snippet to 100 chars
-            ))
-        
-        return EmbeddingsVizResponse(embeddings=viz_points)
+        return Response(content=body, media_type="application/json", headers=headers)
     
+    except HTTPException:
+        raise
     except ImportError:
         raise HTTPException(
             status_code=503,
@@ -150,6 +129,34 @@ async def get_embeddings_visualization():
         )
 
 
+# Serialized /embeddings-viz response of the current projection version
+_viz_body_cache: Dict[str, bytes] = {}
+
+
+def _render_projection(projection, documents: List[Dict]) -> bytes:
+    """JSON body of EmbeddingsVizResponse for a projection (rows align with documents)"""
+    viz_points = []
+    for i, (x, y) in enumerate(projection.coords.tolist()):
+        doc = documents[i]
+        snippet = doc.get('content', doc.get('text', ''))[:200]  # First 200 chars
+        source = doc.get('source', doc.get('metadata', {}).get('source', 'Unknown'))
+        viz_points.append(EmbeddingPoint(
+            x=x,
+            y=y,
+            z=float(len(snippet)),  # Use snippet length for bubble size
+            document=source,
+            category=categorize_document(source),
+            snippet=snippet[:100]  # Limit snippet to 100 chars
+        ))
+    
+    response = EmbeddingsVizResponse(
+        embeddings=viz_points,
+        method=projection.method,
+        version=projection.version
+    )
+    return response.model_dump_json().encode("utf-8")
+
+
 @router.get("/retrieval-demo", response_model=RetrievalExample)
 async def get_retrieval_demo(
     query: str = Query(..., description="Query to test document retrieval"),
@@ -231,12 +238,17 @@ async def get_rag_stats():
         if rag_engine.retriever.embeddings is not None and len(rag_engine.retriever.embeddings) > 0:
             embedding_dim = rag_engine.retriever.embeddings.shape[1]
         
+        # Vector index in use (exact, ivf or faiss); BM25 only without embeddings
+        vector_index = rag_engine.retriever.vector_index
+        index_type = vector_index.kind if vector_index is not None else "bm25"
+        
         return RAGStats(
             total_documents=total_docs,
             total_chunks=total_chunks,
             embedding_dimension=embedding_dim,
             model_name="sentence-transformers/all-MiniLM-L6-v2",
-            index_type="FAISS"
+            index_type=index_type,
+            caches=rag_engine.retriever.cache_stats()
         )
     
     except ImportError:
@@ -7,7 +7,7 @@ from typing import List
 import logging
 
 from backend.models.schemas import Region
-from backend.services.data_access import get_regions_catalog
+from backend.services.data_access import get_regions_catalog, get_region_by_code
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -43,10 +43,9 @@ async def get_region(region_code: str):
         Region details
     """
     try:
-        regions = get_regions_catalog()
-        region = next((r for r in regions if r.code == region_code), None)
-        
-        if not region:
+        try:
+            region = get_region_by_code(region_code)
+        except ValueError:
             raise HTTPException(
                 status_code=404,
                 detail=f"Region '{region_code}' not found"
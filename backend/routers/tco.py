@@ -2,13 +2,23 @@
 TCO router - main prediction and explanation endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, Request
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, Query
+from typing import List, Optional
+import asyncio
 import logging
 
 from backend.models.schemas import (
     TcoPredictRequest,
     TcoPredictResponse,
+    TcoBatchRequest,
+    TcoBatchResponse,
+    TcoMatrixResponse,
+    MonteCarloRequest,
+    MonteCarloResponse,
+    SensitivityRequest,
+    SensitivityResponse,
+    CrossoverRequest,
+    CrossoverResponse,
     ExplainRequest,
     ExplainResponse,
     ChatRequest,
@@ -48,6 +58,11 @@ async def predict_tco(request: TcoPredictRequest):
         # Calculate TCO
         result = tco_engine.calculate_tco(request)
         
+        # Random Forest estimate alongside the formulas; concurrent requests share one predict()
+        ml_estimate = await tco_engine.ml_estimate(request)
+        if ml_estimate is not None:
+            result.data_availability["ml_estimate"] = round(float(ml_estimate), 2)
+        
         logger.info(f"✅ TCO calculated: €{result.total_cost:,.0f}")
         logger.info(f"   Cost per chip: €{result.cost_per_chip:.2f}")
         
@@ -62,6 +77,164 @@ async def predict_tco(request: TcoPredictRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/predict/batch", response_model=TcoBatchResponse)
+async def predict_tco_batch(request: TcoBatchRequest):
+    """
+    Calculate TCO for many material/region/volume/years combinations at once.
+    
+    All rows are evaluated in a single vectorized pass and match
+    /predict exactly.
+    
+    Args:
+        request: List of TCO prediction parameters
+    
+    Returns:
+        Per-row TCO breakdowns in request order
+    """
+    try:
+        logger.info(f"🔮 Predicting TCO batch of {len(request.items)} configurations")
+        
+        result = tco_engine.calculate_tco_batch(request.items)
+        
+        logger.info(f"✅ Batch TCO calculated: {result.count} results")
+        
+        return result
+    
+    except ValueError as e:
+        logger.error(f"❌ Invalid input: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except Exception as e:
+        logger.error(f"❌ Batch TCO calculation failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/predict/matrix", response_model=TcoMatrixResponse)
+async def predict_tco_matrix(
+    volume: int = Query(100000, gt=0, description="Annual volume of chips"),
+    years: int = Query(5, ge=1, le=20, description="Analysis period in years"),
+    usage_hours: int = Query(43800, gt=0, description="Device usage hours"),
+    materials: Optional[List[str]] = Query(None, description="Material IDs (default: all)"),
+    regions: Optional[List[str]] = Query(None, description="Region codes (default: all)"),
+    top_k: Optional[int] = Query(None, ge=1, description="Keep only the k cheapest entries per ranking"),
+    include_breakdown: bool = Query(False, description="Include every cost component matrix")
+):
+    """
+    Calculate TCO for every material × region combination in one pass.
+    
+    Replaces hundreds of /predict round trips for comparison dashboards.
+    
+    Returns:
+        TCO matrix with per-region and per-material rankings
+    """
+    try:
+        logger.info(f"🧮 Computing TCO matrix (volume={volume}, years={years})")
+        
+        result = tco_engine.calculate_tco_matrix(
+            volume=volume,
+            years=years,
+            usage_hours=usage_hours,
+            material_ids=materials,
+            region_codes=regions,
+            top_k=top_k,
+            include_breakdown=include_breakdown
+        )
+        
+        logger.info(f"✅ TCO matrix: {len(result.materials)}×{len(result.regions)}, best {result.best.id}")
+        
+        return result
+    
+    except ValueError as e:
+        logger.error(f"❌ Invalid input: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except Exception as e:
+        logger.error(f"❌ TCO matrix calculation failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/predict/sensitivity", response_model=SensitivityResponse)
+async def predict_tco_sensitivity(request: SensitivityRequest):
+    """
+    Sensitivity / tornado analysis.
+    
+    For every configuration, returns ∂TCO/∂input and the TCO at ±swing_pct
+    for energy_cost, carbon_tax, subsidy, volume, years, usage_hours and
+    chip_cost, computed in closed form plus one vectorized pass.
+    
+    Returns:
+        Tornado entries per configuration, largest swing first
+    """
+    try:
+        logger.info(f"🌪️ Sensitivity analysis for {len(request.items)} configurations (±{request.swing_pct}%)")
+        
+        return tco_engine.calculate_sensitivity(request.items, request.swing_pct)
+    
+    except ValueError as e:
+        logger.error(f"❌ Invalid input: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except Exception as e:
+        logger.error(f"❌ Sensitivity analysis failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/predict/crossover", response_model=CrossoverResponse)
+async def predict_tco_crossover(request: CrossoverRequest):
+    """
+    Material crossover / break-even solver.
+    
+    Answers questions like "at what volume does SiC beat Si in Germany?"
+    for every pair of the requested materials in a single response.
+    
+    Returns:
+        Break-even values with the cheaper material on each side
+    """
+    try:
+        logger.info(f"⚖️ Crossover on {request.parameter.value}: {', '.join(request.materials)} in {request.region}")
+        
+        return tco_engine.calculate_crossovers(request)
+    
+    except ValueError as e:
+        logger.error(f"❌ Invalid input: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except Exception as e:
+        logger.error(f"❌ Crossover calculation failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/predict/monte-carlo", response_model=MonteCarloResponse)
+async def predict_tco_monte_carlo(request: MonteCarloRequest):
+    """
+    Monte Carlo TCO uncertainty analysis.
+    
+    Samples energy price, carbon tax, subsidy rate, chip cost and volume
+    (defaults derived from global_electricity_data_2025.json) and returns
+    P5/P50/P95, moments and a histogram. Pass a seed to reproduce a run.
+    
+    Returns:
+        TCO distribution summary
+    """
+    try:
+        logger.info(f"🎲 Monte Carlo TCO: {request.material} in {request.region}, {request.n_samples:,} samples")
+        
+        # CPU-bound for large runs: keep the event loop responsive
+        result = await asyncio.to_thread(tco_engine.calculate_tco_monte_carlo, request)
+        
+        logger.info(f"✅ Monte Carlo P50: €{result.percentiles.p50:,.2f} (seed {result.seed})")
+        
+        return result
+    
+    except ValueError as e:
+        logger.error(f"❌ Invalid input: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except Exception as e:
+        logger.error(f"❌ Monte Carlo TCO failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/explain", response_model=ExplainResponse)
 async def explain_tco(request: ExplainRequest, fastapi_request: Request):
     """
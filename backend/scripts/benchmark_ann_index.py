@@ -0,0 +1,88 @@
+"""
+Recall@k and latency of the approximate vector indexes against exact search
+Uses the stored embeddings of --model if present (with --queries rows held out of the
+indexes as queries), otherwise a synthetic clustered corpus with held-out queries.
+
+Run from the repository root:
+    python -m backend.scripts.benchmark_ann_index [--model all-MiniLM-L6-v2] [--rows 100000] [--k 10]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from backend.data_knowledge_layer.ann_index import (
+    FAISS_AVAILABLE, ExactIndex, FaissHNSWIndex, IVFIndex, evaluate_index, held_out_split
+)
+from backend.data_knowledge_layer.embedding_store import EmbeddingStore, normalize_rows
+
+
+def synthetic_corpus(rows: int, queries: int, dim: int, clusters: int, seed: int = 0):
+    """
+    Unit vectors scattered around random topic centres (roughly like text
+    embeddings), plus held-out queries drawn from the same topics.
+    """
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+
+    def draw(n):
+        labels = rng.integers(0, clusters, n)
+        return normalize_rows(centres[labels] + rng.normal(scale=2.0, size=(n, dim)).astype(np.float32))
+
+    return draw(rows), draw(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Embedding store to benchmark")
+    parser.add_argument("--rows", type=int, default=100000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic embedding dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per measurement")
+    parser.add_argument("--k", type=int, default=10, help="k for recall@k")
+    args = parser.parse_args()
+
+    stored = EmbeddingStore(args.model).load()
+    if stored is not None and stored[0].shape[0] >= 1000:
+        matrix, queries = held_out_split(stored[0], args.queries, seed=1)
+        print(f"📦 Using stored embeddings: {args.model} ({matrix.shape[0]:,} x {matrix.shape[1]}, "
+              f"{len(queries)} rows held out as queries)")
+    else:
+        print(f"⚠️  No large embedding store for {args.model}, generating {args.rows:,} synthetic vectors...")
+        matrix, queries = synthetic_corpus(args.rows, args.queries, args.dim, clusters=max(10, args.rows // 100))
+
+    exact = ExactIndex(matrix)
+
+    print()
+    print("=" * 80)
+    print(f"🧭 RECALL@{args.k} AND LATENCY vs EXACT ({len(queries)} queries)")
+    print("=" * 80)
+    print(f"  {'index':24} {'build (s)':>10} {'recall':>8} {'ann ms':>8} {'p95':>8} {'exact ms':>9} {'speedup':>8}")
+
+    start = time.perf_counter()
+    ivf = IVFIndex.build(matrix)
+    build_seconds = time.perf_counter() - start
+    for nprobe in (4, 8, 16, 32, 64):
+        if nprobe > ivf.nlist:
+            break
+        ivf.nprobe = nprobe
+        report = evaluate_index(ivf, exact, queries, args.k)
+        print(f"  {f'ivf nlist={ivf.nlist} nprobe={nprobe}':24} {build_seconds:10.1f} {report['recall_at_k']:8.3f} "
+              f"{report['ann_ms_mean']:8.3f} {report['ann_ms_p95']:8.3f} {report['exact_ms_mean']:9.3f} "
+              f"{report['exact_ms_mean'] / report['ann_ms_mean']:7.1f}x")
+
+    if FAISS_AVAILABLE:
+        start = time.perf_counter()
+        hnsw = FaissHNSWIndex.build(matrix)
+        build_seconds = time.perf_counter() - start
+        report = evaluate_index(hnsw, exact, queries, args.k)
+        print(f"  {'faiss hnsw':24} {build_seconds:10.1f} {report['recall_at_k']:8.3f} "
+              f"{report['ann_ms_mean']:8.3f} {report['ann_ms_p95']:8.3f} {report['exact_ms_mean']:9.3f} "
+              f"{report['exact_ms_mean'] / report['ann_ms_mean']:7.1f}x")
+    else:
+        print("  (faiss not installed - HNSW backend skipped)")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Throughput of sequential vs concurrent, rate-limited embedding batching
+Runs entirely against an in-process fake embedding server (no network access).
+
+Run from the repository root:
+    python -m backend.scripts.benchmark_embedding_batching [--texts 2000] [--latency-ms 150] [--rps 20]
+"""
+
+import argparse
+import time
+
+from backend.data_knowledge_layer.embedding_batcher import BatchEmbedder, VertexRESTEmbeddingClient
+from backend.scripts.fake_embedding_server import FakeEmbeddingServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--texts", type=int, default=2000, help="Texts to embed per run")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Fake server latency per request")
+    parser.add_argument("--per-text-ms", type=float, default=2.0, help="Fake server latency per text")
+    parser.add_argument("--rps", type=float, default=20.0, help="Fake server quota (requests/s, 429 above)")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of 503 responses")
+    args = parser.parse_args()
+
+    server = FakeEmbeddingServer(
+        latency_ms=args.latency_ms, per_text_ms=args.per_text_ms, rps=args.rps, error_rate=args.error_rate
+    ).start()
+    client = VertexRESTEmbeddingClient(server.endpoint, "textembedding-gecko@003")
+    texts = [f"Semiconductor TCO document {i}: energy, materials and carbon costs." for i in range(args.texts)]
+
+    # (label, batch size, concurrency, client-side requests/s)
+    configurations = [
+        ("sequential (old)", 5, 1, 0),
+        ("batch 16", 16, 1, 0),
+        ("batch 16 x4", 16, 4, args.rps * 0.9),
+        ("batch 32 x8", 32, 8, args.rps * 0.9),
+        ("batch 32 x8 no limit", 32, 8, 0),
+    ]
+
+    print()
+    print("=" * 80)
+    print(f"📡 EMBEDDING BATCHING ({args.texts:,} texts, {args.latency_ms:.0f}ms + {args.per_text_ms:.0f}ms/text, "
+          f"quota {args.rps:.0f} req/s, {args.error_rate:.0%} errors)")
+    print("=" * 80)
+    print(f"  {'config':22} {'seconds':>8} {'texts/s':>9} {'speedup':>8} {'retries':>8} {'429s':>6}")
+
+    baseline = None
+    for label, batch_size, concurrency, rate in configurations:
+        throttled_before = server.stats["throttled"]
+        embedder = BatchEmbedder(
+            client, batch_size=batch_size, concurrency=concurrency,
+            requests_per_second=rate, max_retries=8, backoff_base=0.2
+        )
+        start = time.perf_counter()
+        embedder.embed(texts)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        progress = embedder.progress.as_dict()
+        print(f"  {label:22} {seconds:8.2f} {args.texts / seconds:9.1f} {baseline / seconds:7.1f}x "
+              f"{progress['retries']:8d} {server.stats['throttled'] - throttled_before:6d}")
+    print("=" * 80)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
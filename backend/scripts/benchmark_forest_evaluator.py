@@ -0,0 +1,101 @@
+"""
+Latency benchmark: flattened NumPy forest vs sklearn
+Uses models/tco_random_forest.pkl, or trains an equivalent forest if it is missing.
+Prediction parity is covered by backend/tests/test_forest_evaluator.py.
+
+Run from the repository root:
+    python -m backend.scripts.benchmark_forest_evaluator [--rows 10000] [--repeats 50]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from backend.services.forest_evaluator import flatten_forest
+from backend.train_tco_model import generate_training_data
+
+FEATURE_COLS = [
+    'band_gap_ev', 'density_g_cm3', 'trl', 'volume_log', 'years',
+    'energy_cost_eur_kwh', 'carbon_tax_eur_ton', 'subsidy_rate', 'base_cost_eur'
+]
+
+MODEL_PATH = Path(__file__).parent.parent / "models" / "tco_random_forest.pkl"
+
+
+def load_or_train_model():
+    """Load the production model, or fit one with the same hyperparameters"""
+    if MODEL_PATH.exists():
+        print(f"📦 Loading model: {MODEL_PATH}")
+        return joblib.load(MODEL_PATH)
+
+    print("⚠️  Model file not found, training an equivalent forest (200 trees)...")
+    df = generate_training_data(n_samples=20000)
+    model = RandomForestRegressor(
+        n_estimators=200,
+        max_depth=25,
+        min_samples_split=10,
+        min_samples_leaf=4,
+        max_features='sqrt',
+        random_state=42,
+        n_jobs=-1
+    )
+    model.fit(df[FEATURE_COLS].to_numpy(), df['tco_eur'].to_numpy())
+    return model
+
+
+def time_call(fn, repeats: int) -> float:
+    """Median wall time of fn() in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000, help="Batch size for batch timing")
+    parser.add_argument("--repeats", type=int, default=50, help="Timing repetitions (single row)")
+    args = parser.parse_args()
+
+    model = load_or_train_model()
+    # Single-threaded sklearn predictions accumulate trees in a fixed order
+    model.set_params(n_jobs=1, verbose=0)
+
+    start = time.perf_counter()
+    forest = flatten_forest(model)
+    export_ms = (time.perf_counter() - start) * 1000
+    print(f"🌳 Flattened {forest.n_trees} trees / {forest.n_nodes:,} nodes "
+          f"(max depth {forest.max_depth}) in {export_ms:.1f} ms")
+
+    X = generate_training_data(n_samples=args.rows)[FEATURE_COLS].to_numpy()
+
+    # Benchmark
+    row = X[:1]
+    single_sklearn = time_call(lambda: model.predict(row), args.repeats)
+    single_numpy = time_call(lambda: forest.predict(row), args.repeats)
+    batch_repeats = max(3, args.repeats // 10)
+    batch_sklearn = time_call(lambda: model.predict(X), batch_repeats)
+    batch_numpy = time_call(lambda: forest.predict(X), batch_repeats)
+
+    print()
+    print("=" * 80)
+    print("⏱️  LATENCY (median)")
+    print("=" * 80)
+    print(f"  {'':20} {'sklearn':>12} {'numpy':>12} {'speedup':>10}")
+    print(f"  {'single row (ms)':20} {single_sklearn:12.3f} {single_numpy:12.3f} "
+          f"{single_sklearn / single_numpy:9.1f}x")
+    print(f"  {f'batch {len(X):,} (ms)':20} {batch_sklearn:12.3f} {batch_numpy:12.3f} "
+          f"{batch_sklearn / batch_numpy:9.1f}x")
+    print(f"  {'batch µs/row':20} {batch_sklearn * 1000 / len(X):12.3f} "
+          f"{batch_numpy * 1000 / len(X):12.3f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
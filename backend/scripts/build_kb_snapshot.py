@@ -0,0 +1,70 @@
+"""
+Build the knowledge-base snapshot that instances load at startup
+Loads every source (including all PDF chunks), embeds the documents with the
+configured embedding backend and writes documents, datasets, keyword index,
+embeddings, the ANN index (large corpora) and source hashes to one file
+(see data_knowledge_layer/kb_snapshot).
+
+Run from the repository root:
+    python -m backend.scripts.build_kb_snapshot [--output PATH] [--no-embeddings]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from backend.data_knowledge_layer.kb_snapshot import snapshot_path, source_manifest, write_snapshot
+from backend.data_knowledge_layer.loader import DataLoader
+from backend.data_knowledge_layer.retriever import Retriever
+
+
+async def build(output: Path, with_embeddings: bool):
+    start = time.perf_counter()
+    data_loader = DataLoader()
+    await data_loader.load_all_datasets()
+    if not data_loader.documents:
+        raise SystemExit("❌ No documents loaded, snapshot not written")
+
+    embeddings, model_name, vector_index = None, None, None
+    if with_embeddings:
+        retriever = Retriever(data_loader)
+        await retriever.initialize()
+        if retriever.embeddings is not None:
+            embeddings = retriever.embeddings
+            model_name = retriever.embedding_store.model_name
+            vector_index = retriever.vector_index
+        else:
+            print("⚠️  No embedding backend available, writing snapshot without embeddings")
+
+    header = write_snapshot(
+        output,
+        data_loader.documents,
+        data_loader.datasets,
+        data_loader.keyword_index.to_arrays(),
+        source_manifest(data_loader.source_files()),
+        embeddings,
+        model_name,
+        vector_index
+    )
+    size_mb = output.stat().st_size / 1e6
+    print(
+        f"📦 Wrote {output} ({header['documents']} documents, embeddings: {model_name or 'none'}, "
+        f"vector index: {(header['vector_index'] or {}).get('kind', 'exact')}, "
+        f"{size_mb:.1f} MB) in {time.perf_counter() - start:.1f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", type=Path, default=None, help="Snapshot file (default: KB_SNAPSHOT_PATH or data/cache/kb_snapshot.bin)")
+    parser.add_argument("--no-embeddings", action="store_true", help="Only documents, datasets and keyword index")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(build(snapshot_path(args.output), not args.no_embeddings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Local stand-in for the Vertex AI text-embedding predict API
+Deterministic vectors with configurable latency, rate limit (429) and error rate (503).
+
+Run from the repository root:
+    python -m backend.scripts.fake_embedding_server [--port 8085] [--latency-ms 150] [--rps 20]
+
+Then point the backend at it:
+    EMBEDDING_ENDPOINT=http://127.0.0.1:8085/v1/projects/local/locations/local/publishers/google/models
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+class FakeEmbeddingServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering POST .../<model>:predict"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, dim: int = 768, latency_ms: float = 150.0,
+                 per_text_ms: float = 2.0, rps: float = 0.0, error_rate: float = 0.0,
+                 max_instances: int = 250, seed: int = 0):
+        super().__init__(("127.0.0.1", port), PredictHandler)
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self.per_text_ms = per_text_ms
+        self.rps = rps
+        self.error_rate = error_rate
+        self.max_instances = max_instances
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_requests = 0
+        self.stats = {"requests": 0, "texts": 0, "throttled": 0, "errors": 0}
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/projects/local/locations/local/publishers/google/models"
+
+    def admit(self) -> int:
+        """HTTP status for the next request: 200, 429 (over rps) or 503 (injected error)"""
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_requests = now, 0
+            self.window_requests += 1
+            if self.rps > 0 and self.window_requests > self.rps:
+                self.stats["throttled"] += 1
+                return 429
+            if self.random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 503
+        return 200
+
+    def embed(self, text: str) -> list:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).normal(size=self.dim)
+        return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+    def start(self) -> "FakeEmbeddingServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class PredictHandler(BaseHTTPRequestHandler):
+    server: FakeEmbeddingServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        if not self.path.endswith(":predict"):
+            return self._reply(404, {"error": {"code": 404, "message": f"Unknown path {self.path}"}})
+
+        length = int(self.headers.get("Content-Length", 0))
+        instances = json.loads(self.rfile.read(length) or b"{}").get("instances", [])
+        if len(instances) > self.server.max_instances:
+            return self._reply(400, {"error": {"code": 400, "message": f"At most {self.server.max_instances} instances"}})
+
+        status = self.server.admit()
+        if status == 429:
+            return self._reply(429, {"error": {"code": 429, "message": "Quota exceeded"}}, {"Retry-After": "1"})
+
+        time.sleep((self.server.latency_ms + self.server.per_text_ms * len(instances)) / 1000)
+        if status == 503:
+            return self._reply(503, {"error": {"code": 503, "message": "Service unavailable"}})
+
+        with self.server.lock:
+            self.server.stats["texts"] += len(instances)
+        predictions = [{"embeddings": {"values": self.server.embed(i.get("content", ""))}} for i in instances]
+        self._reply(200, {"predictions": predictions})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Fixed latency per request")
+    parser.add_argument("--per-text-ms", type=float, default=2.0, help="Extra latency per text")
+    parser.add_argument("--rps", type=float, default=20.0, help="Requests per second before 429 (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    server = FakeEmbeddingServer(args.port, args.dim, args.latency_ms, args.per_text_ms, args.rps, args.error_rate)
+    print(f"🧪 Fake embedding server on {server.endpoint}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
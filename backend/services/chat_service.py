@@ -8,6 +8,7 @@ import os
 from typing import List, Optional
 from backend.models.schemas import ChatMessage, TcoPredictResponse
 from backend.data_knowledge_layer.rag_engine import RAGEngine
+from backend.services.concurrency import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -158,8 +159,10 @@ Be conversational and helpful.""")
         
         prompt = "\n".join(prompt_parts)
         
-        # Generate with Gemini using new API
-        response = self.client.models.generate_content(
+        # Generate with Gemini on the LLM executor (the SDK call blocks)
+        response = await run_blocking(
+            "llm",
+            self.client.models.generate_content,
             model='gemini-2.0-flash-exp',
             contents=prompt,
             config={
@@ -0,0 +1,229 @@
+"""
+Concurrency - Bounded executors for blocking work and an event-loop lag probe.
+
+Blocking calls (sentence-transformers encode, Vertex embeddings, Gemini
+generate_content, vector index builds) must not run on the event loop: one
+slow call stalls every request on the uvicorn worker. Each kind of work gets
+its own named thread pool with a fixed number of workers and a cap on how many
+calls may be pending, so a burst of chat requests cannot starve retrieval and
+queues stay bounded.
+
+EventLoopLagMonitor schedules a short sleep at a fixed interval and records
+how late it wakes up; sustained lag means something is still blocking the loop.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# name: (env prefix, default workers, default max pending calls)
+EXECUTOR_DEFAULTS = {
+    "embedding": ("EMBEDDING_EXECUTOR", 2, 64),
+    "retrieval": ("RETRIEVAL_EXECUTOR", 4, 256),
+    "llm": ("LLM_EXECUTOR", 8, 64),
+    # Ingestion calls fan out to their own process pool; this only keeps them off the loop
+    "ingestion": ("INGESTION_EXECUTOR", 2, 16),
+}
+
+# Lag above this counts as a stall
+STALL_THRESHOLD_MS = 100.0
+
+
+def _summary(values: deque) -> Dict[str, float]:
+    samples = np.array(values, dtype=np.float64)
+    if not samples.size:
+        return {"samples": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "samples": int(samples.size),
+        "mean": round(float(samples.mean()), 3),
+        "p50": round(float(np.percentile(samples, 50)), 3),
+        "p95": round(float(np.percentile(samples, 95)), 3),
+        "p99": round(float(np.percentile(samples, 99)), 3),
+        "max": round(float(samples.max()), 3)
+    }
+
+
+class BoundedExecutor:
+    """
+    Named thread pool with a limit on in-flight calls.
+
+    At most max_workers calls run at once; at most max_pending are admitted
+    (running or queued). Further callers wait on the event loop, without
+    holding a thread, until a slot frees up.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int, samples: int = 1024):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._in_flight = 0
+        self._admission_wait_ms = deque(maxlen=samples)
+        self._queue_wait_ms = deque(maxlen=samples)
+        self._run_ms = deque(maxlen=samples)
+
+    def _admission(self) -> asyncio.Semaphore:
+        """Semaphore bound to the running loop (recreated on a new loop)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        return self._semaphore
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on this pool and await its result"""
+        admitted = time.perf_counter()
+        async with self._admission():
+            submitted = time.perf_counter()
+            with self._lock:
+                self._submitted += 1
+                self._in_flight += 1
+                self._admission_wait_ms.append((submitted - admitted) * 1000)
+
+            def call():
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    finished = time.perf_counter()
+                    with self._lock:
+                        self._queue_wait_ms.append((started - submitted) * 1000)
+                        self._run_ms.append((finished - started) * 1000)
+
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, call)
+            except BaseException:
+                with self._lock:
+                    self._failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+            with self._lock:
+                self._completed += 1
+            return result
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "admission_wait_ms": _summary(self._admission_wait_ms),
+                "queue_wait_ms": _summary(self._queue_wait_ms),
+                "run_ms": _summary(self._run_ms)
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_executors: Dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """Shared executor by name ("embedding", "retrieval", "llm" or "ingestion")"""
+    executor = _executors.get(name)
+    if executor is not None:
+        return executor
+
+    if name not in EXECUTOR_DEFAULTS:
+        raise ValueError(f"Unknown executor '{name}' (expected one of {', '.join(EXECUTOR_DEFAULTS)})")
+    with _executors_lock:
+        if name not in _executors:
+            prefix, workers, pending = EXECUTOR_DEFAULTS[name]
+            _executors[name] = BoundedExecutor(
+                name,
+                max_workers=int(os.getenv(f"{prefix}_WORKERS", workers)),
+                max_pending=int(os.getenv(f"{prefix}_MAX_PENDING", pending))
+            )
+        return _executors[name]
+
+
+async def run_blocking(name: str, fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking callable on the named executor"""
+    return await get_executor(name).run(functools.partial(fn, *args, **kwargs))
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes from a fixed-interval sleep.
+
+    A responsive loop wakes within a fraction of a millisecond; anything
+    blocking the loop shows up directly as lag.
+    """
+
+    def __init__(self, interval_ms: Optional[float] = None, samples: int = 3000):
+        self.interval_ms = interval_ms if interval_ms is not None else float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+        self._lag_ms = deque(maxlen=samples)
+        self._stalls = 0
+        self._max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start probing on the running loop (no-op if already running)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        interval = self.interval_ms / 1000
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self._lag_ms.append(lag_ms)
+            self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+            if lag_ms > STALL_THRESHOLD_MS:
+                self._stalls += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_ms": self.interval_ms,
+            "lag_ms": _summary(self._lag_ms),
+            "max_lag_ms_since_start": round(self._max_lag_ms, 3),
+            f"stalls_over_{int(STALL_THRESHOLD_MS)}ms": self._stalls
+        }
+
+
+loop_lag_monitor = EventLoopLagMonitor()
+
+
+def concurrency_metrics() -> Dict[str, Any]:
+    """Event-loop lag and per-executor statistics"""
+    return {
+        "event_loop": loop_lag_monitor.metrics(),
+        "executors": {name: executor.metrics() for name, executor in sorted(_executors.items())}
+    }
@@ -0,0 +1,169 @@
+"""
+Crossover Solver - Break-even points between materials.
+
+For a set of materials in one region, finds the value of one input parameter
+at which two materials have the same total_after_subsidy. Every material pair
+is handled at once: the cost model is sampled on a grid, pairs whose cost
+difference is linear in the parameter get a closed-form root, and any other
+pair is solved by vectorized bisection over its sign-change brackets.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.services.tco_kernel import MaterialArrays, compute_components
+
+# Default search range per parameter
+CROSSOVER_RANGES = {
+    "volume": (1.0, 1e8),
+    "years": (1.0, 20.0),
+    "energy_cost": (0.0, 1.0),
+    "carbon_tax": (0.0, 500.0),
+    "usage_hours": (0.0, 175200.0),
+}
+
+GRID_POINTS = 65
+BISECTION_STEPS = 64
+
+
+@dataclass
+class Crossover:
+    """One break-even point between materials a and b"""
+    a: int
+    b: int
+    value: float
+    total_cost: float
+    method: str
+    cheaper_below: Optional[int]
+    cheaper_above: Optional[int]
+
+
+@dataclass
+class NoCrossover:
+    """A material pair that does not cross inside the search range"""
+    a: int
+    b: int
+    reason: str  # "identical", "parallel" or "outside_range"
+    cheaper: Optional[int]
+
+
+def _totals(materials: MaterialArrays, inputs: Dict[str, np.ndarray], parameter: str, values: np.ndarray) -> np.ndarray:
+    """total_after_subsidy with one input replaced by values (broadcast against materials)"""
+    return compute_components(materials, **{**inputs, parameter: values})["total_after_subsidy"]
+
+
+def solve_crossovers(
+    materials: MaterialArrays,
+    inputs: Dict[str, float],
+    parameter: str,
+    search_range: Optional[Tuple[float, float]] = None
+) -> Tuple[List[Crossover], List[NoCrossover]]:
+    """
+    Find every crossover between every pair of materials.
+
+    Args:
+        materials: Candidate materials (one row each)
+        inputs: Scalar compute_components inputs (volume, years, energy_cost,
+            usage_hours, carbon_tax, subsidy_rate)
+        parameter: Input to solve for (a key of CROSSOVER_RANGES)
+        search_range: (min, max) of the parameter; defaults to CROSSOVER_RANGES
+
+    Returns:
+        (crossovers, pairs without a crossover); material positions index materials
+    """
+    if parameter not in CROSSOVER_RANGES:
+        raise ValueError(f"Unsupported crossover parameter '{parameter}' (expected one of {', '.join(CROSSOVER_RANGES)})")
+
+    lo, hi = search_range or CROSSOVER_RANGES[parameter]
+    if not lo < hi:
+        raise ValueError("Search range minimum must be below its maximum")
+
+    inputs = {key: np.float64(value) for key, value in inputs.items()}
+
+    # (G, M) totals on the grid, one kernel pass
+    grid = np.linspace(lo, hi, GRID_POINTS)
+    totals = _totals(materials, inputs, parameter, grid[:, np.newaxis])
+
+    a_idx, b_idx = np.triu_indices(len(materials.ids), k=1)
+    diff = totals[:, a_idx] - totals[:, b_idx]  # (G, P)
+
+    # Linear pairs: the difference matches the chord through the endpoints
+    scale = np.maximum(np.abs(totals[:, a_idx]), np.abs(totals[:, b_idx])).max(axis=0)
+    tol = scale * 1e-9 + 1e-9
+    chord = diff[0] + np.outer((grid - lo) / (hi - lo), diff[-1] - diff[0])
+    linear = np.all(np.abs(diff - chord) <= tol, axis=0)
+
+    crossovers: List[Crossover] = []
+    no_crossover: List[NoCrossover] = []
+
+    # --- Closed form -------------------------------------------------------
+    slope = (diff[-1] - diff[0]) / (hi - lo)
+    flat = np.abs(diff[-1] - diff[0]) <= tol
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = lo - diff[0] / slope
+    closed_form = []
+    for p in np.flatnonzero(linear).tolist():
+        a, b = int(a_idx[p]), int(b_idx[p])
+        if flat[p]:
+            if np.all(np.abs(diff[:, p]) <= tol[p]):
+                no_crossover.append(NoCrossover(a, b, "identical", None))
+            else:
+                no_crossover.append(NoCrossover(a, b, "parallel", a if diff[0, p] < 0 else b))
+        elif lo <= root[p] <= hi:
+            # Difference rises through zero: a is cheaper below the root
+            below, above = (a, b) if slope[p] > 0 else (b, a)
+            closed_form.append((p, float(root[p]), below, above))
+        else:
+            cheaper = a if diff[GRID_POINTS // 2, p] < 0 else b
+            no_crossover.append(NoCrossover(a, b, "outside_range", cheaper))
+
+    # --- Vectorized bisection for non-linear pairs -------------------------
+    bisected = []
+    nonlinear = np.flatnonzero(~linear)
+    if nonlinear.size:
+        sub = diff[:, nonlinear]
+        sign = np.sign(sub)
+        g, q = np.nonzero((sign[:-1] * sign[1:] < 0) | ((sign[:-1] == 0) & (sign[1:] != 0)))
+        pairs = nonlinear[q]
+        left, right = grid[g], grid[g + 1]
+        left_diff = sub[g, q]
+
+        rows_a = materials.take(a_idx[pairs])
+        rows_b = materials.take(b_idx[pairs])
+        for _ in range(BISECTION_STEPS):
+            mid = (left + right) / 2
+            mid_diff = _totals(rows_a, inputs, parameter, mid) - _totals(rows_b, inputs, parameter, mid)
+            same_side = np.sign(mid_diff) == np.sign(left_diff)
+            left = np.where(same_side, mid, left)
+            left_diff = np.where(same_side, mid_diff, left_diff)
+            right = np.where(same_side, right, mid)
+
+        for k, p in enumerate(pairs.tolist()):
+            a, b = int(a_idx[p]), int(b_idx[p])
+            below, above = (a, b) if left_diff[k] < 0 else (b, a)
+            bisected.append((p, float((left[k] + right[k]) / 2), below, above))
+
+        crossed = set(pairs.tolist())
+        for p in nonlinear.tolist():
+            if p not in crossed:
+                a, b = int(a_idx[p]), int(b_idx[p])
+                no_crossover.append(NoCrossover(a, b, "outside_range", a if diff[0, p] < 0 else b))
+
+    # TCO at each crossover (evaluated for material a), one kernel pass
+    solved = [(p, value, below, above, "closed_form") for p, value, below, above in closed_form]
+    solved += [(p, value, below, above, "bisection") for p, value, below, above in bisected]
+    if solved:
+        pair_pos = np.array([s[0] for s in solved])
+        values = np.array([s[1] for s in solved])
+        at_root = _totals(materials.take(a_idx[pair_pos]), inputs, parameter, values)
+        for (p, value, below, above, method), total in zip(solved, at_root.tolist()):
+            crossovers.append(Crossover(
+                a=int(a_idx[p]), b=int(b_idx[p]), value=value, total_cost=total,
+                method=method, cheaper_below=below, cheaper_above=above
+            ))
+
+    crossovers.sort(key=lambda c: (c.a, c.b, c.value))
+    no_crossover.sort(key=lambda n: (n.a, n.b))
+    return crossovers, no_crossover
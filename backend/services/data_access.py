@@ -6,9 +6,13 @@ Loads REAL data from:
 - ENTSO-E live energy prices (energy_prices_live.json)
 """
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Mapping, Tuple
 import json
+import hashlib
+import threading
+from dataclasses import dataclass, replace
 from pathlib import Path
+from types import MappingProxyType
 from datetime import datetime, timedelta
 from backend.models.schemas import Material, Region
 import logging
@@ -20,19 +24,32 @@ logger = logging.getLogger(__name__)
 # LOAD REAL ENERGY PRICES FROM CACHE
 # ============================================================================
 
-def check_energy_prices_availability() -> Dict[str, Any]:
+@dataclass(frozen=True)
+class EnergyCacheTimestamp:
+    """Last update of one energy price cache, kept in memory"""
+    source: str
+    last_update: str  # ISO string as stored in the cache file
+    last_update_dt: datetime
+
+
+# Parsed cache timestamps; None until first loaded
+_energy_cache_timestamps: Optional[Tuple[EnergyCacheTimestamp, ...]] = None
+
+
+def refresh_energy_prices_status() -> Tuple[EnergyCacheTimestamp, ...]:
     """
-    Check if energy prices are available and fresh.
-    Checks both ENTSO-E and EIA caches.
+    Re-read the last_update timestamps of the ENTSO-E and EIA caches.
     
-    Returns:
-        Dict with status, age_hours, last_update, and is_expired
+    Called when the catalog snapshot sees the cache files change and by the
+    price refresh jobs in routers/admin.py, so check_energy_prices_availability
+    itself never touches the filesystem.
     """
+    global _energy_cache_timestamps
+    
     entsoe_cache_path = Path(__file__).parent.parent / "data" / "cache" / "energy_prices_live.json"
     eia_cache_path = Path(__file__).parent.parent / "data" / "eia_prices_cache.json"
     
-    # Check both caches and use the freshest one
-    caches = []
+    timestamps = []
     
     # Check ENTSO-E cache
     if entsoe_cache_path.exists():
@@ -40,13 +57,10 @@ def check_energy_prices_availability() -> Dict[str, Any]:
             with open(entsoe_cache_path, 'r') as f:
                 data = json.load(f)
             last_update = datetime.fromisoformat(data['metadata']['last_update'])
-            age_hours = (datetime.now() - last_update).total_seconds() / 3600
-            caches.append({
-                'source': 'ENTSO-E',
-                'age_hours': age_hours,
-                'last_update': data['metadata']['last_update'],
-                'is_expired': age_hours > 24
-            })
+            # Ages are computed against naive datetime.now()
+            if last_update.tzinfo is not None:
+                raise ValueError("timezone-aware last_update")
+            timestamps.append(EnergyCacheTimestamp('ENTSO-E', data['metadata']['last_update'], last_update))
         except Exception:
             pass
     
@@ -56,16 +70,42 @@ def check_energy_prices_availability() -> Dict[str, Any]:
             with open(eia_cache_path, 'r') as f:
                 data = json.load(f)
             last_update = datetime.fromisoformat(data['last_updated'])
-            age_hours = (datetime.now() - last_update).total_seconds() / 3600
-            caches.append({
-                'source': 'EIA',
-                'age_hours': age_hours,
-                'last_update': data['last_updated'],
-                'is_expired': age_hours > 24
-            })
+            if last_update.tzinfo is not None:
+                raise ValueError("timezone-aware last_updated")
+            timestamps.append(EnergyCacheTimestamp('EIA', data['last_updated'], last_update))
         except Exception:
             pass
     
+    _energy_cache_timestamps = tuple(timestamps)
+    return _energy_cache_timestamps
+
+
+def check_energy_prices_availability() -> Dict[str, Any]:
+    """
+    Check if energy prices are available and fresh.
+    Checks both ENTSO-E and EIA caches.
+    
+    Ages are derived from in-memory timestamps (see refresh_energy_prices_status),
+    so this does no file I/O once the timestamps are loaded.
+    
+    Returns:
+        Dict with status, age_hours, last_update, and is_expired
+    """
+    timestamps = _energy_cache_timestamps
+    if timestamps is None:
+        timestamps = refresh_energy_prices_status()
+    
+    now = datetime.now()
+    caches = []
+    for stamp in timestamps:
+        age_hours = (now - stamp.last_update_dt).total_seconds() / 3600
+        caches.append({
+            'source': stamp.source,
+            'age_hours': age_hours,
+            'last_update': stamp.last_update,
+            'is_expired': age_hours > 24
+        })
+    
     if not caches:
         return {
             "status": "missing",
@@ -479,15 +519,6 @@ def _get_fallback_materials() -> List[dict]:
 ]
 
 
-# ============================================================================
-# REGIONS CATALOG
-# ============================================================================
-
-# Load regions dynamically from Mendeley dataset + ENTSO-E + EIA live prices
-# This replaces the old 32-region hardcoded array with validated data
-REGIONS_DB = _update_regions_with_eia(_update_regions_with_entsoe(_load_mendeley_regions()))
-
-
 # ============================================================================
 # UPDATE REGIONS WITH LIVE ENERGY PRICES
 # ============================================================================
@@ -568,26 +599,179 @@ def _update_regions_with_live_prices(regions: List[dict]) -> List[dict]:
     return regions
 
 
+# ============================================================================
+# CATALOG SNAPSHOT
+# ============================================================================
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Files the material/region catalogs are built from
+CATALOG_SOURCE_FILES = (
+    DATA_DIR / "semiconductors_comprehensive.json",
+    DATA_DIR / "global_electricity_data_2025.json",
+    DATA_DIR / "cache" / "energy_prices_live.json",
+    DATA_DIR / "eia_prices_cache.json",
+)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Immutable, pre-validated material and region catalogs.
+    
+    The pydantic objects are shared by every caller and must be treated
+    as read-only. Lookups by id/code are O(1).
+    """
+    materials: Tuple[Material, ...]
+    regions: Tuple[Region, ...]
+    materials_by_id: Mapping[str, Material]
+    regions_by_code: Mapping[str, Region]
+    file_stats: Tuple[Optional[Tuple[int, int]], ...]  # (mtime_ns, size) per source file
+    file_hashes: Tuple[Optional[str], ...]  # sha256 per source file
+    built_at: datetime
+    electricity_ranges: Mapping[str, Tuple[float, float]]  # (min, max) per regional parameter
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def _stat_sources() -> Tuple[Optional[Tuple[int, int]], ...]:
+    """Cheap change detection: (mtime_ns, size) of each source file"""
+    stats = []
+    for path in CATALOG_SOURCE_FILES:
+        try:
+            st = path.stat()
+            stats.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stats.append(None)
+    return tuple(stats)
+
+
+def _hash_sources() -> Tuple[Optional[str], ...]:
+    """Content hash of each source file (None if missing)"""
+    hashes = []
+    for path in CATALOG_SOURCE_FILES:
+        try:
+            hashes.append(hashlib.sha256(path.read_bytes()).hexdigest())
+        except OSError:
+            hashes.append(None)
+    return tuple(hashes)
+
+
+def _first_by_key(items, key: str) -> Mapping[str, Any]:
+    """Index items by attribute; first occurrence wins (same as a linear scan)"""
+    index: Dict[str, Any] = {}
+    for item in items:
+        index.setdefault(getattr(item, key), item)
+    return MappingProxyType(index)
+
+
+def _load_electricity_ranges(regions: Tuple[Region, ...]) -> Mapping[str, Tuple[float, float]]:
+    """
+    (min, max) of energy price, carbon tax and subsidy rate across the
+    Mendeley dataset; falls back to the region catalog if it is missing.
+    """
+    columns = {"energy_cost": [], "carbon_tax": [], "subsidy_rate": []}
+    
+    try:
+        with open(DATA_DIR / "global_electricity_data_2025.json", 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for region_data in data.get('regions', []):
+            columns["energy_cost"].append(region_data['price_eur_kwh'])
+            columns["carbon_tax"].append(region_data.get('carbon_tax_eur_ton', 0.0))
+            columns["subsidy_rate"].append(region_data.get('subsidy_rate', 0.0))
+    except Exception as e:
+        logger.warning(f"⚠️  Electricity ranges from region catalog ({e})")
+    
+    if not columns["energy_cost"]:
+        for region in regions:
+            columns["energy_cost"].append(region.energy_cost)
+            columns["carbon_tax"].append(region.carbon_tax)
+            columns["subsidy_rate"].append(region.subsidy_rate)
+    
+    return MappingProxyType({
+        name: (float(min(values)), float(max(values)))
+        for name, values in columns.items() if values
+    })
+
+
+def _build_snapshot(file_stats, file_hashes) -> CatalogSnapshot:
+    """Load and validate both catalogs from disk"""
+    materials = tuple(Material(**m) for m in _load_materials_from_json())
+    
+    # Regions: Mendeley dataset + ENTSO-E + EIA live prices, then live price cache
+    regions_data = _update_regions_with_eia(_update_regions_with_entsoe(_load_mendeley_regions()))
+    regions = tuple(Region(**r) for r in _update_regions_with_live_prices(regions_data))
+    
+    logger.info(f"📦 Catalog snapshot built: {len(materials)} materials, {len(regions)} regions")
+    
+    return CatalogSnapshot(
+        materials=materials,
+        regions=regions,
+        materials_by_id=_first_by_key(materials, "id"),
+        regions_by_code=_first_by_key(regions, "code"),
+        file_stats=file_stats,
+        file_hashes=file_hashes,
+        built_at=datetime.now(),
+        electricity_ranges=_load_electricity_ranges(regions)
+    )
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """
+    Get the current catalog snapshot, rebuilding it only if a source changed.
+    
+    Every call stats the source files; a changed mtime/size triggers a content
+    hash, and only a changed hash triggers a rebuild. The new snapshot is
+    swapped in with a single assignment, so readers never see a partial one.
+    """
+    global _snapshot
+    
+    stats = _stat_sources()
+    current = _snapshot
+    if current is not None and current.file_stats == stats:
+        return current
+    
+    with _snapshot_lock:
+        current = _snapshot
+        if current is not None and current.file_stats == stats:
+            return current
+        
+        hashes = _hash_sources()
+        if current is not None and current.file_hashes == hashes:
+            # Touched but unchanged - keep the catalogs, remember the new stats
+            _snapshot = replace(current, file_stats=stats)
+        else:
+            _snapshot = _build_snapshot(stats, hashes)
+            # Energy cache files are snapshot sources; keep freshness in step
+            refresh_energy_prices_status()
+        
+        return _snapshot
+
+
 # ============================================================================
 # ACCESS FUNCTIONS
 # ============================================================================
 
 def get_materials_catalog() -> List[Material]:
     """Get all available materials from real Materials Project data"""
-    materials_data = _load_materials_from_json()
-    return [Material(**m) for m in materials_data]
+    return list(get_catalog_snapshot().materials)
 
 
 def get_regions_catalog() -> List[Region]:
     """Get all available regions with LIVE energy prices from API cache"""
-    regions_with_live_prices = _update_regions_with_live_prices(REGIONS_DB)
-    return [Region(**r) for r in regions_with_live_prices]
+    return list(get_catalog_snapshot().regions)
+
+
+def get_electricity_ranges() -> Mapping[str, Tuple[float, float]]:
+    """(min, max) of energy_cost, carbon_tax and subsidy_rate in global_electricity_data_2025.json"""
+    return get_catalog_snapshot().electricity_ranges
 
 
 def get_material_by_id(material_id: str) -> Material:
     """Get a specific material by ID"""
-    materials = get_materials_catalog()
-    material = next((m for m in materials if m.id == material_id), None)
+    material = get_catalog_snapshot().materials_by_id.get(material_id)
     
     if not material:
         raise ValueError(f"Material '{material_id}' not found")
@@ -597,8 +781,7 @@ def get_material_by_id(material_id: str) -> Material:
 
 def get_region_by_code(region_code: str) -> Region:
     """Get a specific region by code"""
-    regions = get_regions_catalog()
-    region = next((r for r in regions if r.code == region_code), None)
+    region = get_catalog_snapshot().regions_by_code.get(region_code)
     
     if not region:
         raise ValueError(f"Region '{region_code}' not found")
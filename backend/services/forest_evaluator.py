@@ -0,0 +1,165 @@
+"""
+Forest Evaluator - Pure NumPy inference for the TCO Random Forest.
+
+Flattens every tree of a fitted RandomForestRegressor into contiguous node
+arrays (feature, threshold, left, right, value) and evaluates a whole batch
+by walking all trees in lock-step, one depth level per NumPy step;
+cursors that reach a leaf drop out of the active set. Trees are stored
+breadth-first with siblings adjacent (right == left + 1), so a step is
+left[node] + (x > threshold[node]).
+Predictions match sklearn's RandomForestRegressor.predict.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Rows evaluated per lock-step pass (bounds the rows x trees index matrix)
+DEFAULT_CHUNK_ROWS = 1024
+
+
+@dataclass
+class FlatForest:
+    """
+    All trees of a forest as flat node arrays.
+
+    Nodes of each tree are laid out breadth-first with siblings adjacent.
+    Child indices are global (already offset into the concatenated arrays).
+    Leaves point to themselves.
+    """
+    feature: np.ndarray  # int32, split feature per node (0 for leaves)
+    threshold: np.ndarray  # float64, go left when x <= threshold
+    left: np.ndarray  # int32, left child per node
+    right: np.ndarray  # int32, right child per node (left + 1 for splits)
+    value: np.ndarray  # float64, leaf prediction per node
+    roots: np.ndarray  # int32, root node of each tree
+    n_features: int
+    max_depth: int
+
+    def __post_init__(self):
+        self.is_leaf = self.left == np.arange(len(self.left), dtype=self.left.dtype)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def predict(self, X, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+        """
+        Evaluate the forest for a batch of rows.
+
+        Args:
+            X: Feature matrix (n_samples, n_features), or a single 1-D row
+            chunk_rows: Rows evaluated per lock-step pass
+
+        Returns:
+            Predictions, shape (n_samples,)
+        """
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        # sklearn compares float32 features against float64 thresholds
+        X = X.astype(np.float32).astype(np.float64)
+
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_rows):
+            out[start:start + chunk_rows] = self._predict_chunk(X[start:start + chunk_rows])
+        return out
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows = X.shape[0]
+        flat_x = X.ravel()
+
+        # One cursor per (row, tree), all starting at the tree roots
+        nodes = np.tile(self.roots, n_rows)
+        position = np.arange(nodes.size)
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.int64) * self.n_features, self.n_trees)
+        current = nodes.copy()
+
+        # Only cursors still on split nodes move; the active set shrinks per level
+        while current.size:
+            step = self.left[current] + (flat_x[row_offset + self.feature[current]] > self.threshold[current])
+            at_leaf = self.is_leaf[step]
+            nodes[position[at_leaf]] = step[at_leaf]
+
+            moving = ~at_leaf
+            current = step[moving]
+            position = position[moving]
+            row_offset = row_offset[moving]
+
+        # Accumulate trees in order, as RandomForestRegressor.predict does
+        leaf_values = self.value[nodes].reshape(n_rows, self.n_trees)
+        total = np.zeros(n_rows, dtype=np.float64)
+        for t in range(self.n_trees):
+            total += leaf_values[:, t]
+        total /= self.n_trees
+        return total
+
+
+def breadth_first_order(children_left: np.ndarray, children_right: np.ndarray) -> np.ndarray:
+    """
+    Node ids of one sklearn tree in breadth-first order, each (left, right)
+    pair stored together. This is the node layout used by FlatForest.
+    """
+    order = [np.array([0])]
+    frontier = order[0]
+    while frontier.size:
+        splits = frontier[children_left[frontier] != -1]
+        frontier = np.column_stack([children_left[splits], children_right[splits]]).ravel()
+        order.append(frontier)
+    return np.concatenate(order)
+
+
+def flatten_forest(model) -> FlatForest:
+    """
+    Export a fitted RandomForestRegressor (single output) as a FlatForest.
+
+    Args:
+        model: Fitted sklearn RandomForestRegressor
+
+    Returns:
+        FlatForest with the trees concatenated in estimator order
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        if tree.n_outputs != 1:
+            raise ValueError("Only single-output forests can be flattened")
+
+        children_left = tree.children_left
+        order = breadth_first_order(children_left, tree.children_right)
+
+        new_id = np.empty(tree.node_count, dtype=np.int64)
+        new_id[order] = np.arange(tree.node_count)
+        is_leaf = children_left[order] == -1
+        left = np.where(is_leaf, np.arange(tree.node_count), new_id[children_left[order]]) + offset
+
+        features.append(np.where(is_leaf, 0, tree.feature[order]))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+        lefts.append(left)
+        rights.append(np.where(is_leaf, left, left + 1))
+        values.append(tree.value[order, 0, 0])
+        roots.append(offset)
+
+        offset += tree.node_count
+        max_depth = max(max_depth, int(tree.max_depth))
+
+    return FlatForest(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(np.int32),
+        right=np.concatenate(rights).astype(np.int32),
+        value=np.concatenate(values).astype(np.float64),
+        roots=np.array(roots, dtype=np.int32),
+        n_features=int(model.n_features_in_),
+        max_depth=max_depth,
+    )
@@ -0,0 +1,159 @@
+"""
+Inference Batcher - Coalesces concurrent ML predictions into one model call.
+
+sklearn's per-call overhead dominates when predicting a single 1x9 row, so
+concurrent requests are queued for a few milliseconds and evaluated together
+with a single predict(). Each caller gets back exactly the value it would have
+received from its own call.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Batch size histogram buckets (upper bounds, inclusive)
+BATCH_SIZE_BUCKETS = (1, 4, 16, 64, 256)
+
+
+class MicroBatcher:
+    """
+    asyncio micro-batcher around a vectorized predict function.
+
+    The first request of a batch starts a collection window of max_wait_ms;
+    everything that arrives before it closes (up to max_batch_size) is stacked
+    and sent to predict_fn in one call. predict_fn runs in the default executor
+    so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_wait_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+        wait_samples: int = 1024
+    ):
+        self.predict_fn = predict_fn
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else float(os.getenv("ML_BATCH_MAX_WAIT_MS", "2"))
+        self.max_batch_size = max_batch_size if max_batch_size is not None else int(os.getenv("ML_BATCH_MAX_SIZE", "256"))
+        self.logger = logger
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Metrics
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+        self._failures = 0
+        self._size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._size_histogram["overflow"] = 0
+        self._wait_ms = deque(maxlen=wait_samples)
+
+    async def predict(self, features: np.ndarray) -> float:
+        """
+        Queue one feature row and wait for its prediction.
+
+        Args:
+            features: 1-D feature vector (or a 1xN row)
+
+        Returns:
+            Model prediction for this row
+        """
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((np.asarray(features, dtype=np.float64).reshape(-1), future, time.perf_counter()))
+        return await future
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Start (or restart on a new event loop) the background batching task"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def _run(self):
+        """Collect batches and dispatch them until cancelled"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[Tuple[np.ndarray, asyncio.Future, float]]):
+        """Run one predict() for the batch and fan results back out"""
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            self._wait_ms.append((started - enqueued) * 1000)
+        self._record_batch(len(batch))
+
+        try:
+            rows = np.vstack([row for row, _, _ in batch])
+            predictions = await asyncio.get_running_loop().run_in_executor(None, self.predict_fn, rows)
+        except Exception as e:
+            self._failures += 1
+            self.logger.error(f"❌ Batched prediction failed ({len(batch)} rows): {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(float(prediction))
+
+    def _record_batch(self, size: int):
+        self._batches += 1
+        self._items += size
+        self._max_batch = max(self._max_batch, size)
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self._size_histogram[bucket] += 1
+                break
+        else:
+            self._size_histogram["overflow"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Batch size and queue wait statistics"""
+        waits = np.array(self._wait_ms, dtype=np.float64)
+        return {
+            "max_wait_ms": self.max_wait_ms,
+            "max_batch_size": self.max_batch_size,
+            "batches": self._batches,
+            "predictions": self._items,
+            "failed_batches": self._failures,
+            "batch_size": {
+                "mean": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "max": self._max_batch,
+                "histogram": {
+                    (f"<={bucket}" if bucket != "overflow" else f">{BATCH_SIZE_BUCKETS[-1]}"): count
+                    for bucket, count in self._size_histogram.items()
+                }
+            },
+            "queue_wait_ms": {
+                "samples": int(waits.size),
+                "mean": round(float(waits.mean()), 3) if waits.size else 0.0,
+                "p50": round(float(np.percentile(waits, 50)), 3) if waits.size else 0.0,
+                "p95": round(float(np.percentile(waits, 95)), 3) if waits.size else 0.0,
+                "max": round(float(waits.max()), 3) if waits.size else 0.0
+            }
+        }
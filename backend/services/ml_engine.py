@@ -7,13 +7,52 @@ import logging
 import joblib
 import numpy as np
 from pathlib import Path
-from typing import Optional
-from backend.models.schemas import TcoPredictRequest, TcoPredictResponse, CostBreakdown
+from dataclasses import replace
+from typing import Dict, List, Optional
+from backend.models.schemas import (
+    TcoPredictRequest,
+    TcoPredictResponse,
+    CostBreakdown,
+    TcoBatchColumns,
+    TcoBatchResponse,
+    MatrixAxisEntry,
+    RankedEntry,
+    TcoMatrixResponse,
+    MonteCarloRequest,
+    MonteCarloResponse,
+    TcoPercentiles,
+    TcoHistogram,
+    SensitivityEntry,
+    SensitivityResult,
+    SensitivityResponse,
+    CrossoverRequest,
+    CrossoverPoint,
+    NoCrossoverPair,
+    CrossoverResponse
+)
 from backend.services.data_access import (
     get_material_by_id, 
     get_region_by_code,
+    get_materials_catalog,
+    get_regions_catalog,
+    get_electricity_ranges,
     check_energy_prices_availability
 )
+from backend.services.tco_kernel import (
+    MAINTENANCE_RATES,
+    ADVANCED_NODE_MAINTENANCE_RATE,
+    ADVANCED_NODE_CHIP_COST,
+    MaterialArrays,
+    RegionArrays,
+    compute_components,
+    compute_gradients,
+    round_currency,
+    supply_chain_risk_multiplier
+)
+from backend.services.inference_batcher import MicroBatcher
+from backend.services.monte_carlo import default_distributions, run_monte_carlo
+from backend.services.crossover import CROSSOVER_RANGES, solve_crossovers
+from backend.services.model_artifact import get_model_artifact
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +69,8 @@ class TcoEngine:
         self.logger = logger
         self.model = self._load_ml_model()
         self.use_ml = self.model is not None
+        # Coalesces concurrent async predictions into one model.predict call
+        self.ml_batcher = MicroBatcher(self.model.predict) if self.use_ml else None
         
         if self.use_ml:
             logger.info("🤖 ML Engine: Using Random Forest model for predictions")
@@ -37,7 +78,15 @@ class TcoEngine:
             logger.warning("⚠️ ML Engine: Model not found, using formula-based calculations")
     
     def _load_ml_model(self) -> Optional[any]:
-        """Load trained Random Forest model"""
+        """Load trained Random Forest model (memory-mapped artifact, else pickle)"""
+        try:
+            artifact = get_model_artifact()
+            if artifact is not None:
+                logger.info(f"✅ Random Forest artifact mapped ({artifact.n_estimators} trees)")
+                return artifact
+        except Exception as e:
+            logger.warning(f"⚠️ Model artifact unavailable, falling back to pickle: {e}")
+        
         try:
             model_path = Path(__file__).parent.parent / "models" / "tco_random_forest.pkl"
             logger.info(f"🔍 Looking for ML model at: {model_path}")
@@ -52,6 +101,20 @@ class TcoEngine:
             logger.error(f"❌ Failed to load ML model: {e}")
         return None
     
+    def _ml_features(self, material: any, region: any, request: TcoPredictRequest) -> np.ndarray:
+        """Build the 9-feature row used by the Random Forest (order matches training)"""
+        return np.array([
+            material.band_gap if hasattr(material, 'band_gap') else 1.0,  # band_gap_ev
+            material.density if hasattr(material, 'density') else 4.0,  # density_g_cm3
+            material.trl,  # trl
+            np.log10(request.volume),  # volume_log
+            request.years,  # years
+            request.energy_cost if request.energy_cost else region.energy_cost,  # energy_cost_eur_kwh
+            region.carbon_tax,  # carbon_tax_eur_ton
+            request.subsidy if request.subsidy is not None else region.subsidy_rate,  # subsidy_rate
+            material.chip_cost  # base_cost_eur
+        ])
+    
     def _predict_with_ml(self, material: any, region: any, request: TcoPredictRequest) -> Optional[float]:
         """
         Use Random Forest model for TCO prediction
@@ -61,17 +124,7 @@ class TcoEngine:
         
         try:
             # Prepare features (debe coincidir con el training)
-            features = np.array([[
-                material.band_gap if hasattr(material, 'band_gap') else 1.0,  # band_gap_ev
-                material.density if hasattr(material, 'density') else 4.0,  # density_g_cm3
-                material.trl,  # trl
-                np.log10(request.volume),  # volume_log
-                request.years,  # years
-                request.energy_cost if request.energy_cost else region.energy_cost,  # energy_cost_eur_kwh
-                region.carbon_tax,  # carbon_tax_eur_ton
-                request.subsidy if request.subsidy is not None else region.subsidy_rate,  # subsidy_rate
-                material.chip_cost  # base_cost_eur
-            ]])
+            features = self._ml_features(material, region, request).reshape(1, -1)
             
             predicted_tco = self.model.predict(features)[0]
             logger.info(f"🤖 ML Prediction: €{predicted_tco:,.2f}")
@@ -81,6 +134,36 @@ class TcoEngine:
             logger.error(f"ML prediction failed: {e}, falling back to formulas")
             return None
     
+    async def predict_with_ml_async(self, material: any, region: any, request: TcoPredictRequest) -> Optional[float]:
+        """
+        Random Forest prediction through the micro-batcher.
+        
+        Concurrent callers are evaluated in a single predict() call; each gets
+        the same value _predict_with_ml would have returned.
+        """
+        if not self.use_ml:
+            return None
+        
+        try:
+            features = self._ml_features(material, region, request)
+            return await self.ml_batcher.predict(features)
+        
+        except Exception as e:
+            logger.error(f"ML prediction failed: {e}, falling back to formulas")
+            return None
+    
+    async def ml_estimate(self, request: TcoPredictRequest) -> Optional[float]:
+        """
+        Random Forest TCO estimate for a request (micro-batched), reported next
+        to the formula result by /predict. None without a model.
+        """
+        if not self.use_ml:
+            return None
+        
+        material = get_material_by_id(request.material)
+        region = get_region_by_code(request.region)
+        return await self.predict_with_ml_async(material, region, request)
+    
     def calculate_tco(self, request: TcoPredictRequest) -> TcoPredictResponse:
         """
         Main TCO calculation method.
@@ -204,6 +287,441 @@ class TcoEngine:
         
         return response
     
+    def calculate_tco_batch(self, requests: List[TcoPredictRequest]) -> TcoBatchResponse:
+        """
+        Vectorized TCO calculation for many configurations at once.
+        
+        Catalogs are resolved once per batch and every cost component is
+        evaluated over whole arrays by tco_kernel.compute_components.
+        Results match calculate_tco row for row.
+        
+        Args:
+            requests: TCO prediction parameters (one per row)
+        
+        Returns:
+            Per-row breakdowns in request order
+        """
+        rows, inputs = self._resolve_requests(requests)
+        volume, years = inputs["volume"], inputs["years"]
+        
+        components = compute_components(rows, **inputs)
+        total_after = components["total_after_subsidy"]
+        
+        # round_currency matches Python's round(x, 2) used by calculate_tco
+        columns = {key: round_currency(values) for key, values in components.items()}
+        columns["total_cost"] = columns["total_after_subsidy"]
+        columns["cost_per_chip"] = round_currency(total_after / (volume * years))
+        columns["annual_cost"] = round_currency(total_after / years)
+        
+        energy_status = check_energy_prices_availability()
+        warnings = []
+        if energy_status["is_expired"]:
+            warnings.append(f"⚠️ Energy prices are {energy_status['age_hours']}h old (may not reflect current rates)")
+        
+        self.logger.info(f"✅ Batch TCO calculated for {len(requests)} configurations")
+        
+        return TcoBatchResponse(
+            count=len(requests),
+            results=TcoBatchColumns.model_construct(**columns),
+            currency="EUR",
+            data_availability={
+                "energy_prices": {
+                    "status": energy_status.get("status"),
+                    "is_expired": energy_status.get("is_expired"),
+                    "age_hours": energy_status.get("age_hours"),
+                    "last_update": energy_status.get("last_update"),
+                    "cache_source": energy_status.get("source")
+                },
+                "ml_model": "active" if self.use_ml else "fallback_formulas"
+            },
+            warnings=warnings if warnings else None
+        )
+    
+    def calculate_tco_matrix(
+        self,
+        volume: int,
+        years: int,
+        usage_hours: int = 43800,
+        material_ids: Optional[List[str]] = None,
+        region_codes: Optional[List[str]] = None,
+        top_k: Optional[int] = None,
+        include_breakdown: bool = False
+    ) -> TcoMatrixResponse:
+        """
+        TCO for the full materials × regions cross-product in one vectorized pass.
+        
+        Material properties are laid out as a column and region economics as
+        a row, so compute_components broadcasts to an (M, R) matrix. Each cell
+        matches calculate_tco for that material/region with region defaults.
+        
+        Args:
+            volume: Annual volume of chips
+            years: Analysis period in years
+            usage_hours: Device usage hours
+            material_ids: Optional subset of materials (default: full catalog)
+            region_codes: Optional subset of regions (default: full catalog)
+            top_k: Keep only the k cheapest entries in each ranking
+            include_breakdown: Also return every cost component matrix
+        
+        Returns:
+            Matrix, per-region and per-material rankings, and the cheapest pair
+        """
+        materials = get_materials_catalog()
+        regions = get_regions_catalog()
+        material_arrays = MaterialArrays.from_materials(materials)
+        region_arrays = RegionArrays.from_regions(regions)
+        
+        if material_ids:
+            material_idx = self._index_rows(material_ids, material_arrays.ids, "Material")
+        else:
+            material_idx = np.arange(len(materials))
+        if region_codes:
+            region_idx = self._index_rows(region_codes, region_arrays.codes, "Region")
+        else:
+            region_idx = np.arange(len(regions))
+        
+        # (M, 1) material column against (1, R) region row
+        row = region_idx[np.newaxis, :]
+        components = compute_components(
+            material_arrays.take(material_idx[:, np.newaxis]),
+            volume=np.int64(volume),
+            years=np.int64(years),
+            energy_cost=region_arrays.energy_cost[row],
+            usage_hours=np.int64(usage_hours),
+            carbon_tax=region_arrays.carbon_tax[row],
+            subsidy_rate=region_arrays.subsidy_rate[row]
+        )
+        shape = (len(material_idx), len(region_idx))
+        total = np.broadcast_to(components["total_after_subsidy"], shape)
+        per_chip = total / (volume * years)
+        
+        total_rounded = round_currency(total)
+        per_chip_rounded = round_currency(per_chip)
+        
+        row_ids = [materials[i].id for i in material_idx.tolist()]
+        col_ids = [regions[j].code for j in region_idx.tolist()]
+        limit = top_k if top_k else None
+        
+        # Stable argsort keeps catalog order for ties
+        by_region = np.argsort(total, axis=0, kind='stable')[:limit, :]
+        by_material = np.argsort(total, axis=1, kind='stable')[:, :limit]
+        
+        region_rankings = {
+            col_ids[j]: [
+                RankedEntry(
+                    id=row_ids[i], rank=rank,
+                    total_cost=total_rounded[i][j], cost_per_chip=per_chip_rounded[i][j]
+                )
+                for rank, i in enumerate(by_region[:, j].tolist(), start=1)
+            ]
+            for j in range(shape[1])
+        }
+        material_rankings = {
+            row_ids[i]: [
+                RankedEntry(
+                    id=col_ids[j], rank=rank,
+                    total_cost=total_rounded[i][j], cost_per_chip=per_chip_rounded[i][j]
+                )
+                for rank, j in enumerate(by_material[i, :].tolist(), start=1)
+            ]
+            for i in range(shape[0])
+        }
+        
+        best_i, best_j = np.unravel_index(np.argmin(total), shape)
+        best = RankedEntry(
+            id=f"{row_ids[best_i]}@{col_ids[best_j]}",
+            rank=1,
+            total_cost=total_rounded[best_i][best_j],
+            cost_per_chip=per_chip_rounded[best_i][best_j]
+        )
+        
+        breakdown = None
+        if include_breakdown:
+            breakdown = {
+                key: round_currency(np.broadcast_to(values, shape))
+                for key, values in components.items()
+            }
+        
+        self.logger.info(f"✅ TCO matrix calculated: {shape[0]} materials × {shape[1]} regions")
+        
+        return TcoMatrixResponse(
+            materials=[MatrixAxisEntry(id=materials[i].id, name=materials[i].name) for i in material_idx.tolist()],
+            regions=[MatrixAxisEntry(id=regions[j].code, name=regions[j].name) for j in region_idx.tolist()],
+            volume=volume,
+            years=years,
+            usage_hours=usage_hours,
+            total_cost=total_rounded,
+            cost_per_chip=per_chip_rounded,
+            breakdown=breakdown,
+            region_rankings=region_rankings,
+            material_rankings=material_rankings,
+            best=best
+        )
+    
+    def calculate_tco_monte_carlo(self, request: MonteCarloRequest) -> MonteCarloResponse:
+        """
+        Monte Carlo TCO distribution for one material/region.
+        
+        Inputs without an explicit distribution use default_distributions
+        (ranges from global_electricity_data_2025.json). Samples are evaluated
+        in chunks of request.chunk_size, so 10M samples run in bounded memory.
+        
+        Args:
+            request: Monte Carlo parameters
+        
+        Returns:
+            Percentiles, moments, histogram and the distributions used
+        """
+        material = get_material_by_id(request.material)
+        region = get_region_by_code(request.region)
+        
+        distributions = default_distributions(material, region, request.volume, get_electricity_ranges())
+        distributions.update(request.distributions)
+        
+        summary = run_monte_carlo(
+            material,
+            years=request.years,
+            usage_hours=request.usage_hours,
+            distributions=distributions,
+            n_samples=request.n_samples,
+            seed=request.seed,
+            chunk_size=request.chunk_size,
+            bins=request.bins
+        )
+        
+        point_estimate = self.calculate_tco(TcoPredictRequest(
+            material=request.material,
+            region=request.region,
+            volume=request.volume,
+            years=request.years,
+            usage_hours=request.usage_hours
+        )).total_cost
+        
+        return MonteCarloResponse(
+            material=material.id,
+            region=region.code,
+            volume=request.volume,
+            years=request.years,
+            n_samples=summary.n_samples,
+            seed=summary.seed,
+            chunk_size=request.chunk_size,
+            percentiles=TcoPercentiles(**{k: round(v, 2) for k, v in summary.percentiles.items()}),
+            mean=round(summary.mean, 2),
+            std=round(summary.std, 2),
+            min=round(summary.min, 2),
+            max=round(summary.max, 2),
+            point_estimate=point_estimate,
+            percentile_method=summary.percentile_method,
+            histogram=TcoHistogram(bin_edges=round_currency(summary.bin_edges), counts=summary.counts),
+            distributions=distributions
+        )
+    
+    def calculate_sensitivity(self, requests: List[TcoPredictRequest], swing_pct: float = 10.0) -> SensitivityResponse:
+        """
+        Tornado analysis of total_after_subsidy for one or many configurations.
+        
+        Derivatives come in closed form from tco_kernel.compute_gradients.
+        The ±swing_pct totals for all 7 inputs of all configurations are
+        evaluated in a single vectorized compute_components pass.
+        
+        Args:
+            requests: Configurations to analyse
+            swing_pct: Relative change applied to each input (subsidy is capped to 0-1)
+        
+        Returns:
+            Per-configuration entries sorted by swing (largest first)
+        """
+        rows, inputs = self._resolve_requests(requests)
+        base_total = compute_components(rows, **inputs)["total_after_subsidy"]
+        gradients = compute_gradients(rows, **inputs)
+        
+        names = list(gradients)
+        base_values = {
+            "energy_cost": inputs["energy_cost"],
+            "carbon_tax": inputs["carbon_tax"],
+            "subsidy": inputs["subsidy_rate"],
+            "volume": inputs["volume"],
+            "years": inputs["years"],
+            "usage_hours": inputs["usage_hours"],
+            "chip_cost": rows.chip_cost
+        }
+        input_key = {"subsidy": "subsidy_rate"}
+        
+        # Row 2k / 2k+1 of every perturbed array = input k at low / high
+        shape = (2 * len(names), len(requests))
+        perturbed = {key: np.broadcast_to(values.astype(np.float64), shape).copy() for key, values in inputs.items()}
+        perturbed_chip_cost = np.broadcast_to(rows.chip_cost, shape).copy()
+        factor = swing_pct / 100
+        low_values, high_values = {}, {}
+        for k, name in enumerate(names):
+            value = base_values[name].astype(np.float64)
+            low, high = value * (1 - factor), value * (1 + factor)
+            if name == "subsidy":
+                low, high = np.clip(low, 0.0, 1.0), np.clip(high, 0.0, 1.0)
+            target = perturbed_chip_cost if name == "chip_cost" else perturbed[input_key.get(name, name)]
+            target[2 * k], target[2 * k + 1] = low, high
+            low_values[name], high_values[name] = low, high
+        
+        totals = compute_components(replace(rows, chip_cost=perturbed_chip_cost), **perturbed)["total_after_subsidy"]
+        
+        base_rounded = round_currency(base_total)
+        totals_rounded = round_currency(totals)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            elasticity = {name: gradients[name] * base_values[name] / base_total for name in names}
+        
+        results = []
+        for i, request in enumerate(requests):
+            entries = []
+            for k, name in enumerate(names):
+                total_low = totals_rounded[2 * k][i]
+                total_high = totals_rounded[2 * k + 1][i]
+                e = float(elasticity[name][i])
+                entries.append(SensitivityEntry(
+                    parameter=name,
+                    value=float(base_values[name][i]),
+                    derivative=float(gradients[name][i]),
+                    elasticity=round(e, 6) if np.isfinite(e) else None,
+                    low_value=float(low_values[name][i]),
+                    high_value=float(high_values[name][i]),
+                    total_at_low=total_low,
+                    total_at_high=total_high,
+                    swing=round(abs(total_high - total_low), 2)
+                ))
+            entries.sort(key=lambda entry: entry.swing, reverse=True)
+            results.append(SensitivityResult(
+                material=request.material,
+                region=request.region,
+                total_cost=base_rounded[i],
+                entries=entries
+            ))
+        
+        self.logger.info(f"✅ Sensitivity calculated for {len(requests)} configurations (±{swing_pct}%)")
+        
+        return SensitivityResponse(swing_pct=swing_pct, results=results)
+    
+    def calculate_crossovers(self, request: CrossoverRequest) -> CrossoverResponse:
+        """
+        Break-even values of one parameter between every pair of materials.
+        
+        Args:
+            request: Materials, region and the parameter to solve for
+        
+        Returns:
+            Every crossover in the search range, plus pairs that never cross
+        """
+        region = get_region_by_code(request.region)
+        material_arrays = MaterialArrays.from_materials(get_materials_catalog())
+        material_idx = self._index_rows(request.materials, material_arrays.ids, "Material")
+        ids = [str(material_arrays.ids[i]) for i in material_idx.tolist()]
+        
+        parameter = request.parameter.value
+        lo, hi = CROSSOVER_RANGES[parameter]
+        lo = request.range_min if request.range_min is not None else lo
+        hi = request.range_max if request.range_max is not None else hi
+        
+        inputs = {
+            "volume": request.volume,
+            "years": request.years,
+            "energy_cost": request.energy_cost if request.energy_cost else region.energy_cost,
+            "usage_hours": request.usage_hours,
+            "carbon_tax": region.carbon_tax,
+            "subsidy_rate": request.subsidy if request.subsidy is not None else region.subsidy_rate
+        }
+        
+        crossovers, no_crossover = solve_crossovers(
+            material_arrays.take(material_idx), inputs, parameter, (lo, hi)
+        )
+        
+        def material_id(position):
+            return ids[position] if position is not None else None
+        
+        self.logger.info(f"✅ {len(crossovers)} crossovers on {parameter} for {len(ids)} materials in {region.code}")
+        
+        return CrossoverResponse(
+            region=region.code,
+            parameter=request.parameter,
+            range_min=lo,
+            range_max=hi,
+            crossovers=[
+                CrossoverPoint(
+                    material_a=ids[c.a],
+                    material_b=ids[c.b],
+                    value=c.value,
+                    total_cost=round(c.total_cost, 2),
+                    method=c.method,
+                    cheaper_below=material_id(c.cheaper_below),
+                    cheaper_above=material_id(c.cheaper_above)
+                )
+                for c in crossovers
+            ],
+            no_crossover=[
+                NoCrossoverPair(
+                    material_a=ids[n.a],
+                    material_b=ids[n.b],
+                    reason=n.reason,
+                    cheaper=material_id(n.cheaper)
+                )
+                for n in no_crossover
+            ]
+        )
+    
+    def _resolve_requests(self, requests: List[TcoPredictRequest]):
+        """
+        Resolve request rows against the catalogs into kernel inputs.
+        
+        Overrides follow calculate_tco: a falsy energy_cost and a None subsidy
+        fall back to the region's values.
+        
+        Returns:
+            (MaterialArrays with one row per request, dict of input arrays
+            keyed like compute_components' arguments)
+        """
+        material_arrays = MaterialArrays.from_materials(get_materials_catalog())
+        region_arrays = RegionArrays.from_regions(get_regions_catalog())
+        
+        # Single pass over the request models, then everything is columnar
+        (material_ids, region_codes, volume, years, usage_hours,
+         energy_override, subsidy_override) = zip(*[
+            (
+                r.material,
+                r.region,
+                r.volume,
+                r.years,
+                r.usage_hours if r.usage_hours is not None else 43800,
+                r.energy_cost or np.nan,  # Falsy override uses region price (as calculate_tco)
+                r.subsidy if r.subsidy is not None else np.nan
+            )
+            for r in requests
+        ])
+        
+        material_idx = self._index_rows(material_ids, material_arrays.ids, "Material")
+        region_idx = self._index_rows(region_codes, region_arrays.codes, "Region")
+        
+        energy_override = np.array(energy_override, dtype=np.float64)
+        subsidy_override = np.array(subsidy_override, dtype=np.float64)
+        
+        inputs = {
+            "volume": np.array(volume, dtype=np.int64),
+            "years": np.array(years, dtype=np.int64),
+            "energy_cost": np.where(np.isnan(energy_override), region_arrays.energy_cost[region_idx], energy_override),
+            "usage_hours": np.array(usage_hours, dtype=np.int64),
+            "carbon_tax": region_arrays.carbon_tax[region_idx],
+            "subsidy_rate": np.where(np.isnan(subsidy_override), region_arrays.subsidy_rate[region_idx], subsidy_override)
+        }
+        return material_arrays.take(material_idx), inputs
+    
+    @staticmethod
+    def _index_rows(keys, catalog_keys, label: str) -> np.ndarray:
+        """Map row keys to catalog positions (first match wins, like next())"""
+        lookup: Dict[str, int] = {}
+        for i, key in enumerate(catalog_keys):
+            lookup.setdefault(key, i)
+        
+        try:
+            return np.fromiter((lookup[k] for k in keys), dtype=np.intp, count=len(keys))
+        except KeyError as e:
+            raise ValueError(f"{label} '{e.args[0]}' not found")
+    
     def _calculate_chip_cost(self, material, volume: int, years: int) -> float:
         """Calculate direct chip purchase costs"""
         total_chips = volume * years
@@ -273,28 +791,16 @@ class TcoEngine:
         # Equipment capex proxy: 4x annual chip value (industry rule of thumb)
         equipment_proxy = chip_cost * 4.0
         
-        # Maintenance rates from MAINTENANCE_SOURCES.md
-        maintenance_rates = {
-            'Traditional Semiconductor': 0.09,  # 9% mature Si (28nm+) - GlobalFoundries 2024
-            'Wide-bandgap Semiconductor': 0.12,  # 12% SiC - Wolfspeed 10-K 2024
-            'III-Nitride Wide-bandgap': 0.105,  # 10.5% GaN - industry average
-            'III-V Compound': 0.095,  # 9.5% GaAs - mature technology
-            'II-VI Compound': 0.10,  # 10% industry standard
-            'Ultra-wide Bandgap': 0.15,  # 15% diamond/research materials (high uncertainty)
-            '2D Transition Metal Dichalcogenide': 0.11,  # 11% default
-            'default': 0.11  # 11% SEMI industry average 2024
-        }
-        
-        # Select rate based on category, default to 11%
-        rate = maintenance_rates.get(material_category, maintenance_rates['default'])
+        # Select rate based on category, default to 11% (MAINTENANCE_SOURCES.md)
+        rate = MAINTENANCE_RATES.get(material_category, MAINTENANCE_RATES['default'])
         
         # Advanced Si nodes (TRL 9, high complexity) get higher rate
         if material_category == 'Traditional Semiconductor' and material_trl >= 9:
             # Check if it's advanced node by chip cost (€3+ suggests 7nm or below)
             # Using chip_cost as proxy since we don't have node info
             avg_chip_cost = chip_cost / (equipment_proxy / 4.0)  # Reverse calc
-            if avg_chip_cost > 3.0:  # Advanced node threshold
-                rate = 0.13  # 13% for leading-edge (TSMC, Intel 2024)
+            if avg_chip_cost > ADVANCED_NODE_CHIP_COST:  # Advanced node threshold
+                rate = ADVANCED_NODE_MAINTENANCE_RATE  # 13% for leading-edge (TSMC, Intel 2024)
         
         maintenance_cost = equipment_proxy * rate
         
@@ -309,20 +815,7 @@ class TcoEngine:
         - Few manufacturers: Higher risk
         - Emerging materials: Higher risk
         """
-        risk_multiplier = 0.0
-        
-        # TRL risk
-        if material.trl < 7:
-            risk_multiplier += 0.05  # 5% for experimental tech
-        
-        # Manufacturer concentration risk
-        num_manufacturers = len(material.manufacturers)
-        if num_manufacturers < 3:
-            risk_multiplier += 0.03  # 3% for limited suppliers
-        
-        # Maturity risk
-        if material.maturity in ["Prototype", "Laboratory"]:
-            risk_multiplier += 0.05  # 5% for immature tech
+        risk_multiplier = supply_chain_risk_multiplier(material)
         
         # Apply risk premium to total chip volume
         risk_cost = (material.chip_cost * volume) * risk_multiplier
@@ -0,0 +1,351 @@
+"""
+Model Artifact - Memory-mapped Random Forest shared across worker processes.
+
+The forest is exported once as flat node arrays (see forest_evaluator) into an
+uncompressed, content-addressed .npz plus a JSON manifest recording each
+array's dtype, shape and byte offset. Workers open the arrays with np.memmap, so every uvicorn worker
+and every call site reads the same page-cached copy instead of unpickling
+its own.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from backend.services.forest_evaluator import FlatForest, breadth_first_order, flatten_forest
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = Path(__file__).parent.parent / "models"
+MODEL_PKL_PATH = MODELS_DIR / "tco_random_forest.pkl"
+MANIFEST_PATH = MODELS_DIR / "tco_random_forest.manifest.json"
+
+ARTIFACT_FORMAT = "flat-forest-v1"
+
+
+@dataclass
+class ForestArtifact:
+    """Memory-mapped forest plus the metadata the API reports"""
+    forest: FlatForest
+    n_node_samples: np.ndarray
+    tree_max_depth: np.ndarray
+    feature_importances: np.ndarray
+    manifest: Dict[str, Any]
+    load_seconds: float
+    manifest_mtime: float = field(default=0.0, repr=False)
+
+    @property
+    def n_estimators(self) -> int:
+        return self.forest.n_trees
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.forest.n_features
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        return self.feature_importances
+
+    def predict(self, X) -> np.ndarray:
+        """Same contract as RandomForestRegressor.predict"""
+        return self.forest.predict(X)
+
+    def tree_structure(self, tree_index: int) -> Dict[str, Any]:
+        """
+        Nested node structure of one tree (ids are local to the tree).
+
+        Args:
+            tree_index: Tree position in the forest
+
+        Returns:
+            Dict with node count, depth and the nested structure
+        """
+        forest = self.forest
+        root = int(forest.roots[tree_index])
+        end = int(forest.roots[tree_index + 1]) if tree_index + 1 < forest.n_trees else forest.n_nodes
+
+        def extract_node_info(node_id):
+            local_id = node_id - root
+            if forest.is_leaf[node_id]:
+                return {
+                    'id': local_id,
+                    'type': 'leaf',
+                    'value': float(forest.value[node_id]),
+                    'samples': int(self.n_node_samples[node_id])
+                }
+            return {
+                'id': local_id,
+                'type': 'decision',
+                'feature': int(forest.feature[node_id]),
+                'threshold': float(forest.threshold[node_id]),
+                'samples': int(self.n_node_samples[node_id]),
+                'left_child': extract_node_info(int(forest.left[node_id])),
+                'right_child': extract_node_info(int(forest.right[node_id]))
+            }
+
+        return {
+            'total_nodes': end - root,
+            'max_depth': int(self.tree_max_depth[tree_index]),
+            'structure': extract_node_info(root)
+        }
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _npz_offsets(npz_path: Path) -> Dict[str, Dict[str, Any]]:
+    """Byte offset, dtype and shape of each array stored in an uncompressed .npz"""
+    arrays = {}
+    with zipfile.ZipFile(npz_path) as archive, open(npz_path, 'rb') as raw:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} is compressed and cannot be memory-mapped")
+
+            # Local file header: 30 fixed bytes, then name and extra field
+            raw.seek(info.header_offset + 26)
+            name_len = int.from_bytes(raw.read(2), 'little')
+            extra_len = int.from_bytes(raw.read(2), 'little')
+            raw.seek(info.header_offset + 30 + name_len + extra_len)
+
+            version = np.lib.format.read_magic(raw)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(raw)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(raw)
+            if fortran_order or dtype.hasobject:
+                raise ValueError(f"{info.filename} cannot be memory-mapped")
+
+            arrays[info.filename[:-len('.npy')]] = {
+                "dtype": dtype.str,
+                "shape": list(shape),
+                "offset": raw.tell()
+            }
+    return arrays
+
+
+def export_model_artifact(
+    model,
+    manifest_path: Path = MANIFEST_PATH,
+    source_path: Optional[Path] = MODEL_PKL_PATH
+) -> Dict[str, Any]:
+    """
+    Write the forest as an uncompressed .npz and a JSON manifest.
+
+    The .npz is named after its content hash and the manifest is swapped in
+    atomically last, so a worker never pairs a manifest with the wrong arrays.
+    Workers still mapping a previous artifact keep it until they reload.
+
+    Args:
+        model: Fitted RandomForestRegressor
+        manifest_path: Destination manifest (the .npz is written next to it)
+        source_path: Pickle the model came from (recorded as a content hash)
+
+    Returns:
+        The manifest
+    """
+    forest = flatten_forest(model)
+
+    # n_node_samples in the same breadth-first order as the flattened nodes
+    n_node_samples = np.empty(forest.n_nodes, dtype=np.int64)
+    tree_max_depth = np.empty(forest.n_trees, dtype=np.int32)
+    for t, estimator in enumerate(model.estimators_):
+        tree = estimator.tree_
+        root = int(forest.roots[t])
+        order = breadth_first_order(tree.children_left, tree.children_right)
+        n_node_samples[root:root + tree.node_count] = tree.n_node_samples[order]
+        tree_max_depth[t] = tree.max_depth
+
+    arrays = {
+        "feature": forest.feature,
+        "threshold": forest.threshold,
+        "left": forest.left,
+        "right": forest.right,
+        "value": forest.value,
+        "roots": forest.roots,
+        "n_node_samples": n_node_samples,
+        "tree_max_depth": tree_max_depth,
+        "feature_importances": np.asarray(model.feature_importances_, dtype=np.float64)
+    }
+
+    stem = manifest_path.name.split('.')[0]
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process temp names: several workers may export at the same time
+    tmp_artifact = manifest_path.with_name(f"{stem}.{os.getpid()}.npz.tmp")
+    with open(tmp_artifact, 'wb') as f:
+        np.savez(f, **arrays)
+
+    artifact_sha256 = _sha256(tmp_artifact)
+    artifact_path = manifest_path.with_name(f"{stem}.{artifact_sha256[:12]}.npz")
+    offsets = _npz_offsets(tmp_artifact)
+    os.replace(tmp_artifact, artifact_path)
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "artifact": artifact_path.name,
+        "artifact_sha256": artifact_sha256,
+        "source": source_path.name if source_path else None,
+        "source_sha256": _sha256(source_path) if source_path and source_path.exists() else None,
+        "model_type": type(model).__name__,
+        "n_estimators": forest.n_trees,
+        "n_features": forest.n_features,
+        "max_depth": forest.max_depth,
+        "max_depth_param": getattr(model, 'max_depth', None),
+        "n_nodes": forest.n_nodes,
+        "created_at": datetime.now().isoformat(),
+        "arrays": offsets
+    }
+
+    tmp_manifest = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+    with open(tmp_manifest, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_manifest, manifest_path)
+
+    # Drop superseded artifacts (open mappings stay valid until unmapped)
+    for old in manifest_path.parent.glob(f"{stem}.*.npz"):
+        if old != artifact_path:
+            old.unlink(missing_ok=True)
+
+    logger.info(f"💾 Model artifact exported: {artifact_path.name} ({forest.n_trees} trees, {forest.n_nodes:,} nodes)")
+    return manifest
+
+
+def load_model_artifact(manifest_path: Path = MANIFEST_PATH) -> ForestArtifact:
+    """
+    Memory-map the artifact described by a manifest.
+
+    Raises:
+        FileNotFoundError: Manifest or artifact missing
+        ValueError: Unknown artifact format
+    """
+    start = time.perf_counter()
+    manifest_mtime = manifest_path.stat().st_mtime
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported model artifact format: {manifest.get('format')}")
+
+    artifact_path = manifest_path.parent / manifest["artifact"]
+    mapped = {
+        name: np.memmap(artifact_path, mode='r', dtype=np.dtype(spec["dtype"]),
+                        offset=spec["offset"], shape=tuple(spec["shape"]))
+        for name, spec in manifest["arrays"].items()
+    }
+
+    forest = FlatForest(
+        feature=mapped["feature"],
+        threshold=mapped["threshold"],
+        left=mapped["left"],
+        right=mapped["right"],
+        value=mapped["value"],
+        roots=mapped["roots"],
+        n_features=manifest["n_features"],
+        max_depth=manifest["max_depth"],
+    )
+
+    return ForestArtifact(
+        forest=forest,
+        n_node_samples=mapped["n_node_samples"],
+        tree_max_depth=mapped["tree_max_depth"],
+        feature_importances=mapped["feature_importances"],
+        manifest=manifest,
+        load_seconds=time.perf_counter() - start,
+        manifest_mtime=manifest_mtime,
+    )
+
+
+def ensure_model_artifact() -> bool:
+    """
+    Export the artifact from the pickle if it is missing or older than it.
+
+    Returns:
+        True if an up-to-date artifact exists afterwards
+    """
+    if not MODEL_PKL_PATH.exists():
+        return MANIFEST_PATH.exists()
+
+    if MANIFEST_PATH.exists() and MANIFEST_PATH.stat().st_mtime >= MODEL_PKL_PATH.stat().st_mtime:
+        return True
+
+    try:
+        import joblib
+        logger.info(f"🔄 Exporting memory-mapped artifact from {MODEL_PKL_PATH.name}...")
+        export_model_artifact(joblib.load(MODEL_PKL_PATH))
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to export model artifact: {e}")
+        return MANIFEST_PATH.exists()
+
+
+# Process-wide artifact; reopened when the manifest is replaced
+_artifact: Optional[ForestArtifact] = None
+_artifact_lock = threading.Lock()
+
+
+def get_model_artifact() -> Optional[ForestArtifact]:
+    """
+    Shared memory-mapped model for this process.
+
+    Returns:
+        ForestArtifact, or None if no model has been trained
+    """
+    global _artifact
+
+    try:
+        manifest_mtime = MANIFEST_PATH.stat().st_mtime
+    except FileNotFoundError:
+        manifest_mtime = None
+
+    current = _artifact
+    if current is not None and current.manifest_mtime == manifest_mtime:
+        return current
+
+    with _artifact_lock:
+        if _artifact is not None and _artifact.manifest_mtime == manifest_mtime and manifest_mtime is not None:
+            return _artifact
+
+        if not ensure_model_artifact():
+            _artifact = None
+            return None
+
+        _artifact = load_model_artifact()
+        logger.info(f"✅ Model artifact mapped in {_artifact.load_seconds * 1000:.1f} ms")
+        return _artifact
+
+
+def process_memory() -> Dict[str, Optional[float]]:
+    """
+    Resident memory of this worker in MB.
+
+    rss_file_mb counts file-backed pages (including the mapped artifact),
+    which are shared with other workers through the page cache.
+    """
+    memory = {"rss_mb": None, "rss_anon_mb": None, "rss_file_mb": None}
+    try:
+        with open("/proc/self/status", 'r') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        for key, name in (("rss_mb", "VmRSS"), ("rss_anon_mb", "RssAnon"), ("rss_file_mb", "RssFile")):
+            if name in fields:
+                memory[key] = round(int(fields[name].split()[0]) / 1024, 1)
+    except OSError:
+        import resource
+        import sys
+        # Peak RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory["rss_mb"] = round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return memory
@@ -0,0 +1,259 @@
+"""
+Monte Carlo TCO - Uncertainty analysis over the vectorized cost model.
+
+Samples energy price, carbon tax, subsidy rate, chip cost and volume from
+configurable distributions and evaluates tco_kernel.compute_components on
+fixed-size chunks, so memory stays bounded regardless of the sample count.
+Runs larger than one chunk are streamed twice with the same seed: a first
+pass for moments and range, a second for histograms.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from backend.models.schemas import DistributionKind, DistributionSpec
+from backend.services.tco_kernel import MaterialArrays, compute_components
+
+SAMPLED_PARAMETERS = ("energy_cost", "carbon_tax", "subsidy_rate", "chip_cost", "volume")
+
+# Valid range per parameter; samples are clipped into it
+PARAMETER_BOUNDS = {
+    "energy_cost": (0.0, np.inf),
+    "carbon_tax": (0.0, np.inf),
+    "subsidy_rate": (0.0, 1.0),
+    "chip_cost": (0.0, np.inf),
+    "volume": (1.0, np.inf),
+}
+
+# Default ± spread for inputs without a dataset range
+CHIP_COST_SPREAD = 0.20
+VOLUME_SPREAD = 0.20
+
+# Fine histogram used for percentiles of streamed runs
+PERCENTILE_BINS = 1 << 16
+
+
+@dataclass
+class MonteCarloSummary:
+    """Aggregated Monte Carlo output"""
+    n_samples: int
+    seed: int
+    percentiles: Dict[str, float]
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentile_method: str
+    bin_edges: List[float]
+    counts: List[int]
+
+
+def _triangular(low: float, mode: float, high: float) -> DistributionSpec:
+    """Triangular spec that always contains its mode"""
+    low, high = min(low, mode), max(high, mode)
+    if low == high:
+        return DistributionSpec(kind=DistributionKind.FIXED, value=mode)
+    return DistributionSpec(kind=DistributionKind.TRIANGULAR, low=low, mode=mode, high=high)
+
+
+def default_distributions(
+    material,
+    region,
+    volume: int,
+    ranges: Mapping[str, Tuple[float, float]]
+) -> Dict[str, DistributionSpec]:
+    """
+    Default input distributions for one material/region.
+
+    Energy price, carbon tax and subsidy rate are triangular between the
+    global min/max of global_electricity_data_2025.json, peaking at the
+    region's own value. Chip cost and volume vary ±20% around their values.
+    """
+    specs = {}
+    for name, mode in (("energy_cost", region.energy_cost),
+                       ("carbon_tax", region.carbon_tax),
+                       ("subsidy_rate", region.subsidy_rate)):
+        low, high = ranges.get(name, (mode, mode))
+        specs[name] = _triangular(low, mode, high)
+
+    specs["chip_cost"] = _triangular(
+        material.chip_cost * (1 - CHIP_COST_SPREAD), material.chip_cost, material.chip_cost * (1 + CHIP_COST_SPREAD)
+    )
+    specs["volume"] = _triangular(volume * (1 - VOLUME_SPREAD), float(volume), volume * (1 + VOLUME_SPREAD))
+    return specs
+
+
+def validate_distribution(name: str, spec: DistributionSpec):
+    """Raise ValueError if a spec is missing parameters or is inconsistent"""
+    if name not in SAMPLED_PARAMETERS:
+        raise ValueError(f"Unknown Monte Carlo parameter '{name}' (expected one of {', '.join(SAMPLED_PARAMETERS)})")
+
+    required = {
+        DistributionKind.FIXED: ("value",),
+        DistributionKind.UNIFORM: ("low", "high"),
+        DistributionKind.TRIANGULAR: ("low", "mode", "high"),
+        DistributionKind.NORMAL: ("mean", "std"),
+        DistributionKind.LOGNORMAL: ("mean", "std"),
+    }[spec.kind]
+    missing = [field for field in required if getattr(spec, field) is None]
+    if missing:
+        raise ValueError(f"{name}: {spec.kind.value} distribution requires {', '.join(missing)}")
+
+    if spec.kind == DistributionKind.UNIFORM and spec.low > spec.high:
+        raise ValueError(f"{name}: low must be <= high")
+    if spec.kind == DistributionKind.TRIANGULAR and not (spec.low <= spec.mode <= spec.high and spec.low < spec.high):
+        raise ValueError(f"{name}: triangular requires low <= mode <= high and low < high")
+    if spec.kind == DistributionKind.LOGNORMAL and spec.mean <= 0:
+        raise ValueError(f"{name}: lognormal mean must be > 0")
+
+
+def sample(name: str, spec: DistributionSpec, rng: np.random.Generator, size: int) -> np.ndarray:
+    """Draw size samples of one parameter, clipped to its valid range"""
+    if spec.kind == DistributionKind.FIXED:
+        values = np.full(size, spec.value, dtype=np.float64)
+    elif spec.kind == DistributionKind.UNIFORM:
+        values = rng.uniform(spec.low, spec.high, size)
+    elif spec.kind == DistributionKind.TRIANGULAR:
+        values = rng.triangular(spec.low, spec.mode, spec.high, size)
+    elif spec.kind == DistributionKind.NORMAL:
+        values = rng.normal(spec.mean, spec.std, size)
+    else:
+        # Lognormal parameterised by the mean/std of the value itself
+        sigma2 = np.log1p((spec.std / spec.mean) ** 2)
+        values = rng.lognormal(np.log(spec.mean) - sigma2 / 2, np.sqrt(sigma2), size)
+
+    low, high = PARAMETER_BOUNDS[name]
+    return np.clip(values, low, high, out=values)
+
+
+def _sampled_totals(
+    material_arrays: MaterialArrays,
+    years: int,
+    usage_hours: int,
+    distributions: Dict[str, DistributionSpec],
+    n_samples: int,
+    seed: int,
+    chunk_size: int
+):
+    """Yield total_after_subsidy for successive chunks; identical on every replay"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_samples, chunk_size):
+        size = min(chunk_size, n_samples - start)
+        draws = {name: sample(name, distributions[name], rng, size) for name in SAMPLED_PARAMETERS}
+        components = compute_components(
+            replace(material_arrays, chip_cost=draws["chip_cost"]),
+            volume=draws["volume"],
+            years=years,
+            energy_cost=draws["energy_cost"],
+            usage_hours=usage_hours,
+            carbon_tax=draws["carbon_tax"],
+            subsidy_rate=draws["subsidy_rate"],
+        )
+        yield components["total_after_subsidy"]
+
+
+def _binned_percentile(counts: np.ndarray, edges: np.ndarray, q: float) -> float:
+    """Percentile from a fine histogram, interpolating inside the target bin"""
+    cumulative = np.cumsum(counts)
+    target = q / 100 * cumulative[-1]
+    i = int(np.searchsorted(cumulative, target))
+    i = min(i, len(counts) - 1)
+    before = cumulative[i - 1] if i > 0 else 0
+    fraction = (target - before) / counts[i] if counts[i] else 0.0
+    return float(edges[i] + fraction * (edges[i + 1] - edges[i]))
+
+
+def run_monte_carlo(
+    material,
+    years: int,
+    usage_hours: int,
+    distributions: Dict[str, DistributionSpec],
+    n_samples: int,
+    seed: Optional[int] = None,
+    chunk_size: int = 250000,
+    bins: int = 50
+) -> MonteCarloSummary:
+    """
+    Sample the cost model n_samples times.
+
+    Args:
+        material: Material schema (chip cost is replaced by its samples)
+        years: Analysis period in years
+        usage_hours: Device usage hours
+        distributions: Spec for every name in SAMPLED_PARAMETERS
+        n_samples: Number of samples
+        seed: Random seed; a fresh one is drawn (and returned) if None
+        chunk_size: Samples per vectorized chunk (bounds memory)
+        bins: Histogram bins
+
+    Returns:
+        MonteCarloSummary with P5/P50/P95, moments and histogram
+    """
+    for name, spec in distributions.items():
+        validate_distribution(name, spec)
+    missing = [name for name in SAMPLED_PARAMETERS if name not in distributions]
+    if missing:
+        raise ValueError(f"Missing distributions: {', '.join(missing)}")
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1, dtype=np.uint64)[0] >> 1)
+
+    material_arrays = MaterialArrays.from_materials([material])
+
+    def totals():
+        return _sampled_totals(material_arrays, years, usage_hours, distributions, n_samples, seed, chunk_size)
+
+    # Pass 1: count, mean, M2 (Chan et al. merge), min, max
+    count, mean, m2 = 0, 0.0, 0.0
+    low, high = np.inf, -np.inf
+    single_chunk = None
+    for chunk in totals():
+        n = chunk.size
+        chunk_mean = float(chunk.mean())
+        chunk_m2 = float(np.sum((chunk - chunk_mean) ** 2))
+        delta = chunk_mean - mean
+        total = count + n
+        mean += delta * n / total
+        m2 += chunk_m2 + delta * delta * count * n / total
+        count = total
+        low = min(low, float(chunk.min()))
+        high = max(high, float(chunk.max()))
+        if n_samples <= chunk_size:
+            single_chunk = chunk
+
+    if single_chunk is not None:
+        # Everything fits in one chunk: exact percentiles
+        p5, p50, p95 = np.percentile(single_chunk, [5, 50, 95])
+        counts, edges = np.histogram(single_chunk, bins=bins, range=(low, high))
+        method = "exact"
+    else:
+        # Pass 2: replay the same samples into fixed-range histograms
+        counts = np.zeros(bins, dtype=np.int64)
+        fine_counts = np.zeros(PERCENTILE_BINS, dtype=np.int64)
+        edges = fine_edges = None
+        for chunk in totals():
+            chunk_counts, edges = np.histogram(chunk, bins=bins, range=(low, high))
+            chunk_fine, fine_edges = np.histogram(chunk, bins=PERCENTILE_BINS, range=(low, high))
+            counts += chunk_counts
+            fine_counts += chunk_fine
+
+        if low == high:
+            p5 = p50 = p95 = low
+        else:
+            p5, p50, p95 = (_binned_percentile(fine_counts, fine_edges, q) for q in (5, 50, 95))
+        method = "binned"
+
+    return MonteCarloSummary(
+        n_samples=count,
+        seed=seed,
+        percentiles={"p5": float(p5), "p50": float(p50), "p95": float(p95)},
+        mean=mean,
+        std=float(np.sqrt(m2 / count)),
+        min=low,
+        max=high,
+        percentile_method=method,
+        bin_edges=[float(e) for e in edges],
+        counts=[int(c) for c in counts],
+    )
@@ -0,0 +1,263 @@
+"""
+TCO Kernel - Vectorized NumPy implementation of the formula-based cost model.
+
+Evaluates the same component formulas as TcoEngine (chip cost, energy,
+carbon tax, maintenance, supply chain risk, subsidy) over whole arrays at once.
+The operation order mirrors the scalar methods so results are bit-identical.
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+
+# Maintenance rates from MAINTENANCE_SOURCES.md
+MAINTENANCE_RATES = {
+    'Traditional Semiconductor': 0.09,  # 9% mature Si (28nm+) - GlobalFoundries 2024
+    'Wide-bandgap Semiconductor': 0.12,  # 12% SiC - Wolfspeed 10-K 2024
+    'III-Nitride Wide-bandgap': 0.105,  # 10.5% GaN - industry average
+    'III-V Compound': 0.095,  # 9.5% GaAs - mature technology
+    'II-VI Compound': 0.10,  # 10% industry standard
+    'Ultra-wide Bandgap': 0.15,  # 15% diamond/research materials (high uncertainty)
+    '2D Transition Metal Dichalcogenide': 0.11,  # 11% default
+    'default': 0.11  # 11% SEMI industry average 2024
+}
+
+# 13% for leading-edge Si (TSMC, Intel 2024)
+ADVANCED_NODE_MAINTENANCE_RATE = 0.13
+
+# Average chip cost (€) above which a TRL 9 Si material counts as an advanced node
+ADVANCED_NODE_CHIP_COST = 3.0
+
+
+def supply_chain_risk_multiplier(material) -> float:
+    """
+    Risk premium (fraction of chip spend) for a material.
+
+    Risk factors:
+    - TRL < 7: Higher risk (experimental technology)
+    - Few manufacturers: Higher risk
+    - Emerging materials: Higher risk
+    """
+    risk_multiplier = 0.0
+
+    # TRL risk
+    if material.trl < 7:
+        risk_multiplier += 0.05  # 5% for experimental tech
+
+    # Manufacturer concentration risk
+    if len(material.manufacturers) < 3:
+        risk_multiplier += 0.03  # 3% for limited suppliers
+
+    # Maturity risk
+    if material.maturity in ["Prototype", "Laboratory"]:
+        risk_multiplier += 0.05  # 5% for immature tech
+
+    return risk_multiplier
+
+
+@dataclass
+class MaterialArrays:
+    """Per-material properties laid out as aligned NumPy arrays"""
+    ids: np.ndarray
+    chip_cost: np.ndarray
+    energy_consumption: np.ndarray
+    carbon_footprint: np.ndarray
+    maintenance_rate: np.ndarray
+    advanced_node_candidate: np.ndarray
+    risk_multiplier: np.ndarray
+
+    @classmethod
+    def from_materials(cls, materials) -> "MaterialArrays":
+        """Build arrays from a list of Material schemas"""
+        return cls(
+            ids=np.array([m.id for m in materials], dtype=object),
+            chip_cost=np.array([m.chip_cost for m in materials], dtype=np.float64),
+            energy_consumption=np.array([m.energy_consumption for m in materials], dtype=np.float64),
+            carbon_footprint=np.array([m.carbon_footprint for m in materials], dtype=np.float64),
+            maintenance_rate=np.array(
+                [MAINTENANCE_RATES.get(getattr(m, 'category', None), MAINTENANCE_RATES['default']) for m in materials],
+                dtype=np.float64
+            ),
+            advanced_node_candidate=np.array(
+                [getattr(m, 'category', None) == 'Traditional Semiconductor' and m.trl >= 9 for m in materials],
+                dtype=bool
+            ),
+            risk_multiplier=np.array([supply_chain_risk_multiplier(m) for m in materials], dtype=np.float64),
+        )
+
+    def take(self, index: np.ndarray) -> "MaterialArrays":
+        """Gather rows by material index (one row per calculation)"""
+        return MaterialArrays(
+            ids=self.ids[index],
+            chip_cost=self.chip_cost[index],
+            energy_consumption=self.energy_consumption[index],
+            carbon_footprint=self.carbon_footprint[index],
+            maintenance_rate=self.maintenance_rate[index],
+            advanced_node_candidate=self.advanced_node_candidate[index],
+            risk_multiplier=self.risk_multiplier[index],
+        )
+
+
+@dataclass
+class RegionArrays:
+    """Per-region economics laid out as aligned NumPy arrays"""
+    codes: np.ndarray
+    energy_cost: np.ndarray
+    carbon_tax: np.ndarray
+    subsidy_rate: np.ndarray
+
+    @classmethod
+    def from_regions(cls, regions) -> "RegionArrays":
+        """Build arrays from a list of Region schemas"""
+        return cls(
+            codes=np.array([r.code for r in regions], dtype=object),
+            energy_cost=np.array([r.energy_cost for r in regions], dtype=np.float64),
+            carbon_tax=np.array([r.carbon_tax for r in regions], dtype=np.float64),
+            subsidy_rate=np.array([r.subsidy_rate for r in regions], dtype=np.float64),
+        )
+
+
+def _maintenance_rate(materials: MaterialArrays, chip_cost: np.ndarray, equipment_proxy: np.ndarray) -> np.ndarray:
+    """Annual maintenance rate per calculation (advanced nodes use a higher rate)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_chip_cost = chip_cost / (equipment_proxy / 4.0)
+    return np.where(
+        materials.advanced_node_candidate & (avg_chip_cost > ADVANCED_NODE_CHIP_COST),
+        ADVANCED_NODE_MAINTENANCE_RATE,
+        materials.maintenance_rate
+    )
+
+
+def compute_components(
+    materials: MaterialArrays,
+    volume: np.ndarray,
+    years: np.ndarray,
+    energy_cost: np.ndarray,
+    usage_hours: np.ndarray,
+    carbon_tax: np.ndarray,
+    subsidy_rate: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate the full cost model over broadcastable arrays.
+
+    Args:
+        materials: Material properties, one row per calculation (see MaterialArrays.take)
+        volume: Annual chip volume
+        years: Analysis period in years
+        energy_cost: EUR per kWh
+        usage_hours: Device usage hours
+        carbon_tax: EUR per ton CO2
+        subsidy_rate: Subsidy fraction (0-1)
+
+    Returns:
+        Dict of cost component arrays keyed like CostBreakdown
+    """
+    total_chips = volume * years
+
+    # Direct chip purchase costs
+    chip_cost = materials.chip_cost * total_chips
+
+    # Energy: Power (W) * Hours / 1000 = kWh per chip
+    kwh_per_chip = (materials.energy_consumption * usage_hours) / 1000
+    total_kwh = kwh_per_chip * total_chips
+    energy_total = total_kwh * energy_cost
+
+    # Carbon tax on CO2 footprint (kg -> tons)
+    total_co2_tons = (materials.carbon_footprint * total_chips) / 1000
+    carbon = np.where(carbon_tax == 0, 0.0, total_co2_tons * carbon_tax)
+
+    # Maintenance: equipment capex proxy is 4x chip value
+    equipment_proxy = chip_cost * 4.0
+    maintenance = equipment_proxy * _maintenance_rate(materials, chip_cost, equipment_proxy)
+
+    # Supply chain risk premium on one year of chip volume
+    supply_chain_risk = (materials.chip_cost * volume) * materials.risk_multiplier
+
+    total_before = chip_cost + energy_total + carbon + maintenance + supply_chain_risk
+    subsidy_amount = np.where(subsidy_rate <= 0, 0.0, total_before * subsidy_rate)
+    total_after = total_before - subsidy_amount
+
+    return {
+        "chip_cost": chip_cost,
+        "energy_cost": energy_total,
+        "carbon_tax": carbon,
+        "maintenance": maintenance,
+        "supply_chain_risk": supply_chain_risk,
+        "total_before_subsidy": total_before,
+        "subsidy_amount": subsidy_amount,
+        "total_after_subsidy": total_after,
+    }
+
+
+def compute_gradients(
+    materials: MaterialArrays,
+    volume: np.ndarray,
+    years: np.ndarray,
+    energy_cost: np.ndarray,
+    usage_hours: np.ndarray,
+    carbon_tax: np.ndarray,
+    subsidy_rate: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Closed-form partial derivatives of total_after_subsidy.
+
+    Every component is linear in each single input (maintenance rate is
+    piecewise constant), and total_after = (1 - subsidy) * total_before.
+    Arguments are the same as compute_components.
+
+    Returns:
+        Dict of derivative arrays keyed by input name (subsidy = subsidy_rate)
+    """
+    total_chips = volume * years
+    kwh_per_chip = (materials.energy_consumption * usage_hours) / 1000
+    co2_tons_per_chip = materials.carbon_footprint / 1000
+
+    chip_cost = materials.chip_cost * total_chips
+    equipment_proxy = chip_cost * 4.0
+    rate = _maintenance_rate(materials, chip_cost, equipment_proxy)
+
+    # total_before per chip bought (volume * years) and per annual chip (volume)
+    per_total_chip = (
+        materials.chip_cost
+        + kwh_per_chip * energy_cost
+        + co2_tons_per_chip * carbon_tax
+        + materials.chip_cost * 4.0 * rate
+    )
+    per_annual_chip = materials.chip_cost * materials.risk_multiplier
+    total_before = per_total_chip * total_chips + per_annual_chip * volume
+
+    keep = 1 - np.maximum(subsidy_rate, 0.0)
+
+    return {
+        "energy_cost": keep * kwh_per_chip * total_chips,
+        "carbon_tax": keep * co2_tons_per_chip * total_chips,
+        "subsidy": -total_before,
+        "volume": keep * (per_total_chip * years + per_annual_chip),
+        "years": keep * per_total_chip * volume,
+        "usage_hours": keep * materials.energy_consumption / 1000 * energy_cost * total_chips,
+        "chip_cost": keep * (total_chips * (1 + 4.0 * rate) + volume * materials.risk_multiplier),
+    }
+
+
+def round_currency(values: np.ndarray) -> list:
+    """
+    Round to cents exactly like Python's round(value, 2).
+
+    np.round scales by 100 before rounding, which can flip results that sit
+    on a half-cent boundary. Those (rare) entries are re-rounded in Python.
+    Returns (nested) Python lists with the shape of the input.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 100
+    rounded = np.round(values, 2)
+
+    with np.errstate(invalid='ignore'):
+        distance_to_tie = np.abs(scaled - np.floor(scaled) - 0.5)
+        tolerance = np.abs(scaled) * 1e-15 + 1e-12
+        ambiguous = ~np.isfinite(scaled) | (distance_to_tie <= tolerance) | (np.abs(scaled) >= 2.0 ** 52)
+
+    for i in np.flatnonzero(ambiguous).tolist():
+        rounded.flat[i] = round(float(values.flat[i]), 2)
+    return rounded.tolist()
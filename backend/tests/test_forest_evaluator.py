@@ -0,0 +1,49 @@
+"""
+Parity of the flattened NumPy forest with sklearn's RandomForestRegressor.
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from backend.services.forest_evaluator import flatten_forest
+from backend.services.model_artifact import export_model_artifact, load_model_artifact
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 9))
+    # Repeated values put rows exactly on split thresholds
+    X[:, 2] = rng.integers(1, 10, size=500)
+    y = X @ rng.normal(size=9) + rng.normal(scale=0.1, size=500)
+    model = RandomForestRegressor(
+        n_estimators=25, max_depth=12, min_samples_leaf=2, max_features='sqrt', random_state=42, n_jobs=1
+    )
+    model.fit(X, y)
+    X_test = np.vstack([X[:100], rng.normal(size=(300, 9))])
+    return model, X_test
+
+
+def test_flat_forest_matches_sklearn(fitted):
+    model, X = fitted
+    forest = flatten_forest(model)
+
+    assert np.array_equal(forest.predict(X), model.predict(X))
+
+
+def test_flat_forest_matches_sklearn_across_chunks_and_single_rows(fitted):
+    model, X = fitted
+    forest = flatten_forest(model)
+
+    assert np.array_equal(forest.predict(X, chunk_rows=7), model.predict(X))
+    assert np.array_equal(forest.predict(X[0]), model.predict(X[:1]))
+
+
+def test_artifact_round_trip_matches_sklearn(fitted, tmp_path):
+    model, X = fitted
+    export_model_artifact(model, manifest_path=tmp_path / "forest.manifest.json", source_path=None)
+    artifact = load_model_artifact(tmp_path / "forest.manifest.json")
+
+    assert artifact.n_estimators == model.n_estimators
+    assert np.array_equal(artifact.predict(X), model.predict(X))
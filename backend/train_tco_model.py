@@ -13,6 +13,14 @@ from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 import joblib
 from pathlib import Path
 import json
+import sys
+
+try:
+    from backend.services.model_artifact import export_model_artifact
+except ImportError:
+    # Running as `python backend/train_tco_model.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from backend.services.model_artifact import export_model_artifact
 
 # Cargar materiales reales
 def load_real_materials():
@@ -204,6 +212,10 @@ def train_model():
     joblib.dump(model, model_path)
     print(f"\n💾 Model saved to: {model_path}")
     
+    # Memory-mapped artifact shared by all API workers
+    manifest = export_model_artifact(model, source_path=model_path)
+    print(f"💾 Memory-mapped artifact: {model_path.parent / manifest['artifact']}")
+    
     # 8. Guardar metadata
     metadata = {
         'model_type': 'RandomForestRegressor',
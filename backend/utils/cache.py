@@ -3,7 +3,9 @@ Simple in-memory cache for API responses.
 """
 
 import time
-from typing import Any, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
 from functools import wraps
 import hashlib
 import json
@@ -35,6 +37,80 @@ class SimpleCache:
         self.cache.clear()
 
 
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with hit/miss statistics.
+    
+    Entries belong to a generation: check_generation() with a different
+    token (e.g. a document-set or index version) drops every entry, so
+    results computed against stale data are never served.
+    """
+    
+    def __init__(self, maxsize: int = 1024, name: str = "lru"):
+        self.maxsize = maxsize
+        self.name = name
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation: Hashable = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def check_generation(self, generation: Hashable):
+        """Clear the cache if generation differs from the one its entries were built for"""
+        if generation == self._generation:
+            return
+        with self._lock:
+            if generation != self._generation:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self._generation = generation
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value (marked most recently used), or default"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        """Store value, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
 # Global cache instance
 cache = SimpleCache(ttl_seconds=300)
 
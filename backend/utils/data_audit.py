@@ -5,13 +5,19 @@ Provides recommendations for improvements and additional data sources.
 """
 
 import json
-import joblib
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import sys
 import os
 
+try:
+    from backend.services.model_artifact import get_model_artifact, process_memory
+except ImportError:
+    # Running as `python backend/utils/data_audit.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+    from backend.services.model_artifact import get_model_artifact, process_memory
+
 
 class DataAudit:
     """Comprehensive auditor for all data sources, ML models, and RAG system"""
@@ -208,17 +214,19 @@ class DataAudit:
             return audit
         
         try:
-            # Load model
-            model = joblib.load(pkl_file)
+            # Map the shared model artifact (exported from the pickle if needed)
+            model = get_model_artifact()
+            if model is None:
+                raise FileNotFoundError("model artifact could not be created")
             audit["model_loaded"] = True
+            audit["artifact_file"] = str(self.models_dir / model.manifest["artifact"])
+            audit["load_time_ms"] = round(model.load_seconds * 1000, 2)
+            audit["worker_memory"] = {"pid": os.getpid(), **process_memory()}
             
             # Get model info
-            if hasattr(model, 'n_estimators'):
-                audit["n_estimators"] = model.n_estimators
-            if hasattr(model, 'max_depth'):
-                audit["max_depth"] = model.max_depth
-            if hasattr(model, 'n_features_in_'):
-                audit["n_features"] = model.n_features_in_
+            audit["n_estimators"] = model.n_estimators
+            audit["max_depth"] = model.manifest.get("max_depth_param")
+            audit["n_features"] = model.n_features_in_
             
             # Check metadata file
             if json_file.exists():
@@ -544,7 +552,12 @@ class DataAudit:
         # === ML MODELS ===
         print("\n🤖 ML MODELS")
         print("-" * 80)
-        self.audit_random_forest_model()
+        model_audit = self.audit_random_forest_model()
+        if model_audit.get("model_loaded"):
+            memory = model_audit["worker_memory"]
+            print(f"  Model artifact mapped in {model_audit['load_time_ms']} ms")
+            print(f"  Worker {memory['pid']} RSS: {memory['rss_mb']} MB "
+                  f"(shared file pages: {memory['rss_file_mb']} MB, private: {memory['rss_anon_mb']} MB)")
         
         # === RAG KNOWLEDGE BASE ===
         print("\n📚 RAG KNOWLEDGE BASE")
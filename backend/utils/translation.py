@@ -6,6 +6,8 @@ import os
 import logging
 from typing import Optional
 
+from backend.services.concurrency import run_blocking
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,7 +56,9 @@ Original text:
 
 Translated text:"""
         
-        response = client.models.generate_content(
+        response = await run_blocking(
+            "llm",
+            client.models.generate_content,
             model='gemini-2.0-flash-exp',
             contents=prompt,
             config={